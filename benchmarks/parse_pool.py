@@ -0,0 +1,71 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measure the parsing throughput of :py:class:`colourlovers.parallel.ParsePool`
+against parsing in the calling process. Synthetic ``palettes`` pages are
+built from the palette fixture and parsed with an increasing number of
+worker processes::
+
+    $ python benchmarks/parse_pool.py --pages 200 --per-page 100
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import time
+
+from colourlovers import ColourLovers, Palette
+from colourlovers.parallel import ParsePool
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'fixtures', 'palette.xml')
+
+
+def build_page(per_page):
+    with open(FIXTURE, 'rb') as fh:
+        palette = fh.read().decode('utf-8')
+    palette = re.sub(r'<\?xml[^>]*\?>', '', palette).strip()
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><palettes>%s</palettes>'
+        % (palette * per_page)
+    ).encode('utf-8')
+
+
+def parse_serial(pages):
+    for content in pages:
+        xml = ColourLovers._parse_content(content)
+        [Palette.from_xml(elem) for elem in xml.findall('palette')]
+
+
+def parse_pooled(pages, processes):
+    with ParsePool(processes) as pool:
+        for __ in pool.parse_many('palettes', pages):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=100)
+    args = parser.parse_args()
+
+    pages = [build_page(args.per_page)] * args.pages
+    items = args.pages * args.per_page
+
+    start = time.time()
+    parse_serial(pages)
+    serial = time.time() - start
+    print('serial       %8.0f items/s' % (items / serial))
+
+    processes = 1
+    while processes <= multiprocessing.cpu_count():
+        start = time.time()
+        parse_pooled(pages, processes)
+        elapsed = time.time() - start
+        print('%2d processes %8.0f items/s  (x%.2f)' % (
+            processes, items / elapsed, serial / elapsed))
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
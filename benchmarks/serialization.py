@@ -0,0 +1,102 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare :py:mod:`colourlovers.serialization` with pickling the content
+type instances and with JSON encoding their records. A list of palettes
+built from the palette fixture is encoded and decoded repeatedly::
+
+    $ python benchmarks/serialization.py --items 10000
+"""
+import argparse
+import io
+import json
+import os
+import pickle
+import time
+
+from datetime import datetime
+
+from colourlovers import Palette, DATE_FORMAT
+from colourlovers import serialization
+
+try:
+    from xml.etree import ElementTree
+except ImportError:
+    from elementtree import ElementTree
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'fixtures', 'palette.xml')
+
+
+def json_dumps(palettes):
+    records = []
+    for palette in palettes:
+        record = palette.to_record()
+        record['date_created'] = record['date_created'].strftime(DATE_FORMAT)
+        records.append(record)
+    return json.dumps(records).encode('utf-8')
+
+
+def json_loads(data):
+    palettes = []
+    for record in json.loads(data.decode('utf-8')):
+        record['date_created'] = datetime.strptime(
+            record['date_created'], DATE_FORMAT)
+        palettes.append(Palette.from_record(record))
+    return palettes
+
+
+def measure(name, dumps, loads, objs, repeat):
+    start = time.time()
+    for __ in range(repeat):
+        data = dumps(objs)
+    encoded = time.time() - start
+
+    start = time.time()
+    for __ in range(repeat):
+        loads(data)
+    decoded = time.time() - start
+
+    count = len(objs) * repeat
+    print('%-18s %9d bytes  encode %9.0f/s  decode %9.0f/s' % (
+        name, len(data), count / encoded, count / decoded))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with io.open(FIXTURE, encoding='utf-8') as fh:
+        palette = Palette.from_xml(ElementTree.XML(fh.read().encode('utf-8')))
+    # distinct instances and strings, pickle would only store repeated
+    # objects once
+    palettes = []
+    for position in range(args.items):
+        record = palette.to_record()
+        for key, value in record.items():
+            if isinstance(value, type(u'')):
+                record[key] = u'%s %d' % (value, position)
+        record['id'] = position
+        record['colours'] = [
+            '#%06x' % ((int(c[1:], 16) + position) % 0xffffff)
+            for c in record['colours']]
+        palettes.append(Palette.from_record(record))
+
+    measure('pickle', lambda objs: pickle.dumps(objs, -1), pickle.loads,
+            palettes, args.repeat)
+    measure('json', json_dumps, json_loads, palettes, args.repeat)
+
+    backends = [serialization.PICKLE]
+    if serialization.msgpack is not None:
+        backends.append(serialization.MSGPACK)
+    for backend in backends:
+        measure(
+            'colourlovers (%s)' % backend.decode('ascii'),
+            lambda objs: serialization.encode_many(objs, backend),
+            serialization.decode_many, palettes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
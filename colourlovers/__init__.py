@@ -53,6 +53,22 @@ Another example::
     [<Colour id='14' title='Black' rgb=(0, 0, 0)>,
      <Colour id='16' title='white' rgb=(255, 255, 255)>,
      <Colour id='1086335' title='dutch teal' rgb=(22, 147, 165)>]
+
+Passing ``lazy=True`` returns :py:class:`LazyResults` that only create
+the results that are accessed::
+
+    >>> palettes = cl.palettes('top', numResults=100, lazy=True)
+    >>> len(palettes)
+    100
+    >>> palettes[0]
+    <Palette id='92095' title='Giant Goldfish'>
+
+A :py:class:`ColourLovers` instance can be shared between threads. Its
+configuration is not modified after construction, each thread sends
+requests through its own ``requests.Session`` unless a session is
+passed in, hedged duplicates of a request use spare sessions no other
+thread is using at the time, and the helpers it is given, such as the cache, colour
+index, circuit breaker and profiler, are thread-safe themselves.
 """
 
 __title__ = 'colourlovers'
@@ -63,6 +79,10 @@ __copyright__ = 'Copyright 2013 Sebastian Vetter'
 
 
 import re
+import time
+import itertools
+import threading
+import collections
 import requests
 
 from datetime import datetime
@@ -72,6 +92,13 @@ try:
 except ImportError:
     from elementtree import ElementTree
 
+from colourlovers.profiling import NULL_SPAN
+from colourlovers.resilience import LatencyTracker, hedged
+from requests.packages.urllib3.exceptions import HTTPError as _RawError
+
+from colourlovers.transfer import (
+    ACCEPT_ENCODING, DECOMPRESSION_ERRORS, TransferStats, iter_body)
+
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
@@ -80,6 +107,12 @@ class ColourLoversError(BaseException):
     pass
 
 
+#: A content type item that could not be parsed in lenient mode. *index*
+#: is the position of the item in the response, *id* the text of its
+#: ``id`` element and *error* the error message.
+ItemError = collections.namedtuple('ItemError', 'method index id error')
+
+
 class Base(object):
     """ Define the base class for content types as provided
         by the ColourLovers API.
@@ -135,13 +168,40 @@ class Base(object):
                 Instance of calling class.
         """
         kwargs = {}
-        for child in xml.getchildren():
-            if len(child.getchildren()) == 0:
+        for child in xml:
+            if len(child) == 0:
                 attr_name = cls.name_from_tag(child.tag)
                 kwargs[attr_name] = child.text
 
         return cls(**kwargs)
 
+    def to_record(self):
+        """ Return the attributes of this instance as a record, a plain
+            ``dict`` of already converted values that can be pickled
+            cheaply, e.g. to send it between processes. Nested objects
+            are flattened into tuples.
+
+            Returns:
+                Record of the instance as ``dict``.
+        """
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_record(cls, record):
+        """ Create an instance from *record* as returned by
+            :py:meth:`to_record`. The values in *record* are already
+            converted and are therefore assigned without conversion.
+
+            Args:
+                *record (dict)*: record of a content type instance.
+
+            Returns:
+                Instance of calling class.
+        """
+        inst = cls.__new__(cls)
+        inst.__dict__.update(record)
+        return inst
+
     @classmethod
     def name_from_tag(cls, tag):
         """ Generate a Pythonic attribute name from the
@@ -327,6 +387,8 @@ class Comment(object):
         provides the *date*, *username* and *comments* text.
     """
 
+    __slots__ = ('comment_date', 'comment_user_name', 'comment_comments')
+
     def __init__(self, date, username, comments):
         """ Create a comment created at *date* from user *username*
             with the comment text in *comments*. *date* has to be
@@ -359,6 +421,85 @@ class Comment(object):
         )
 
 
+class LazyComments(object):
+    """ Sequence of the comments of a lover that creates each
+        :py:class:`Comment` from its XML element only when it is
+        accessed. Comments are not cached, iterating twice parses them
+        twice.
+    """
+
+    __slots__ = ('elements',)
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        for element in self.elements:
+            yield Comment.from_xml(element)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Comment.from_xml(e) for e in self.elements[index]]
+        return Comment.from_xml(self.elements[index])
+
+
+class LazyResults(object):
+    """ Sequence of the results of an API request that creates each
+        content type instance from its XML element only when it is
+        accessed. Created instances are kept, so accessing a result
+        again returns the same instance. Slicing returns a view on the
+        same elements, instances created through the slice or the
+        original results are shared by both. Results served from a
+        cache, a colour index or parsed by a parse pool are always
+        returned as ``list``.
+    """
+
+    __slots__ = ('elements', 'content_class', 'options', 'items', 'indices')
+
+    def __init__(self, elements, content_class, options=None, items=None,
+                 indices=None):
+        self.elements = elements
+        self.content_class = content_class
+        self.options = options or {}
+        self.items = items if items is not None else [None] * len(elements)
+        ## positions in the shared *elements* and *items* of this view
+        self.indices = indices if indices is not None \
+            else list(range(len(elements)))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for position in self.indices:
+            yield self.__item(position)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyResults(
+                self.elements, self.content_class, self.options,
+                self.items, self.indices[index])
+        if index < 0:
+            index += len(self.indices)
+        if not 0 <= index < len(self.indices):
+            raise IndexError('result index out of range')
+        return self.__item(self.indices[index])
+
+    def __item(self, position):
+        item = self.items[position]
+        if item is None:
+            item = self.items[position] = self.content_class.from_xml(
+                self.elements[position], **self.options)
+        return item
+
+    def __repr__(self):
+        return "<%s %s of %d>" % (
+            self.__class__.__name__, self.content_class.__name__,
+            len(self.indices))
+
+
 class Colour(Base):
     """ This class defines a ColourLovers colour in the RGB and
         HSV colour spaces. The colour values can be accessed through
@@ -395,6 +536,34 @@ class Colour(Base):
 
         return inst
 
+    def to_record(self):
+        """ Return record of colour with :py:attr:`rgb` and
+            :py:attr:`hsv` flattened into tuples.
+        """
+        record = super(Colour, self).to_record()
+
+        if self.rgb is not None:
+            record['rgb'] = (self.rgb.red, self.rgb.green, self.rgb.blue)
+        if self.hsv is not None:
+            record['hsv'] = (
+                self.hsv.hue, self.hsv.saturation, self.hsv.value)
+
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        """ Create colour from *record* restoring :py:class:`RGB` and
+            :py:class:`HSV` from their tuples.
+        """
+        inst = super(Colour, cls).from_record(record)
+
+        if inst.rgb is not None:
+            inst.rgb = RGB(*inst.rgb)
+        if inst.hsv is not None:
+            inst.hsv = HSV(*inst.hsv)
+
+        return inst
+
     def __repr__(self):
         """ Return a representation of :py:class:`Colour` instance. """
         return "<%s id='%d' title='%s' rgb=(%d, %d, %d)>" % (
@@ -471,12 +640,48 @@ class Lover(Base):
         return 'lover'
 
     @classmethod
-    def from_xml(cls, xml):
+    def from_xml(cls, xml, max_comments=None, lazy_comments=False):
+        """ Create a lover from *xml* including its comments. Only the
+            first *max_comments* comments are kept if it is set, ``0``
+            skips the comments altogether. With *lazy_comments* the
+            comments are a :py:class:`LazyComments` sequence that
+            creates the comments on access.
+
+            Args:
+                xml (Element): ``lover`` DOM element.
+                max_comments (int): maximum number of comments to keep.
+                lazy_comments (bool): create comments on access only.
+
+            Returns:
+                New instance of :py:class:`Lover`.
+        """
         inst = super(Lover, cls).from_xml(xml)
 
-        for comment in xml.findall('comments/comment'):
-            inst.comments.append(Comment.from_xml(comment))
+        if max_comments == 0:
+            return inst
+
+        comments = xml.findall('comments/comment')
+        if max_comments is not None:
+            comments = comments[:max_comments]
 
+        if lazy_comments:
+            inst.comments = LazyComments(comments)
+        else:
+            inst.comments = [Comment.from_xml(c) for c in comments]
+
+        return inst
+
+    def to_record(self):
+        record = super(Lover, self).to_record()
+        record['comments'] = [
+            (c.comment_date, c.comment_user_name, c.comment_comments)
+            for c in self.comments]
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        inst = super(Lover, cls).from_record(record)
+        inst.comments = [Comment(*c) for c in inst.comments]
         return inst
 
     def __repr__(self):
@@ -499,9 +704,60 @@ class Stat(Base):
         return u"<%s total='%d'>" % (self.__class__.__name__, self.total)
 
 
+class PreparedQuery(object):
+    """ A query for an API *method* with the URL and the converted
+        keyword arguments prepared once, see
+        :py:meth:`ColourLovers.prepare`. Calling the query sends the
+        request and returns the results just like the method of
+        :py:class:`ColourLovers`.
+    """
+
+    def __init__(self, execute, check_argument, method, argument, prefix,
+                 params):
+        self.method = method
+        self.argument = argument
+        self.params = params
+        self.__execute = execute
+        self.__check_argument = check_argument
+        self.__prefix = prefix
+        self.__url = self.url(argument)
+
+    def url(self, argument=None):
+        """ Return the URL of the query for *argument*. """
+        if argument is None:
+            return self.__prefix
+        return '%s/%s' % (self.__prefix, str(argument).replace('#', ''))
+
+    def __call__(self, argument=None, lazy=False, **kwargs):
+        """ Execute the query. *argument* replaces the prepared argument
+            and *kwargs* are added to the prepared keyword arguments.
+            Results are returned as :py:class:`LazyResults` if *lazy*
+            is ``True``.
+        """
+        if argument is None or argument == self.argument:
+            argument = self.argument
+            url = self.__url
+        else:
+            self.__check_argument(self.method, argument)
+            url = self.url(argument)
+
+        params = self.params
+        if argument == 'random':
+            params = {}
+        elif kwargs:
+            params = dict(params)
+            params.update(ColourLovers.convert_keywords(kwargs))
+
+        return self.__execute(self.method, argument, url, params, lazy)
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.__url)
+
+
 class ColourLovers(object):
 
     API_URL = 'http://www.colourlovers.com/api'
+    USER_AGENT = "ColourLovers Browser"
 
     __CLASS_MAP = {
         'color': Colour,
@@ -520,8 +776,136 @@ class ColourLovers(object):
 
     __ARGUMENTS = [None, 'new', 'top', 'random']
 
-    def __init__(self):
-        pass
+    ## errors raised by converters for malformed values
+    __ITEM_ERRORS = (ValueError, TypeError, AttributeError)
+
+    ## camelCase API parameter names of keyword arguments, ``None`` for
+    ## keywords that are not passed on
+    __KEYWORD_NAMES = {}
+
+    def __init__(self, parse_pool=None, max_comments=None,
+                 lazy_comments=False, session=None, cache=None,
+                 colour_index=None, colour_fallback=True, timeout=None,
+                 circuit_breaker=None, hedge_percentile=None,
+                 hedge_min_samples=20, lenient=False, profiler=None):
+        """ Create a new API client. Responses are parsed in the calling
+            thread unless a *parse_pool* is provided. In that case the
+            raw response content is parsed in its worker processes.
+            Requests are sent through a ``requests.Session`` so that
+            connections are reused.
+
+            Args:
+                *parse_pool (ParsePool)*: optional
+                :py:class:`colourlovers.parallel.ParsePool` to parse
+                responses in.
+                *max_comments (int)*: maximum number of comments kept
+                per lover, ``0`` skips comments.
+                *lazy_comments (bool)*: create comments of lovers on
+                access, see :py:class:`LazyComments`.
+                *session (requests.Session)*: session to send requests
+                with, shared by all threads and by hedged requests, so
+                it has to be safe to share. By default each thread uses
+                its own session.
+                *cache*: optional cache for results with ``get(key)``
+                and ``set(key, results)`` methods such as
+                :py:class:`colourlovers.cache.SQLiteCache`. Requests for
+                ``random`` are never cached.
+                *colour_index (ColourIndex)*: optional
+                :py:class:`colourlovers.colour_index.ColourIndex` that
+                answers :py:meth:`color` lookups locally and is updated
+                with all retrieved colours. Lazy results are not added
+                as that would create all of their instances.
+                *colour_fallback (bool)*: send a request for colours
+                missing in *colour_index*. Without fallback an empty
+                list is returned for unknown colours.
+                *timeout (float)*: seconds to wait for the API to
+                respond, waits indefinitely by default.
+                *circuit_breaker (CircuitBreaker)*: optional
+                :py:class:`colourlovers.resilience.CircuitBreaker`.
+                While it is open requests fail immediately with a
+                :py:exc:`ColourLoversError`.
+                *hedge_percentile (float)*: send a duplicate request if
+                a response takes longer than this percentile of recent
+                request latencies, e.g. ``95``. Requests for ``random``
+                are never hedged.
+                *hedge_min_samples (int)*: number of latencies recorded
+                before requests are hedged.
+                *lenient (bool)*: skip items of a response that cannot
+                be parsed and record them as :py:class:`ItemError` in
+                :py:attr:`parse_errors` instead of failing the request.
+                Lazy results are not validated.
+                *profiler (Profiler)*: optional
+                :py:class:`colourlovers.profiling.Profiler` tracing the
+                stages of a sample of calls.
+
+            Responses are requested compressed and decompressed while
+            they are parsed. The bytes received and decompressed per
+            API method are counted in :py:attr:`transfer_stats`, see
+            :py:mod:`colourlovers.transfer`.
+        """
+        self.__local = threading.local()
+        self.__spare_sessions = []
+        self.__spare_lock = threading.Lock()
+        self.session = session
+
+        self.cache = cache
+        self.colour_index = colour_index
+        self.colour_fallback = colour_fallback
+        self.parse_pool = parse_pool
+        self.max_comments = max_comments
+        self.lazy_comments = lazy_comments
+
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyTracker()
+
+        self.lenient = lenient
+        self.parse_errors = collections.deque(maxlen=1000)
+
+        self.profiler = profiler
+        self.transfer_stats = TransferStats()
+
+    @property
+    def session(self):
+        """ The ``requests.Session`` of the calling thread. Sessions are
+            not safe to share between threads, so each thread creates
+            its own unless a session was passed to the constructor,
+            which is then used by all threads.
+        """
+        if self.__session is not None:
+            return self.__session
+
+        session = getattr(self.__local, 'session', None)
+        if session is None:
+            session = self.__local.session = self.__new_session()
+        return session
+
+    @session.setter
+    def session(self, session):
+        self.__session = session
+
+    @staticmethod
+    def __new_session():
+        return requests.Session()
+
+    def __borrow_session(self):
+        """ Return a session that no other thread is using for hedged
+            requests running alongside the request of the calling
+            thread. Sessions are reused, so their connections are too.
+        """
+        if self.__session is not None:
+            return self.__session
+        with self.__spare_lock:
+            if self.__spare_sessions:
+                return self.__spare_sessions.pop()
+        return self.__new_session()
+
+    def __return_session(self, session):
+        if session is not self.__session:
+            with self.__spare_lock:
+                self.__spare_sessions.append(session)
 
     def stats(self, stat_type):
         """
@@ -549,67 +933,416 @@ class ColourLovers(object):
         if method not in self.__SPECIFIC_METHODS + self.__SEARCH_METHODS:
             raise ColourLoversError("invalid API method '%s'", method)
 
-        def proxy(argument=None, method=method, **kwargs):
-            if method in self.__SEARCH_METHODS \
-               and argument not in self.__ARGUMENTS:
-                    raise ColourLoversError(
-                        "%s is invalid argument for '%s'" % (argument, method))
+        def proxy(argument=None, method=method, lazy=False, **kwargs):
+            self.__check_argument(method, argument)
 
-            xml = self.__call(method, argument, **kwargs)
-            return self.__process(method, xml)
+            ## no parameters can be set for 'random'
+            params = {}
+            if argument != 'random':
+                params = self.convert_keywords(kwargs)
+
+            return self.__execute(
+                method, argument, self.__url(method, argument), params,
+                lazy)
 
         return proxy
 
-    def __process(self, method, xml):
+    def prepare(self, method, argument=None, **kwargs):
+        """ Return a :py:class:`PreparedQuery` for *method* that can be
+            executed many times, optionally with a different argument or
+            additional keyword arguments. The URL and the API parameter
+            names are only computed once::
+
+                >>> query = cl.prepare('palette', show_palette_widths=1)
+                >>> [query(id) for id in palette_ids]
+
+            Args:
+                *method (str)*: API method, e.g. ``palettes``.
+                *argument*: default argument of the query.
+                *kwargs*: keyword arguments sent with every request.
+
+            Returns:
+                New instance of :py:class:`PreparedQuery`.
+        """
+        if method not in self.__SPECIFIC_METHODS + self.__SEARCH_METHODS:
+            raise ColourLoversError("invalid API method '%s'", method)
+        self.__check_argument(method, argument)
+
+        return PreparedQuery(
+            self.__execute, self.__check_argument, method, argument,
+            self.__url(method), self.convert_keywords(kwargs))
+
+    def __check_argument(self, method, argument):
+        if method in self.__SEARCH_METHODS \
+           and argument not in self.__ARGUMENTS:
+                raise ColourLoversError(
+                    "%s is invalid argument for '%s'" % (argument, method))
+
+    def __url(self, method, argument=None):
+        if argument is None:
+            return "%s/%s" % (self.API_URL, method)
+        ## make sure hex argument has no hash
+        argument = str(argument).replace("#", '')
+        return "%s/%s/%s" % (self.API_URL, method, argument)
+
+    def __execute(self, method, argument, url, params, lazy=False):
+        if self.profiler is None:
+            return self.__run(method, argument, url, params, lazy)
+
+        with self.profiler.trace(method):
+            return self.__run(method, argument, url, params, lazy)
+
+    def __stage(self, name, detail=False):
+        if self.profiler is None:
+            return NULL_SPAN
+        return self.profiler.span(name, detail)
+
+    def __run(self, method, argument, url, params, lazy=False):
+        index = self.colour_index
+        if index is not None and method == 'color' and not params:
+            colour = index.get(argument)
+            if colour is not None:
+                return [colour]
+            if not self.colour_fallback:
+                return []
+
+        results = self.__cached_results(method, argument, url, params, lazy)
+
+        if index is not None and method in ('color', 'colors') \
+                and not isinstance(results, LazyResults):
+            index.add(results)
+        return results
+
+    def __cached_results(self, method, argument, url, params, lazy=False):
+        if self.cache is None or argument == 'random':
+            return self.__results(method, argument, url, params, lazy)
+
+        key = self.__cache_key(method, argument, params, self.max_comments)
+        with self.__stage('cache'):
+            results = self.cache.get(key)
+        if results is None:
+            results = self.__results(method, argument, url, params)
+            self.cache.set(key, results)
+        return results
+
+    def __results(self, method, argument, url, params, lazy=False):
+        ## 'request' ends with the response headers, the body is read by
+        ## the following stages
+        with self.__stage('request'):
+            response = self.__send(url, params, hedge=argument != 'random')
+
+        if self.parse_pool is not None:
+            errors = [] if self.lenient else None
+            with self.__stage('download'):
+                content = self.__read_body(method, response)
+            with self.__stage('parse_pool'):
+                results = self.parse_pool.parse(
+                    method, content, errors=errors,
+                    **self.parse_options(method))
+            if errors:
+                self.parse_errors.extend(errors)
+            return results
+
+        ## downloading, decompressing and parsing are interleaved
+        with self.__stage('read_xml'):
+            xml = self.__read_xml(method, response)
+        with self.__stage('from_xml', detail=True):
+            return self.__process(method, xml, lazy)
+
+    @classmethod
+    def cache_key(cls, method, argument=None, kwargs=None,
+                  max_comments=None):
+        """ Return the key identifying the results of *method* called
+            with *argument* and keyword arguments *kwargs* in a cache.
+            Hex colour arguments are normalised to lowercase without
+            leading '#'. Keys of lover methods include *max_comments* if
+            it is set, as lovers parsed with it keep fewer comments.
+        """
+        return cls.__cache_key(
+            method, argument, cls.convert_keywords(kwargs or {}),
+            max_comments)
+
+    @classmethod
+    def __cache_key(cls, method, argument, params, max_comments=None):
+        key = method
+        if argument is not None:
+            argument = str(argument).replace('#', '')
+            if method == 'color':
+                argument = argument.lower()
+            key = '%s/%s' % (key, argument)
+
+        if params:
+            key = '%s?%s' % (key, '&'.join(
+                '%s=%s' % item for item in sorted(params.items())))
+
+        if max_comments is not None and cls.__CLASS_MAP[method] is Lover:
+            key = '%s#max_comments=%d' % (key, max_comments)
+        return key
+
+    def parse_options(self, method):
+        """ Return the keyword arguments passed to ``from_xml`` of the
+            content type of *method*.
+        """
+        if self.__CLASS_MAP[method] is not Lover:
+            return {}
+        return {
+            'max_comments': self.max_comments,
+            'lazy_comments': self.lazy_comments,
+        }
+
+    @classmethod
+    def content_class(cls, method):
+        """ Return the content type class for API *method*, e.g.
+            :py:class:`Palette` for ``palettes``.
+        """
+        return cls.__CLASS_MAP[method]
+
+    def __process(self, method, xml, lazy=False):
         class_name = self.__CLASS_MAP[method]
 
-        results = []
-        for elem in xml.findall(class_name.tag()):
-            results.append(
-                class_name.from_xml(elem)
-            )
+        options = self.parse_options(method)
+
+        if lazy:
+            return LazyResults(
+                xml.findall(class_name.tag()), class_name, options)
 
+        errors = [] if self.lenient else None
+        results = self.parse_elements(method, xml, options, errors)
+        if errors:
+            self.parse_errors.extend(errors)
+        return results
+
+    @classmethod
+    def parse_elements(cls, method, xml, options=None, errors=None):
+        """ Create the content type instances of API *method* from the
+            response element *xml*. Any item that cannot be parsed
+            raises a :py:exc:`ColourLoversError` unless a list is passed
+            as *errors*. In that case the item is skipped and an
+            :py:class:`ItemError` is appended to *errors*.
+
+            Args:
+                *method (str)*: API method the response belongs to.
+                *xml (Element)*: root element of the response.
+                *options (dict)*: keyword arguments for ``from_xml``.
+                *errors (list)*: list collecting invalid items.
+
+            Returns:
+                ``list`` of content type instances.
+        """
+        class_name = cls.__CLASS_MAP[method]
+        options = options or {}
+        elements = xml.findall(class_name.tag())
+
+        if errors is None:
+            ## strict mode handles errors once per response instead of
+            ## once per item
+            try:
+                return [
+                    class_name.from_xml(elem, **options)
+                    for elem in elements
+                ]
+            except cls.__ITEM_ERRORS as exc:
+                raise ColourLoversError(
+                    "invalid %s in response: %s" % (class_name.tag(), exc))
+
+        results = []
+        for index, elem in enumerate(elements):
+            try:
+                results.append(class_name.from_xml(elem, **options))
+            except cls.__ITEM_ERRORS as exc:
+                errors.append(ItemError(
+                    method, index, elem.findtext('id'), str(exc)))
         return results
 
     def __call(self, method, argument=None, **kwargs):
-        if argument is None:
-            url = "%s/%s" % (self.API_URL, method)
-        else:
-            ## make sure hex argument has no hash
-            argument = str(argument).replace("#", '')
-            url = "%s/%s/%s" % (self.API_URL, method, argument)
+        response = self.__request(method, argument, **kwargs)
+        return self.__read_xml(method, response)
+
+    def __read_xml(self, method, response):
+        """ Parse the body of *response* into an XML element while it is
+            downloaded and decompressed.
+        """
+        if not isinstance(response, requests.Response):
+            return self._parse_content(self.__read_body(method, response))
+
+        parser = ElementTree.XMLParser()
+        chunks = self.__chunks(method, response)
+        try:
+            for data in chunks:
+                parser.feed(data)
+            return parser.close()
+        except (SyntaxError, TypeError, ValueError):
+            raise ColourLoversError(
+                "could not retrieve result for your request")
+        finally:
+            chunks.close()
 
+    def __read_body(self, method, response):
+        """ Return the decompressed body of *response*. Responses that
+            are not a ``requests.Response``, e.g. from a custom session,
+            are read through their ``content``.
+        """
+        if not isinstance(response, requests.Response):
+            content = response.content
+            self.transfer_stats.record(method, len(content), len(content))
+            return content
+        return b''.join(self.__chunks(method, response))
+
+    def __chunks(self, method, response):
+        """ Yield the decompressed body of *response* in chunks. The
+            circuit breaker records the request as successful once the
+            whole body has been read, errors while reading it count as
+            failures.
+        """
+        breaker = self.circuit_breaker
+        received = size = 0
+        try:
+            for compressed, data in iter_body(response):
+                received += compressed
+                size += len(data)
+                yield data
+        except BaseException as exc:
+            response.close()
+            if breaker is not None:
+                breaker.record_failure()
+
+            if isinstance(exc, DECOMPRESSION_ERRORS):
+                raise ColourLoversError(
+                    "could not decompress response: %s" % exc)
+            if isinstance(exc, _RawError):
+                raise requests.ConnectionError(exc, request=response.request)
+            raise
+        else:
+            ## the whole body has been read, the connection can be reused
+            release_conn = getattr(response.raw, 'release_conn', None)
+            if release_conn is not None:
+                release_conn()
+            if breaker is not None:
+                breaker.record_success()
+        finally:
+            self.transfer_stats.record(method, received, size)
+
+    def __request(self, method, argument=None, **kwargs):
         ## no parameters can be set for 'random'
         if argument == 'random':
             kwargs = {}
 
-        converted_kwargs = self.convert_keywords(kwargs)
+        return self.__send(
+            self.__url(method, argument), self.convert_keywords(kwargs),
+            hedge=argument != 'random')
 
-        response = requests.get(
-            url, params=converted_kwargs,
-            headers={'User-Agent': "ColourLovers Browser"})
-        return self._check_response(response)
+    def __send(self, url, params, hedge=True):
+        response = self.__get(url, params, hedge)
+        try:
+            self._check_status(response)
+        except ColourLoversError:
+            response.close()
+            raise
+        return response
+
+    def __get(self, url, params, hedge=True):
+        """ Send a GET request to *url* through the circuit breaker and
+            hedge it if enabled. Connection errors, timeouts and server
+            errors count as failures of the circuit breaker. Successful
+            responses are only recorded by the circuit breaker once
+            their body has been read.
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow():
+            raise ColourLoversError(
+                "circuit breaker is open, not requesting %s", url)
+
+        ## hedged attempts run on other threads while the calling thread
+        ## waits. The first attempt uses the session of the calling
+        ## thread, further attempts borrow a spare session so that no
+        ## session is used by two threads at once.
+        session = self.session
+        attempts = itertools.count()
+        ## sent with every request, including those through a session
+        ## passed to the constructor
+        headers = {
+            'User-Agent': self.USER_AGENT,
+            'Accept-Encoding': ACCEPT_ENCODING,
+        }
+
+        def get():
+            first = next(attempts) == 0
+            attempt_session = session if first else self.__borrow_session()
+            try:
+                return attempt_session.get(
+                    url, params=params, headers=headers,
+                    timeout=self.timeout, stream=True)
+            finally:
+                if not first:
+                    self.__return_session(attempt_session)
+
+        delay = None
+        if hedge and self.hedge_percentile is not None \
+                and len(self.latencies) >= self.hedge_min_samples:
+            delay = self.latencies.percentile(self.hedge_percentile)
+
+        start = time.time()
+        try:
+            if delay is None:
+                response = get()
+            else:
+                response = hedged(get, delay, discard=self.__discard)
+        except requests.RequestException:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        self.latencies.record(time.time() - start)
+
+        if breaker is not None:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif response.status_code != 200 or \
+                    not isinstance(response, requests.Response):
+                ## no streamed body is read from these responses
+                breaker.record_success()
+        return response
+
+    @staticmethod
+    def __discard(response):
+        """ Close the response of a hedged request that lost the race to
+            return its connection to the pool.
+        """
+        response.close()
 
     @classmethod
     def valid_methods(cls):
         return cls.__SPECIFIC_METHODS + cls.__SEARCH_METHODS + ['stats']
 
-    def convert_keywords(self, keywords):
+    @classmethod
+    def convert_keywords(cls, keywords):
+        names = cls.__KEYWORD_NAMES
+
         converted = {}
         for key, value in keywords.items():
-            key_parts = key.split('_')
-
-            new_key = key_parts[:1]
-            for key_part in key_parts[1:]:
-                new_key.append(key_part.capitalize())
+            try:
+                new_key = names[key]
+            except KeyError:
+                new_key = names[key] = cls.__keyword_name(key)
 
-            new_key = ''.join(new_key)
-
-            if new_key not in ['format', 'jsonCallback']:
+            if new_key is not None:
                 converted[new_key] = value
 
         return converted
 
+    @staticmethod
+    def __keyword_name(key):
+        key_parts = key.split('_')
+
+        new_key = key_parts[:1]
+        for key_part in key_parts[1:]:
+            new_key.append(key_part.capitalize())
+
+        new_key = ''.join(new_key)
+
+        if new_key in ['format', 'jsonCallback']:
+            return None
+        return new_key
+
     @staticmethod
     def _check_response(response):
         """
@@ -621,12 +1354,29 @@ class ColourLovers(object):
         Keywords arguments:
             response -- string as returned by the ColourLovers API.
         """
+        ColourLovers._check_status(response)
+        return ColourLovers._parse_content(response.content)
+
+    @staticmethod
+    def _check_status(response):
+        """
+        Raise :py:class:ColourLoversError if *response* does not have
+        status code 200.
+        """
         if response.status_code != 200:
             raise ColourLoversError(
                 "received %s error: %s", response.status_code, response.reason)
+
+    @staticmethod
+    def _parse_content(content):
+        """
+        Parse the raw response *content* into an XML element. Invalid
+        content raises :py:class:ColourLoversError.
+        """
         try:
-            xml = ElementTree.XML(response.content)
-        except:
+            xml = ElementTree.XML(content)
+        except (SyntaxError, TypeError, ValueError):
+            ## ElementTree.ParseError is a subclass of SyntaxError
             raise ColourLoversError(
                 "could not retrieve result for your request")
         return xml
@@ -0,0 +1,258 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Download the images of ColourLovers content into a local cache.
+
+Colours, palettes and patterns link to their images in ``image_url``
+and ``badge_url``. An :py:class:`AssetFetcher` downloads these images
+concurrently, each download thread with its own ``requests.Session``,
+and stores them in an :py:class:`AssetCache`. The cache is
+content addressed, identical images are stored only once, and keeps an
+index of downloaded URLs so that an interrupted run can be resumed.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.assets import AssetCache, AssetFetcher
+    >>> cl = ColourLovers()
+    >>> fetcher = AssetFetcher(AssetCache('/tmp/assets'))
+    >>> fetcher.fetch(cl.palettes('top', numResults=100))
+    {'fetched': 200, 'skipped': 0, 'failed': 0}
+    >>> fetcher.cache.path('http://www.colourlovers.com/paletteImg/...')
+    '/tmp/assets/objects/3f/3f2a...'
+"""
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+import requests
+
+
+class AssetCache(object):
+    """ Content addressed store for downloaded images in directory
+        *root*. Files are named by the SHA-1 digest of their content
+        and the URLs pointing to them are recorded in an append-only
+        index file.
+    """
+
+    INDEX_NAME = 'index'
+
+    def __init__(self, root):
+        self.root = root
+        self.__lock = threading.Lock()
+        self.__urls = {}
+
+        objects = os.path.join(root, 'objects')
+        if not os.path.isdir(objects):
+            os.makedirs(objects)
+
+        self.index_path = os.path.join(root, self.INDEX_NAME)
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as fh:
+                for line in fh:
+                    digest, __, url = line.rstrip('\n').partition(' ')
+                    if url:
+                        self.__urls[url] = digest
+
+    def __len__(self):
+        return len(self.__urls)
+
+    def __contains__(self, url):
+        return url in self.__urls
+
+    def digest(self, url):
+        """ Return the digest of the content of *url* or ``None``. """
+        return self.__urls.get(url)
+
+    def object_path(self, digest):
+        """ Return the file path for content with *digest*. """
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def path(self, url):
+        """ Return the file path of the image for *url* or ``None`` if
+            it has not been downloaded.
+        """
+        digest = self.__urls.get(url)
+        if digest is None:
+            return None
+        return self.object_path(digest)
+
+    def store(self, url, chunks):
+        """ Write the content in iterable *chunks* for *url* to the
+            cache without holding it in memory and return its digest.
+            Content that is already stored is not written again.
+        """
+        directory = os.path.join(self.root, 'objects')
+        handle, tmp_path = tempfile.mkstemp(dir=directory)
+
+        sha = hashlib.sha1()
+        try:
+            with os.fdopen(handle, 'wb') as fh:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    fh.write(chunk)
+
+            digest = sha.hexdigest()
+            path = self.object_path(digest)
+
+            with self.__lock:
+                if os.path.exists(path):
+                    os.remove(tmp_path)
+                else:
+                    if not os.path.isdir(os.path.dirname(path)):
+                        os.makedirs(os.path.dirname(path))
+                    os.rename(tmp_path, path)
+                self.__record(url, digest)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return digest
+
+    def __record(self, url, digest):
+        self.__urls[url] = digest
+        with open(self.index_path, 'a') as fh:
+            fh.write('%s %s\n' % (digest, url))
+
+
+class AssetFetcher(object):
+    """ Download the images of content type instances into *cache*
+        with *workers* concurrent downloads. Each worker thread creates
+        its own ``requests.Session`` unless *session* is passed, which
+        then has to be safe to share between threads. At most
+        *workers* times two URLs are queued at a time and only the last
+        :py:attr:`RECENT_URLS` queued URLs are remembered, so apart from
+        the URL index of the cache, arbitrarily large iterables of
+        content can be fetched with bounded memory.
+    """
+
+    FIELDS = ('image_url', 'badge_url')
+    CHUNK_SIZE = 64 * 1024
+    RECENT_URLS = 10000
+
+    def __init__(self, cache, session=None, workers=8, fields=FIELDS,
+                 timeout=30):
+        self.cache = cache
+        self.__session = session
+        self.__local = threading.local()
+        self.workers = workers
+        self.fields = fields
+        self.timeout = timeout
+
+    @property
+    def session(self):
+        """ The ``requests.Session`` of the calling thread. """
+        if self.__session is not None:
+            return self.__session
+
+        session = getattr(self.__local, 'session', None)
+        if session is None:
+            session = self.__local.session = requests.Session()
+        return session
+
+    def fetch(self, items, on_error=None):
+        """ Download all images of *items* that are not in the cache.
+            URLs that are in the cache or among the recently queued URLs
+            are skipped. *on_error* is called with the URL and the
+            exception for each failed download. If *on_error* raises, no
+            further URLs are queued and the first of its exceptions is
+            raised once the queued downloads are finished.
+
+            Returns:
+                ``dict`` with the number of ``fetched``, ``skipped``
+                and ``failed`` URLs.
+        """
+        counts = {'fetched': 0, 'skipped': 0, 'failed': 0}
+        lock = threading.Lock()
+        queue = Queue(maxsize=self.workers * 2)
+        ## exceptions raised by on_error, a dying worker would leave the
+        ## queue full and block the producer forever
+        callback_errors = []
+
+        def work():
+            while True:
+                url = queue.get()
+                if url is None:
+                    break
+                outcome = 'failed'
+                try:
+                    self.download(url)
+                    outcome = 'fetched'
+                except Exception as exc:
+                    if on_error is not None:
+                        try:
+                            on_error(url, exc)
+                        except BaseException as callback_error:
+                            callback_errors.append(callback_error)
+                finally:
+                    with lock:
+                        counts[outcome] += 1
+
+        threads = [
+            threading.Thread(target=work) for __ in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        ## URLs queued but possibly not yet in the cache
+        recent = collections.OrderedDict()
+        try:
+            for item in items:
+                if callback_errors:
+                    break
+                for field in self.fields:
+                    url = getattr(item, field, None)
+                    if not url or url in recent:
+                        continue
+                    recent[url] = None
+                    if len(recent) > self.RECENT_URLS:
+                        recent.popitem(last=False)
+
+                    if url in self.cache:
+                        with lock:
+                            counts['skipped'] += 1
+                    else:
+                        queue.put(url)
+        finally:
+            for __ in threads:
+                queue.put(None)
+            for thread in threads:
+                thread.join()
+
+        if callback_errors:
+            raise callback_errors[0]
+        return counts
+
+    def download(self, url):
+        """ Download *url* into the cache and return its digest. """
+        response = self.session.get(url, stream=True, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+            return self.cache.store(
+                url, response.iter_content(self.CHUNK_SIZE))
+        finally:
+            response.close()
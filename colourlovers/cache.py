@@ -0,0 +1,249 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Persistent cache of API results shared between processes.
+
+A :py:class:`SQLiteCache` stores the parsed results of API requests in
+an SQLite database on local disk, encoded with
+:py:mod:`colourlovers.serialization`. SQLite handles concurrent readers
+and writers of several processes, e.g. the workers of a web server,
+that share the same file. The number of entries is bounded by evicting
+the least recently used ones and the cache can be warmed from a dump
+of crawled content.
+
+Reads do not write to the database: access times are collected in
+memory and written in batches together with the next write, so
+readers in several processes do not contend for the write lock. Each
+instance estimates the number of entries from its own writes and only
+counts them when the estimate exceeds *max_entries*. Writes of other
+processes are noticed at that point, so the cache can temporarily
+exceed *max_entries* by what they added in the meantime.
+
+Entries are encoded with msgpack. Without msgpack the cache falls back
+to pickle only if it is created with ``allow_pickle=True``: anyone able
+to write to the database file, or to a dump it is warmed from, could
+otherwise run code in every process reading it.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.cache import SQLiteCache
+    >>> cl = ColourLovers(cache=SQLiteCache('/var/cache/colourlovers.db'))
+    >>> cl.palette(1942043)  # sends a request
+    [<Palette id='1942043' title='Drinking Game 2'>]
+    >>> cl.palette(1942043)  # served from the cache
+    [<Palette id='1942043' title='Drinking Game 2'>]
+"""
+import sqlite3
+import threading
+import time
+
+from colourlovers import (
+    ColourLovers, ColourLoversError, Colour, Palette, Pattern, Lover)
+from colourlovers import serialization
+
+
+class SQLiteCache(object):
+    """ Cache of API results in the SQLite database at *path*. At most
+        *max_entries* results are kept and, if *ttl* is set, entries
+        older than *ttl* seconds are ignored. Pickled entries and dumps
+        are only read if *allow_pickle* is ``True``, which is required
+        if msgpack is not installed.
+    """
+
+    #: number of collected access times that triggers writing them
+    TOUCH_BATCH = 100
+
+    #: specific API method used to look up a single content type instance
+    SPECIFIC_METHODS = {
+        Colour: ('color', 'hex'),
+        Palette: ('palette', 'id'),
+        Pattern: ('pattern', 'id'),
+        Lover: ('lover', 'user_name'),
+    }
+
+    def __init__(self, path, max_entries=100000, ttl=None, timeout=30,
+                 allow_pickle=False):
+        if not allow_pickle and \
+                serialization.default_backend() == serialization.PICKLE:
+            raise ColourLoversError(
+                "msgpack is required for the cache unless "
+                "allow_pickle=True is passed")
+
+        self.path = path
+        self.allow_pickle = allow_pickle
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__touched = {}
+        self.__estimate = None
+
+        with self.connection as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' key TEXT PRIMARY KEY,'
+                ' value BLOB NOT NULL,'
+                ' created REAL NOT NULL,'
+                ' accessed REAL NOT NULL)')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS results_accessed'
+                ' ON results (accessed)')
+
+    @property
+    def connection(self):
+        """ Return the connection of the current thread. SQLite
+            connections must not be shared between threads.
+        """
+        conn = getattr(self.__local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.__local.connection = conn
+        return conn
+
+    def close(self):
+        """ Write collected access times and close the connection of
+            the current thread.
+        """
+        conn = getattr(self.__local, 'connection', None)
+        if conn is not None:
+            with conn:
+                self.__write_touched(conn)
+            conn.close()
+            self.__local.connection = None
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def get(self, key):
+        """ Return the list of results cached for *key* or ``None``. """
+        row = self.connection.execute(
+            'SELECT value, created FROM results WHERE key = ?',
+            (key,)).fetchone()
+        if row is None:
+            return None
+
+        value, created = row
+        now = time.time()
+        if self.ttl is not None and now - created > self.ttl:
+            return None
+
+        with self.__lock:
+            self.__touched[key] = now
+            flush = len(self.__touched) >= self.TOUCH_BATCH
+        if flush:
+            with self.connection as conn:
+                self.__write_touched(conn)
+        return serialization.decode_many(value, self.allow_pickle)
+
+    def __write_touched(self, conn):
+        with self.__lock:
+            touched, self.__touched = self.__touched, {}
+        if touched:
+            conn.executemany(
+                'UPDATE results SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in touched.items()])
+
+    def set(self, key, results):
+        """ Cache the list of *results* under *key*. """
+        self.set_many([(key, results)])
+
+    def set_many(self, items):
+        """ Cache all ``(key, results)`` pairs in *items* in a single
+            transaction and evict the least recently used entries if
+            the cache is full.
+        """
+        now = time.time()
+        rows = [
+            (key, sqlite3.Binary(serialization.encode_many(results)),
+             now, now)
+            for key, results in items]
+
+        with self.connection as conn:
+            self.__write_touched(conn)
+            conn.executemany(
+                'INSERT OR REPLACE INTO results'
+                ' (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                rows)
+            self.__evict(conn, len(rows))
+
+    def __evict(self, conn, added):
+        """ Evict the least recently used entries if the estimated
+            number of entries, counting replaced entries as new, exceeds
+            *max_entries*. A tenth of the entries is evicted at once so
+            that the entries are not counted on every write.
+        """
+        with self.__lock:
+            if self.__estimate is not None:
+                self.__estimate += added
+                if self.__estimate <= self.max_entries:
+                    return
+
+        count = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        if count > self.max_entries:
+            keep = self.max_entries - self.max_entries // 10
+            conn.execute(
+                'DELETE FROM results WHERE key IN ('
+                ' SELECT key FROM results ORDER BY accessed LIMIT ?)',
+                (count - keep,))
+            count = keep
+        with self.__lock:
+            self.__estimate = count
+
+    def delete(self, key):
+        with self.connection as conn:
+            conn.execute('DELETE FROM results WHERE key = ?', (key,))
+
+    def clear(self):
+        with self.__lock:
+            self.__touched.clear()
+            self.__estimate = 0
+        with self.connection as conn:
+            conn.execute('DELETE FROM results')
+
+    def warm(self, items, batch_size=1000):
+        """ Cache each content type instance in *items* under the key of
+            its specific lookup, e.g. ``cl.palette(id)`` for a palette.
+        """
+        batch = []
+        for item in items:
+            method, attr = self.SPECIFIC_METHODS[type(item)]
+            key = ColourLovers.cache_key(method, getattr(item, attr))
+            batch.append((key, [item]))
+
+            if len(batch) >= batch_size:
+                self.set_many(batch)
+                batch = []
+        if batch:
+            self.set_many(batch)
+
+    def warm_from_dump(self, path, batch_size=1000):
+        """ Warm the cache from the file at *path* containing content
+            encoded with :py:func:`serialization.encode_many`. The file
+            is decoded while it is read, see
+            :py:func:`serialization.iter_decode_many`.
+        """
+        with open(path, 'rb') as fh:
+            self.warm(
+                serialization.iter_decode_many(fh, self.allow_pickle),
+                batch_size)
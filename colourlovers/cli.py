@@ -0,0 +1,255 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Command line interface streaming ColourLovers results to stdout.
+
+Results are written as newline delimited JSON or CSV as soon as each
+page arrives, so arbitrarily large exports only keep a few pages in
+memory::
+
+    $ colourlovers palettes top hue_option=red --pages 50 > red.ndjson
+    $ colourlovers colors new --format csv --fields id,hex,title
+    $ colourlovers lover Alkalaiblue
+    $ colourlovers stats palettes
+"""
+import argparse
+import csv
+import errno
+import json
+import os
+import sys
+
+from multiprocessing.pool import ThreadPool
+
+from colourlovers import ColourLovers, ColourLoversError, DATE_FORMAT
+
+
+def to_json_value(value):
+    """ Convert *value* of a record into a JSON compatible value. """
+    if hasattr(value, 'strftime'):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(v) for v in value]
+    return value
+
+
+def to_row(item):
+    """ Return the record of content type *item* with JSON compatible
+        values.
+    """
+    return dict(
+        (key, to_json_value(value))
+        for key, value in item.to_record().items())
+
+
+def fetch_pages(client, method, argument, params, pages, page_size,
+                concurrency):
+    """ Yield the results of search *method* page by page. Up to
+        *concurrency* pages are requested at the same time, but pages
+        are yielded in order and no further pages are requested after
+        the first incomplete page.
+    """
+    search = getattr(client, method)
+
+    def fetch(page):
+        kwargs = dict(params)
+        kwargs.update(numResults=page_size, resultOffset=page * page_size)
+        return search(argument, **kwargs)
+
+    pool = ThreadPool(concurrency)
+    try:
+        pending = []
+        next_page = 0
+        while next_page < pages and len(pending) < concurrency:
+            pending.append(pool.apply_async(fetch, (next_page,)))
+            next_page += 1
+
+        while pending:
+            results = pending.pop(0).get()
+            yield results
+
+            if len(results) < page_size:
+                break
+            if next_page < pages:
+                pending.append(pool.apply_async(fetch, (next_page,)))
+                next_page += 1
+    finally:
+        pool.terminate()
+
+
+def query(client, args, params):
+    """ Yield lists of results for the query described by *args*. """
+    if args.method == 'stats':
+        yield [client.stats(args.argument)]
+    elif args.method in ['colors', 'palettes', 'patterns', 'lovers'] \
+            and args.argument != 'random':
+        for page in fetch_pages(client, args.method, args.argument, params,
+                                args.pages, args.page_size,
+                                args.concurrency):
+            yield page
+    else:
+        yield getattr(client, args.method)(args.argument, **params)
+
+
+class NDJSONWriter(object):
+
+    def __init__(self, stream, fields=None):
+        self.stream = stream
+        self.fields = fields
+
+    def write(self, item):
+        row = to_row(item)
+        if self.fields:
+            row = dict((field, row.get(field)) for field in self.fields)
+        self.stream.write(json.dumps(row, sort_keys=True))
+        self.stream.write('\n')
+
+
+class CSVWriter(object):
+    """ Write rows as CSV. The columns are *fields* or the keys of the
+        first row. Lists are joined with ',' and comments are written
+        as JSON.
+    """
+
+    def __init__(self, stream, fields=None):
+        self.stream = stream
+        self.fields = fields
+        self.writer = None
+
+    def write(self, item):
+        row = to_row(item)
+        if self.writer is None:
+            self.fields = self.fields or sorted(row)
+            self.writer = csv.writer(self.stream)
+            self.writer.writerow(self.fields)
+
+        values = []
+        for field in self.fields:
+            value = row.get(field)
+            if field == 'comments':
+                value = json.dumps(value)
+            elif isinstance(value, list):
+                value = ','.join(str(v) for v in value)
+            values.append('' if value is None else value)
+        self.writer.writerow(values)
+
+
+WRITERS = {'ndjson': NDJSONWriter, 'csv': CSVWriter}
+
+METHODS = ColourLovers.valid_methods()
+
+
+def parse_params(values):
+    """ Parse ``key=value`` pairs in *values* into a ``dict``. """
+    params = {}
+    for value in values:
+        key, sep, value = value.partition('=')
+        if not sep:
+            raise ColourLoversError("invalid parameter '%s'" % key)
+        params[key] = value
+    return params
+
+
+def silence(stream):
+    """ Point the file descriptor of *stream* to ``os.devnull`` so that
+        flushing it again at exit does not fail with a broken pipe.
+    """
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, IOError, ValueError):
+        return
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, fileno)
+    os.close(devnull)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='colourlovers',
+        description='Stream ColourLovers API results as NDJSON or CSV.')
+    parser.add_argument(
+        'method', choices=METHODS,
+        help='API method to query')
+    parser.add_argument(
+        'argument', nargs='?',
+        help="'new', 'top', 'random', an id, hex value, user name or "
+             "stat type")
+    parser.add_argument(
+        'params', nargs='*', metavar='key=value',
+        help='keyword arguments of the method, e.g. hue_option=red')
+    parser.add_argument(
+        '--format', choices=sorted(WRITERS), default='ndjson')
+    parser.add_argument(
+        '--fields', help='comma separated list of fields to output')
+    parser.add_argument(
+        '--pages', type=int, default=1,
+        help='maximum number of pages for search methods')
+    parser.add_argument(
+        '--page-size', type=int, default=100,
+        help='results per page, at most 100')
+    parser.add_argument(
+        '--concurrency', type=int, default=1,
+        help='number of pages requested at the same time')
+    return parser
+
+
+def main(argv=None, stdout=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stdout = stdout or sys.stdout
+
+    if not 1 <= args.page_size <= 100:
+        parser.error('--page-size must be between 1 and 100')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    # values of the form key=value end up in 'argument' if no argument
+    # was given, e.g. 'colourlovers palettes keywords=funky'
+    if args.argument is not None and '=' in args.argument:
+        args.params.insert(0, args.argument)
+        args.argument = None
+
+    try:
+        params = parse_params(args.params)
+        fields = args.fields.split(',') if args.fields else None
+        writer = WRITERS[args.format](stdout, fields)
+
+        for results in query(ColourLovers(), args, params):
+            for item in results:
+                writer.write(item)
+            stdout.flush()
+    except ColourLoversError as exc:
+        message = exc.args[0] if exc.args else ''
+        if len(exc.args) > 1:
+            message = message % exc.args[1:]
+        parser.exit(1, 'colourlovers: error: %s\n' % message)
+    except KeyboardInterrupt:
+        parser.exit(130)
+    except IOError as exc:
+        ## the reader went away, e.g. 'colourlovers ... | head'
+        if exc.errno != errno.EPIPE:
+            raise
+        silence(stdout)
+        parser.exit(141)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
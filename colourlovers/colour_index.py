@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+In-memory index of colours by their hex value.
+
+A :py:class:`ColourIndex` maps the RGB value of a colour, packed into a
+single integer, to the :py:class:`Colour` retrieved for it. Hex values
+are matched regardless of case and leading '#'. Passed to
+:py:class:`ColourLovers` as *colour_index*, ``cl.color(hex)`` is
+answered from the index when the colour is known and every colour
+retrieved from the API is added to it.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.colour_index import ColourIndex
+    >>> index = ColourIndex()
+    >>> cl = ColourLovers(colour_index=index)
+    >>> index.add(cl.colors('top', numResults=100))
+    >>> cl.color('#000000')  # answered from the index
+    [<Colour id='14' title='Black' rgb=(0, 0, 0)>]
+"""
+from colourlovers import Colour
+from colourlovers.utils import hex_to_int
+
+
+class ColourIndex(object):
+    """ Index of :py:class:`Colour` instances by hex value. """
+
+    def __init__(self, colours=()):
+        self.__colours = {}
+        self.add(colours)
+
+    def __len__(self):
+        return len(self.__colours)
+
+    def __contains__(self, hex_value):
+        return self.get(hex_value) is not None
+
+    @staticmethod
+    def key(hex_value):
+        """ Return the packed RGB integer for *hex_value* or ``None`` if
+            it is not a valid 6-digit hex colour.
+        """
+        value = str(hex_value).lstrip('#')
+        if len(value) != 6:
+            return None
+        try:
+            return hex_to_int(value)
+        except ValueError:
+            return None
+
+    def add(self, items):
+        """ Add all :py:class:`Colour` instances in *items* to the
+            index, other content types are ignored.
+        """
+        colours = self.__colours
+        for item in items:
+            if isinstance(item, Colour):
+                key = self.key(item.hex)
+                if key is not None:
+                    colours[key] = item
+
+    def get(self, hex_value, default=None):
+        """ Return the colour for *hex_value* or *default* if the colour
+            is not in the index.
+        """
+        key = self.key(hex_value)
+        if key is None:
+            return default
+        return self.__colours.get(key, default)
+
+    def discard(self, hex_value):
+        self.__colours.pop(self.key(hex_value), None)
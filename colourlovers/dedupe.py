@@ -0,0 +1,293 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Detection of near-duplicate palettes.
+
+Palettes that differ only by small shifts of their hex values, the order
+of their colours or slightly different colour widths are considered
+duplicates. Each palette is described by a colour histogram that does
+not depend on the order of its colours: every colour spreads its width
+over the corners of a coarse RGB grid it lies between, so a small shift
+of a colour only moves a small amount of weight. The distance of two
+palettes is half the L1 distance of their histograms, ``0`` for equal
+and ``1`` for entirely different palettes.
+
+Comparing every palette with all others is infeasible for large crawls.
+A :py:class:`Deduplicator` only compares palettes sharing a
+locality-sensitive key and verifies these candidates by their distance.
+The keys are bands of MinHash values of the grid cells of the colours
+on several shifted grids, so palettes share a key if most of their
+colours fall into the same cells. The number of palettes kept per key is
+capped, which bounds the comparisons per palette even for colours used
+in most palettes, like white. Memory is bounded by the number of
+representatives kept to compare new palettes with.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.dedupe import dedupe
+    >>> palettes = ColourLovers().palettes('top', numResults=100)
+    >>> unique = list(dedupe(palettes, threshold=0.1))
+"""
+import collections
+import random
+
+from colourlovers.utils import hex_to_rgb
+
+
+def palette_weights(palette):
+    """ Return the relative widths of the colours of *palette* adding up
+        to ``1``. Colours are equally wide if the palette has no valid
+        ``color_widths``.
+    """
+    colours = palette.colours
+    widths = getattr(palette, 'color_widths', None)
+    if not widths or len(widths) != len(colours):
+        widths = [1] * len(colours)
+
+    total = float(sum(widths))
+    if not total:
+        return [1.0 / len(colours)] * len(colours) if colours else []
+    return [width / total for width in widths]
+
+
+def palette_histogram(palette, levels=4):
+    """ Return the colour histogram of *palette* on a grid with *levels*
+        points per RGB channel as sparse ``dict`` mapping the index of a
+        grid point to its weight. The weights add up to ``1``.
+    """
+    step = 255.0 / (levels - 1)
+    histogram = {}
+    for colour, weight in zip(palette.colours, palette_weights(palette)):
+        corners = [(0, weight)]
+        for channel in hex_to_rgb(colour):
+            position = channel / step
+            index = min(int(position), levels - 2)
+            fraction = position - index
+
+            expanded = []
+            for corner, corner_weight in corners:
+                corner = corner * levels + index
+                if fraction < 1:
+                    expanded.append((corner, corner_weight * (1 - fraction)))
+                if fraction > 0:
+                    expanded.append((corner + 1, corner_weight * fraction))
+            corners = expanded
+
+        for corner, corner_weight in corners:
+            histogram[corner] = histogram.get(corner, 0.0) + corner_weight
+    return histogram
+
+
+def histogram_distance(first, second):
+    """ Return the distance of histograms *first* and *second* in the
+        range [0, 1].
+    """
+    distance = 0.0
+    for index, weight in first.items():
+        distance += abs(weight - second.get(index, 0.0))
+    for index, weight in second.items():
+        if index not in first:
+            distance += weight
+    return distance / 2
+
+
+def palette_distance(first, second, levels=4):
+    """ Return the distance of palettes *first* and *second*. """
+    return histogram_distance(
+        palette_histogram(first, levels), palette_histogram(second, levels))
+
+
+def cells(palette, bands=4, cell=32):
+    """ Return the set of grid cells of the colours of *palette* as
+        integers. Each of *bands* grids of *cell* sized cells is shifted
+        by ``cell / bands`` against the previous one and every colour is
+        placed on every grid. A shift of less than ``cell / bands``
+        crosses at most one cell boundary per channel, so with more
+        bands than the three channels a colour shifted by less than that
+        keeps its cell on at least one grid.
+    """
+    size = 256 // cell + 2
+    result = set()
+    for red, green, blue in (hex_to_rgb(c) for c in palette.colours):
+        for band in range(bands):
+            offset = band * cell // bands
+            result.add(((
+                band * size + (red + offset) // cell) * size +
+                (green + offset) // cell) * size + (blue + offset) // cell)
+    return result
+
+
+#: modulus of the hash functions of :py:func:`signatures`
+_PRIME = (1 << 61) - 1
+_HASHES = []
+
+
+def _hash_functions(count):
+    global _HASHES
+    if len(_HASHES) < count:
+        ## a fixed seed keeps signatures comparable between processes
+        rng = random.Random(0)
+        _HASHES = [
+            (rng.randint(1, _PRIME - 1), rng.randint(0, _PRIME - 1))
+            for __ in range(count)]
+    return _HASHES[:count]
+
+
+def signatures(palette, bands=4, cell=32, hash_bands=32, hash_rows=3):
+    """ Return the locality-sensitive keys of *palette*, one for each of
+        *hash_bands* bands of *hash_rows* MinHash values of its
+        :py:func:`cells`. Two palettes share the key of a band with the
+        probability ``J ** hash_rows``, where ``J`` is the Jaccard
+        similarity of their cells, so near-duplicates share at least one
+        key with high probability while unrelated palettes that only
+        share a colour or two rarely do.
+    """
+    elements = cells(palette, bands, cell)
+    if not elements:
+        return []
+
+    minimums = [
+        min((a * element + b) % _PRIME for element in elements)
+        for a, b in _hash_functions(hash_bands * hash_rows)]
+    return [
+        (band, tuple(minimums[band * hash_rows:(band + 1) * hash_rows]))
+        for band in range(hash_bands)]
+
+
+class Deduplicator(object):
+    """ Detect palettes that are near-duplicates of palettes added
+        before. Palettes with a distance of at most *threshold* to a
+        representative are duplicates of it. At most *max_representatives*
+        palettes are kept for comparison, the oldest ones are dropped
+        first, so duplicates far apart in the input may go undetected.
+        *hash_bands* and *hash_rows* are passed on to
+        :py:func:`signatures`. At most *max_bucket* representatives are
+        kept per key.
+    """
+
+    def __init__(self, threshold=0.1, levels=4, bands=4, cell=32,
+                 max_representatives=1000000, hash_bands=32, hash_rows=3,
+                 max_bucket=50):
+        self.threshold = threshold
+        self.levels = levels
+        self.bands = bands
+        self.cell = cell
+        self.max_representatives = max_representatives
+        self.hash_bands = hash_bands
+        self.hash_rows = hash_rows
+        self.max_bucket = max_bucket
+
+        self.duplicates = 0
+        self.comparisons = 0
+        self.__representatives = collections.OrderedDict()
+        self.__buckets = {}
+
+    def __len__(self):
+        return len(self.__representatives)
+
+    def find(self, palette):
+        """ Return the id of the representative *palette* is a duplicate
+            of or ``None``.
+        """
+        return self.__find(
+            palette_histogram(palette, self.levels), self.__keys(palette))
+
+    def __keys(self, palette):
+        return signatures(
+            palette, self.bands, self.cell, self.hash_bands, self.hash_rows)
+
+    def __find(self, histogram, keys):
+        seen = set()
+        for key in keys:
+            for candidate in self.__buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+
+                self.comparisons += 1
+                other = self.__representatives[candidate][0]
+                if histogram_distance(histogram, other) <= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, palette):
+        """ Add *palette* and return the id of the representative it is
+            a duplicate of. Returns ``None`` if *palette* is new, it then
+            becomes a representative itself.
+        """
+        histogram = palette_histogram(palette, self.levels)
+        keys = self.__keys(palette)
+
+        representative = self.__find(histogram, keys)
+        if representative is not None:
+            self.duplicates += 1
+            return representative
+
+        if palette.id in self.__representatives:
+            self.__discard(palette.id)
+        ## full buckets are not extended, the palette is still found
+        ## through its other keys
+        added = []
+        for key in keys:
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                bucket = self.__buckets[key] = collections.OrderedDict()
+            if len(bucket) < self.max_bucket:
+                bucket[palette.id] = None
+                added.append(key)
+        self.__representatives[palette.id] = (histogram, added)
+
+        while len(self.__representatives) > self.max_representatives:
+            self.__discard(next(iter(self.__representatives)))
+        return None
+
+    def __discard(self, palette_id):
+        histogram, keys = self.__representatives.pop(palette_id)
+        for key in keys:
+            bucket = self.__buckets[key]
+            del bucket[palette_id]
+            if not bucket:
+                del self.__buckets[key]
+
+
+def dedupe(palettes, threshold=0.1, **options):
+    """ Yield the palettes in iterable *palettes* that are not
+        near-duplicates of a palette yielded before. *options* are
+        passed on to :py:class:`Deduplicator`.
+    """
+    deduplicator = Deduplicator(threshold, **options)
+    for palette in palettes:
+        if deduplicator.add(palette) is None:
+            yield palette
+
+
+def collapse(palettes, threshold=0.1, **options):
+    """ Return a ``dict`` mapping the id of each representative in
+        *palettes* to the ids of its duplicates.
+    """
+    deduplicator = Deduplicator(threshold, **options)
+    clusters = collections.OrderedDict()
+    for palette in palettes:
+        representative = deduplicator.add(palette)
+        if representative is None:
+            clusters[palette.id] = []
+        else:
+            clusters[representative].append(palette.id)
+    return clusters
@@ -0,0 +1,221 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Graph of lovers and the content and colours they published.
+
+A :py:class:`LoverGraph` links the user name of each lover to their
+colours, palettes and patterns and to the colours used in them. Users
+and colours are stored as integers and adjacency lists as arrays, so
+large crawls fit into memory. Related content queries such as other
+palettes of a lover, colours commonly used together or lovers with a
+similar taste are answered without sending requests.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.graph import LoverGraph
+    >>> cl = ColourLovers()
+    >>> graph = LoverGraph(cl.palettes('top', numResults=100))
+    >>> graph.palettes('sugar!')
+    [<Palette id='629637' title='(◕„◕)'>]
+    >>> graph.similar_users('sugar!', n=3)
+    [('electrikmonk', 0.31), ('Yoshi_', 0.22), ('lunalein', 0.19)]
+"""
+import heapq
+import math
+
+from array import array
+
+from colourlovers import Colour, Palette, Pattern, Lover
+from colourlovers.utils import hex_to_int, item_colours
+
+
+def _hex(packed):
+    return '#%06x' % packed
+
+
+class LoverGraph(object):
+    """ Graph linking lovers to their content and colours. *items* are
+        content type instances to add initially.
+    """
+
+    __CONTENT_TYPES = (Colour, Palette, Pattern)
+
+    def __init__(self, items=()):
+        self.user_names = []
+        self.__users = {}
+        self.__lovers = {}
+
+        self.__content = dict((cls, {}) for cls in self.__CONTENT_TYPES)
+        self.__owned = dict((cls, {}) for cls in self.__CONTENT_TYPES)
+
+        ## user -> {colour: number of uses}
+        self.__usage = {}
+        ## colour -> users that used it
+        self.__colour_users = {}
+        ## colour -> palettes and patterns using it as indexes into
+        ## __colour_sets
+        self.__colour_sets_by_colour = {}
+        self.__colour_sets = []
+
+        self.add(items)
+
+    def __len__(self):
+        return len(self.user_names)
+
+    def __contains__(self, user_name):
+        return self.__user(user_name) is not None
+
+    def __user(self, user_name):
+        if user_name is None:
+            return None
+        return self.__users.get(user_name.lower())
+
+    def __intern(self, user_name):
+        key = user_name.lower()
+        user = self.__users.get(key)
+        if user is None:
+            user = self.__users[key] = len(self.user_names)
+            self.user_names.append(user_name)
+        return user
+
+    def add(self, items):
+        """ Add content type instances in *items*, content that has been
+            added before is ignored.
+        """
+        for item in items:
+            user_name = getattr(item, 'user_name', None)
+            if not user_name:
+                continue
+            user = self.__intern(user_name)
+
+            if isinstance(item, Lover):
+                self.__lovers[user] = item
+                continue
+
+            cls = type(item)
+            content = self.__content.get(cls)
+            if content is None or item.id in content:
+                continue
+            content[item.id] = item
+            self.__owned[cls].setdefault(user, array('l')).append(item.id)
+
+            colours = []
+            for colour in item_colours(item):
+                try:
+                    colours.append(hex_to_int(colour))
+                except ValueError:
+                    continue
+            self.__add_usage(user, colours)
+
+            if cls is not Colour and len(colours) > 1:
+                position = len(self.__colour_sets)
+                self.__colour_sets.append(array('l', colours))
+                for colour in set(colours):
+                    self.__colour_sets_by_colour.setdefault(
+                        colour, array('l')).append(position)
+
+    def __add_usage(self, user, colours):
+        usage = self.__usage.setdefault(user, {})
+        for colour in colours:
+            if colour not in usage:
+                usage[colour] = 0
+                self.__colour_users.setdefault(
+                    colour, array('l')).append(user)
+            usage[colour] += 1
+
+    def __items(self, cls, user_name):
+        user = self.__user(user_name)
+        content = self.__content[cls]
+        return [content[i] for i in self.__owned[cls].get(user, ())]
+
+    def lover(self, user_name):
+        """ Return the :py:class:`Lover` named *user_name* or ``None``. """
+        return self.__lovers.get(self.__user(user_name))
+
+    def colours(self, user_name):
+        """ Return the colours published by *user_name*. """
+        return self.__items(Colour, user_name)
+
+    def palettes(self, user_name):
+        """ Return the palettes published by *user_name*. """
+        return self.__items(Palette, user_name)
+
+    def patterns(self, user_name):
+        """ Return the patterns published by *user_name*. """
+        return self.__items(Pattern, user_name)
+
+    def colour_usage(self, user_name, n=None):
+        """ Return the colours used by *user_name* as list of
+            ``(hex, count)`` tuples, most used first. At most *n*
+            colours are returned if *n* is given.
+        """
+        usage = self.__usage.get(self.__user(user_name), {})
+        if n is None:
+            ranked = sorted(usage.items(), key=lambda i: (-i[1], i[0]))
+        else:
+            ranked = heapq.nsmallest(
+                n, usage.items(), key=lambda i: (-i[1], i[0]))
+        return [(_hex(colour), count) for colour, count in ranked]
+
+    def co_used_colours(self, hex_value, n=10):
+        """ Return up to *n* colours most often used together with
+            *hex_value* in the same palette or pattern as list of
+            ``(hex, count)`` tuples.
+        """
+        colour = hex_to_int(hex_value)
+        counts = {}
+        for position in self.__colour_sets_by_colour.get(colour, ()):
+            for other in set(self.__colour_sets[position]):
+                if other != colour:
+                    counts[other] = counts.get(other, 0) + 1
+
+        ranked = heapq.nsmallest(
+            n, counts.items(), key=lambda i: (-i[1], i[0]))
+        return [(_hex(other), count) for other, count in ranked]
+
+    def similar_users(self, user_name, n=10):
+        """ Return up to *n* users with the most similar colour usage to
+            *user_name* as list of ``(user_name, similarity)`` tuples.
+            The similarity is the cosine similarity of the colour usage
+            counts, only users sharing at least one colour are ranked.
+        """
+        user = self.__user(user_name)
+        usage = self.__usage.get(user)
+        if not usage:
+            return []
+
+        ## dot products with all users sharing a colour
+        dots = {}
+        for colour, count in usage.items():
+            for other in self.__colour_users[colour]:
+                if other != user:
+                    dots[other] = dots.get(other, 0) + \
+                        count * self.__usage[other][colour]
+
+        norm = self.__norm(user)
+        scores = [
+            (other, dot / (norm * self.__norm(other)))
+            for other, dot in dots.items()]
+        ranked = heapq.nlargest(n, scores, key=lambda i: (i[1], -i[0]))
+        return [(self.user_names[other], score) for other, score in ranked]
+
+    def __norm(self, user):
+        return math.sqrt(
+            sum(count * count for count in self.__usage[user].values()))
@@ -0,0 +1,207 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Generation of palettes from colour harmony rules and the colours used
+in existing palettes.
+
+Harmony rules rotate the hue of a base colour, e.g. by 180 degrees for
+its complementary colour. A :py:class:`HueHistogram` collects how much
+each hue is used in a set of palettes, weighted by colour widths and
+optionally by the popularity of a palette, and is used to sample base
+colours. Sampling uses precomputed cumulative weights, so generating a
+palette costs a few binary searches and HSV conversions.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.harmony import HueHistogram, PaletteGenerator
+    >>> palettes = ColourLovers().palettes('top', numResults=100)
+    >>> histogram = HueHistogram()
+    >>> histogram.add(palettes, weight=lambda p: p.num_votes)
+    >>> generator = PaletteGenerator(histogram)
+    >>> generator.generate(5, rule='triadic')
+    ['#c7472e', '#2ec747', '#472ec7', '#d1543b', '#7fbf40']
+"""
+import bisect
+import random
+
+from colourlovers import Colour, HSV
+from colourlovers.dedupe import palette_weights
+from colourlovers.utils import hex_to_hsv, hsv_to_hex
+
+#: Hue offsets in degrees of the colours of each harmony rule relative
+#: to the base colour.
+HARMONIES = {
+    'complementary': (0, 180),
+    'split_complementary': (0, 150, 210),
+    'triadic': (0, 120, 240),
+    'tetradic': (0, 90, 180, 270),
+    'analogous': (0, 30, 330),
+}
+
+
+def _hsv(colour):
+    """ Return *colour*, a hex colour code, ``(hue, saturation, value)``
+        tuple, :py:class:`HSV` or :py:class:`Colour`, as tuple.
+    """
+    if isinstance(colour, Colour):
+        if colour.hsv is None:
+            return hex_to_hsv(colour.hex)
+        colour = colour.hsv
+    if isinstance(colour, HSV):
+        return colour.hue, colour.saturation, colour.value
+    if isinstance(colour, tuple):
+        return colour
+    return hex_to_hsv(colour)
+
+
+def harmony(colour, rule):
+    """ Return the hex colours of harmony *rule* for *colour*, starting
+        with *colour* itself. *colour* is a hex colour code, a
+        ``(hue, saturation, value)`` tuple, an :py:class:`HSV` such as
+        ``Colour.hsv`` or a :py:class:`Colour`.
+    """
+    try:
+        offsets = HARMONIES[rule]
+    except KeyError:
+        raise ValueError("unknown harmony rule '%s'" % rule)
+
+    hue, saturation, value = _hsv(colour)
+    return [
+        hsv_to_hex(hue + offset, saturation, value) for offset in offsets]
+
+
+def harmonies(colours, rule):
+    """ Return the colours of harmony *rule* for each colour in
+        *colours* as list of lists.
+    """
+    return [harmony(colour, rule) for colour in colours]
+
+
+class HueHistogram(object):
+    """ Histogram of the hues used in palettes with *bins* bins over the
+        hue circle. Each bin also keeps the weighted mean saturation and
+        value of its colours, which sampled colours are given.
+    """
+
+    def __init__(self, bins=36):
+        self.bins = bins
+        self.weights = [0.0] * bins
+        self.__saturations = [0.0] * bins
+        self.__values = [0.0] * bins
+        self.__cumulative = None
+
+    def __len__(self):
+        return sum(1 for weight in self.weights if weight)
+
+    @property
+    def total(self):
+        return sum(self.weights)
+
+    def bin(self, hue):
+        """ Return the index of the bin of *hue* in degrees. """
+        return int(hue % 360 * self.bins // 360)
+
+    def add_colour(self, colour, weight=1.0):
+        """ Add *colour*, any colour accepted by :py:func:`harmony`,
+            with *weight*.
+        """
+        hue, saturation, value = _hsv(colour)
+        index = self.bin(hue)
+        self.weights[index] += weight
+        self.__saturations[index] += saturation * weight
+        self.__values[index] += value * weight
+        self.__cumulative = None
+
+    def add(self, palettes, weight=None):
+        """ Add the colours of *palettes* weighted by their colour widths.
+            *weight* is an optional function returning an additional
+            weight for each palette, e.g. its number of votes.
+        """
+        for palette in palettes:
+            factor = 1.0 if weight is None else weight(palette) or 0
+            if not factor:
+                continue
+            widths = palette_weights(palette)
+            for colour, width in zip(palette.colours, widths):
+                self.add_colour(colour, width * factor)
+
+    def colour(self, index):
+        """ Return the ``(hue, saturation, value)`` of bin *index*, the
+            hue is the centre of the bin.
+        """
+        weight = self.weights[index] or 1.0
+        return (
+            (index + 0.5) * 360.0 / self.bins,
+            self.__saturations[index] / weight,
+            self.__values[index] / weight,
+        )
+
+    def __prepare(self):
+        cumulative = []
+        total = 0.0
+        for weight in self.weights:
+            total += weight
+            cumulative.append(total)
+        if not total:
+            raise ValueError("cannot sample from an empty histogram")
+        self.__cumulative = cumulative
+
+    def sample(self, rng=random):
+        """ Return a random ``(hue, saturation, value)`` drawn with the
+            probability of its bin. The hue is uniformly distributed
+            within the bin.
+        """
+        if self.__cumulative is None:
+            self.__prepare()
+        cumulative = self.__cumulative
+
+        index = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+        index = min(index, self.bins - 1)
+        _, saturation, value = self.colour(index)
+        hue = (index + rng.random()) * 360.0 / self.bins
+        return hue, saturation, value
+
+
+class PaletteGenerator(object):
+    """ Generate palettes from the hue distribution in *histogram*. A
+        seeded ``random.Random`` can be passed as *rng* for repeatable
+        results.
+    """
+
+    def __init__(self, histogram, rng=None):
+        self.histogram = histogram
+        self.rng = rng or random.Random()
+
+    def generate(self, size=5, rule=None):
+        """ Return a palette of *size* hex colours. Without *rule* all
+            colours are sampled from the histogram. Otherwise the
+            palette starts with the colours of harmony *rule* for a
+            sampled base colour and is filled up with sampled colours.
+        """
+        colours = []
+        if rule is not None:
+            colours = harmony(self.histogram.sample(self.rng), rule)[:size]
+        while len(colours) < size:
+            colours.append(hsv_to_hex(*self.histogram.sample(self.rng)))
+        return colours
+
+    def generate_many(self, count, size=5, rule=None):
+        """ Return a list of *count* palettes, see :py:meth:`generate`. """
+        return [self.generate(size, rule) for _ in range(count)]
@@ -0,0 +1,190 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Index of colours and palettes by hue.
+
+A :py:class:`HueIndex` places content in buckets of a fixed number of
+degrees on the hue circle: colours by their hue, palettes and patterns
+by the hue of each of their colours. A bucket is accessed in constant
+time and ranges of adjacent hues, including ranges wrapping around
+360 degrees and the ``hueOption`` values of the API, are answered by
+scanning only the buckets they cover. Content is added incrementally,
+adding an item again replaces it.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers, Palette
+    >>> from colourlovers.hue_index import HueIndex
+    >>> cl = ColourLovers()
+    >>> index = HueIndex(cl.palettes('top', numResults=100))
+    >>> index.add(cl.colors('top', numResults=100))
+    >>> index.hue_option('red', content_class=Palette)
+    [<Palette id='92095' title='Giant Goldfish'>, ...]
+    >>> index.range(350, 20)
+    [<Colour id='14' title='Black' rgb=(0, 0, 0)>, ...]
+"""
+import collections
+
+from colourlovers.utils import HUE_OPTIONS, hex_to_hsv, item_colours
+
+
+def item_hues(item):
+    """ Return the set of hues of content type *item*. Colours use their
+        ``hsv`` attribute if they have one, all other hues are derived
+        from the hex values.
+    """
+    hsv = getattr(item, 'hsv', None)
+    if hsv is not None:
+        hue = hsv.hue if hasattr(hsv, 'hue') else hsv[0]
+        return set([int(hue) % 360])
+
+    hues = set()
+    for colour in item_colours(item):
+        try:
+            hues.add(hex_to_hsv(colour)[0])
+        except ValueError:
+            continue
+    return hues
+
+
+class HueIndex(object):
+    """ Index of content type instances in buckets of *bucket_size*
+        degrees of hue.
+    """
+
+    def __init__(self, items=(), bucket_size=10):
+        self.bucket_size = bucket_size
+        self.buckets = [
+            collections.OrderedDict()
+            for _ in range(-(-360 // bucket_size))]
+        self.__hues = {}
+        self.add(items)
+
+    def __len__(self):
+        return len(self.__hues)
+
+    @staticmethod
+    def key(item):
+        return (type(item).__name__, getattr(item, 'id', None)
+                or getattr(item, 'user_name', None))
+
+    def __contains__(self, item):
+        return self.key(item) in self.__hues
+
+    def bucket_of(self, hue):
+        """ Return the index of the bucket of *hue*. """
+        return int(hue) % 360 // self.bucket_size
+
+    def add(self, items):
+        """ Add content type instances in *items*. Items already in the
+            index are replaced, items without colours are ignored.
+        """
+        for item in items:
+            key = self.key(item)
+            if key in self.__hues:
+                self.__remove(key)
+
+            hues = item_hues(item)
+            if not hues:
+                continue
+            self.__hues[key] = hues
+            for hue in hues:
+                self.buckets[self.bucket_of(hue)][key] = item
+
+    def discard(self, item):
+        """ Remove *item* from the index if it is in it. """
+        key = self.key(item)
+        if key in self.__hues:
+            self.__remove(key)
+
+    def __remove(self, key):
+        for hue in self.__hues.pop(key):
+            self.buckets[self.bucket_of(hue)].pop(key, None)
+
+    def bucket(self, hue, content_class=None):
+        """ Return the items in the bucket of *hue*, optionally only
+            instances of *content_class*.
+        """
+        items = self.buckets[self.bucket_of(hue)].values()
+        if content_class is None:
+            return list(items)
+        return [item for item in items if isinstance(item, content_class)]
+
+    def range(self, start, end, content_class=None):
+        """ Return the items with a hue in range [*start*, *end*). The
+            range wraps around 360 degrees if *start* is greater than
+            *end*, e.g. ``range(350, 20)``. A range of 360 degrees or
+            more covers the whole circle and an empty range, e.g.
+            ``range(10, 10)``, returns no items. Each item is returned
+            once.
+        """
+        if end - start >= 360:
+            start, width = 0, 360
+        else:
+            start, width = start % 360, (end - start) % 360
+        if not width:
+            return []
+
+        end = start + width
+        if end <= 360:
+            spans = [(start, end)]
+        else:
+            spans = [(start, 360), (0, end - 360)]
+
+        found = collections.OrderedDict()
+        for low, high in spans:
+            for position in range(
+                    self.bucket_of(low), self.bucket_of(high - 1) + 1):
+                bucket_low = position * self.bucket_size
+                ## only buckets cut by the range need an exact check
+                exact = low <= bucket_low and \
+                    bucket_low + self.bucket_size <= high
+                for key, item in self.buckets[position].items():
+                    if key in found:
+                        continue
+                    if content_class is not None \
+                            and not isinstance(item, content_class):
+                        continue
+                    if exact or any(
+                            low <= hue < high for hue in self.__hues[key]):
+                        found[key] = item
+        return list(found.values())
+
+    def around(self, hue, width, content_class=None):
+        """ Return the items with a hue within *width* degrees of *hue*.
+            A *width* of 180 degrees or more covers the whole circle.
+        """
+        if width < 0:
+            raise ValueError("negative width %s" % width)
+        if width >= 180:
+            return self.range(0, 360, content_class)
+        return self.range(hue - width, hue + width + 1, content_class)
+
+    def hue_option(self, name, content_class=None):
+        """ Return the items matching the ``hueOption`` *name* of the
+            API, e.g. ``red``.
+        """
+        found = collections.OrderedDict()
+        for option, start, end in HUE_OPTIONS:
+            if option == name:
+                for item in self.range(start, end, content_class):
+                    found[self.key(item)] = item
+        if not found and name not in [o for o, _, _ in HUE_OPTIONS]:
+            raise ValueError("unknown hue option '%s'" % name)
+        return list(found.values())
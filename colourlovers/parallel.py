@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Parse ColourLovers responses in a pool of worker processes.
+
+Parsing the XML responses is CPU bound and holds the GIL, which limits
+a crawl that downloads in many threads to a single core for parsing.
+A :py:class:`ParsePool` ships the raw response content to worker
+processes and only sends compact records back to the caller, which are
+turned into content type instances without any further conversion.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.parallel import ParsePool
+    >>> pool = ParsePool(processes=4)
+    >>> cl = ColourLovers(parse_pool=pool)
+    >>> cl.palettes('top', numResults=100)
+    [<Palette id='92095' title='Giant Goldfish'>, ...]
+    >>> pool.close()
+"""
+import multiprocessing
+
+from colourlovers import ColourLovers, Stat
+
+
+def parse_records(method, content, errors=None, **options):
+    """ Parse the raw response *content* of API *method* into a list
+        of records as returned by :py:meth:`Base.to_record`. This is the
+        function executed in the worker processes.
+
+        Args:
+            *method (str)*: API method the response belongs to.
+            *content (bytes)*: raw XML content of the response.
+            *errors (list)*: skip invalid items and append an
+            :py:class:`ItemError` for each to *errors*, see
+            :py:meth:`ColourLovers.parse_elements`.
+            *options*: keyword arguments passed to ``from_xml``, e.g.
+            ``max_comments`` for lovers.
+
+        Returns:
+            ``list`` of records.
+    """
+    xml = ColourLovers._parse_content(content)
+
+    if method == 'stats':
+        return [Stat.from_xml(xml).to_record()]
+
+    return [
+        item.to_record() for item in
+        ColourLovers.parse_elements(method, xml, options, errors)
+    ]
+
+
+def parse_records_lenient(method, content, **options):
+    """ Parse *content* like :py:func:`parse_records` skipping invalid
+        items. Returns a tuple of the records and the list of
+        :py:class:`ItemError` for the skipped items.
+    """
+    errors = []
+    records = parse_records(method, content, errors, **options)
+    return records, errors
+
+
+def from_records(method, records):
+    """ Create content type instances for API *method* from *records*. """
+    class_name = ColourLovers.content_class(method)
+    return [class_name.from_record(record) for record in records]
+
+
+class ParsePool(object):
+    """ Pool of worker processes parsing raw ColourLovers responses.
+        The pool can be passed to :py:class:`ColourLovers` directly or
+        be used on its own to parse responses fetched elsewhere.
+    """
+
+    def __init__(self, processes=None):
+        """ Start a pool with *processes* worker processes. Defaults
+            to the number of CPUs.
+        """
+        self._pool = multiprocessing.Pool(processes)
+
+    def parse(self, method, content, errors=None, **options):
+        """ Parse *content* of API *method* in a worker process and
+            return the list of content type instances. The calling
+            thread blocks without holding the GIL while the worker
+            parses, so other threads can keep downloading. If *errors*
+            is a list, invalid items are skipped and appended to it.
+        """
+        if errors is None:
+            records = self._pool.apply(
+                parse_records, (method, content), options)
+        else:
+            records, item_errors = self._pool.apply(
+                parse_records_lenient, (method, content), options)
+            errors.extend(item_errors)
+        return from_records(method, records)
+
+    def parse_async(self, method, content, **options):
+        """ Submit *content* of API *method* for parsing and return
+            an ``AsyncResult`` whose ``get()`` returns the records.
+        """
+        return self._pool.apply_async(
+            parse_records, (method, content), options)
+
+    def parse_many(self, method, contents, chunksize=1):
+        """ Parse an iterable of raw *contents* for API *method* and
+            yield a list of content type instances for each of them in
+            the order of *contents*.
+        """
+        tasks = ((method, content) for content in contents)
+        for records in self._pool.imap(_parse_task, tasks, chunksize):
+            yield from_records(method, records)
+
+    def close(self):
+        """ Stop accepting work and wait for the workers to finish. """
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """ Stop the workers immediately. """
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parse_task(task):
+    return parse_records(*task)
@@ -0,0 +1,270 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Opt-in profiling of the stages of API calls.
+
+A :py:class:`Profiler` passed to :py:class:`colourlovers.ColourLovers`
+as *profiler* traces a random sample of API calls. A trace records the
+duration of each stage of the call: the cache lookup, the request up
+to the response headers, reading the XML, which downloads, decompresses
+and parses the body at once, and creating content type instances. With
+a parse pool, downloading the body and parsing it are separate stages.
+Optionally the creation of instances is profiled with ``cProfile`` to
+break it down by function, e.g. ``name_from_tag``, the converters and
+``strptime``. Calls that are not sampled only pay for a single random
+number.
+
+The traces can be written as collapsed stacks, the input format of
+flamegraph tools, or as Chrome trace events that can be opened in
+``chrome://tracing`` or Perfetto.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.profiling import Profiler
+    >>> profiler = Profiler(sample_rate=0.1)
+    >>> cl = ColourLovers(profiler=profiler)
+    >>> for page in range(100):
+    ...     cl.palettes('top', numResults=100, resultOffset=page * 100)
+    >>> with open('palettes.folded', 'w') as fh:
+    ...     profiler.dump_collapsed(fh)
+    >>> with open('palettes.json', 'w') as fh:
+    ...     profiler.dump_chrome_trace(fh)
+"""
+import collections
+import json
+import os
+import random
+import threading
+import time
+
+try:
+    import cProfile
+    import pstats
+except ImportError:
+    cProfile = None
+
+
+class Span(object):
+    """ A timed stage of a trace with the stages nested in it. """
+
+    __slots__ = ('name', 'start', 'duration', 'children', 'thread', 'calls')
+
+    def __init__(self, name, start, duration=0.0, thread=None, calls=None):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+        self.calls = calls
+        self.children = []
+
+    @property
+    def self_time(self):
+        """ Time spent in this span outside of its children. """
+        return max(
+            0.0, self.duration - sum(c.duration for c in self.children))
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+#: context manager doing nothing, used while no call is traced
+NULL_SPAN = _NullSpan()
+
+
+class _SpanContext(object):
+
+    def __init__(self, profiler, name, detail, root=False):
+        self.profiler = profiler
+        self.name = name
+        self.detail = detail
+        self.root = root
+        self.span = None
+        self.cprofile = None
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.span = Span(
+            self.name, time.time(), thread=threading.current_thread().ident)
+        if stack:
+            stack[-1].children.append(self.span)
+        stack.append(self.span)
+
+        if self.detail:
+            self.cprofile = self.profiler._start_cprofile()
+        return self.span
+
+    def __exit__(self, *exc_info):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+        span = self.span
+        span.duration = time.time() - span.start
+        self.profiler._stack().pop()
+
+        if self.cprofile is not None:
+            span.children.extend(
+                self.profiler._function_spans(self.cprofile, span))
+        if self.root:
+            self.profiler._finish(span)
+        return False
+
+
+class Profiler(object):
+    """ Trace a fraction *sample_rate* of API calls. If *detail* is
+        ``True`` the creation of content type instances in sampled calls
+        is profiled by function, listing the *functions* functions with
+        the highest own time. At most *max_traces* recent traces are
+        kept.
+    """
+
+    def __init__(self, sample_rate=0.01, detail=True, functions=15,
+                 max_traces=1000, rng=None):
+        self.sample_rate = sample_rate
+        self.detail = detail and cProfile is not None
+        self.functions = functions
+        self.traces = collections.deque(maxlen=max_traces)
+        self.rng = rng or random.Random()
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self.__local, 'stack', None)
+        if stack is None:
+            stack = self.__local.stack = []
+        return stack
+
+    def trace(self, name):
+        """ Return a context manager tracing the call *name* if it is
+            sampled.
+        """
+        if self._stack() or self.rng.random() >= self.sample_rate:
+            return NULL_SPAN
+        return _SpanContext(self, name, False, root=True)
+
+    def span(self, name, detail=False):
+        """ Return a context manager timing stage *name* of the current
+            trace, profiling it by function if *detail* is ``True``.
+            Does nothing if the current call is not traced.
+        """
+        if not self._stack():
+            return NULL_SPAN
+        return _SpanContext(self, name, detail and self.detail)
+
+    def _finish(self, span):
+        with self.__lock:
+            self.traces.append(span)
+
+    def _start_cprofile(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            ## another profiler is active
+            return None
+        return profile
+
+    def _function_spans(self, profile, parent):
+        stats = pstats.Stats(profile).stats
+        functions = sorted(
+            stats.items(), key=lambda item: item[1][2], reverse=True)
+
+        spans = []
+        start = parent.start
+        for (filename, _, function), values in functions[:self.functions]:
+            calls, total_time = values[1], values[2]
+            if filename == '~':
+                name = function
+            else:
+                name = '%s:%s' % (os.path.basename(filename), function)
+            spans.append(Span(
+                name, start, total_time, parent.thread, calls))
+            start += total_time
+        return spans
+
+    def clear(self):
+        with self.__lock:
+            self.traces.clear()
+
+    def collapsed(self):
+        """ Return the own time of each stack of stages over all traces
+            in microseconds as ``dict`` mapping the stack, names joined
+            with ';', to the time.
+        """
+        totals = {}
+
+        def walk(span, prefix):
+            stack = prefix + (span.name.replace(';', ','),)
+            key = ';'.join(stack)
+            totals[key] = totals.get(key, 0) + span.self_time * 1e6
+            for child in span.children:
+                walk(child, stack)
+
+        with self.__lock:
+            traces = list(self.traces)
+        for trace in traces:
+            walk(trace, ())
+        return totals
+
+    def dump_collapsed(self, fh):
+        """ Write the collapsed stacks to file object *fh*, one
+            ``stack microseconds`` line per stack.
+        """
+        for stack, micros in sorted(self.collapsed().items()):
+            if int(micros):
+                fh.write('%s %d\n' % (stack, int(micros)))
+
+    def chrome_trace(self):
+        """ Return the traces as Chrome trace event ``dict``. Function
+            spans of a profiled stage are aggregated over the stage and
+            laid out one after another.
+        """
+        events = []
+        pid = os.getpid()
+
+        def walk(span):
+            event = {
+                'name': span.name,
+                'ph': 'X',
+                'ts': span.start * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': pid,
+                'tid': span.thread,
+            }
+            if span.calls is not None:
+                event['args'] = {'calls': span.calls}
+            events.append(event)
+            for child in span.children:
+                walk(child)
+
+        with self.__lock:
+            traces = list(self.traces)
+        for trace in traces:
+            walk(trace)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, fh):
+        """ Write the traces as Chrome trace JSON to file object *fh*. """
+        json.dump(self.chrome_trace(), fh)
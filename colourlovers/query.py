@@ -0,0 +1,248 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Query content that has been retrieved from ColourLovers locally.
+
+A :py:class:`LocalQueryEngine` holds colours, palettes, patterns and
+lovers and answers searches with the same methods and keyword arguments
+as :py:class:`colourlovers.ColourLovers` without sending a request.
+Filters are evaluated against inverted indexes on keywords, user names,
+hues and hex values that are updated whenever content is added.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.query import LocalQueryEngine
+    >>> cl = ColourLovers()
+    >>> engine = LocalQueryEngine(cl.palettes('top', numResults=100))
+    >>> engine.palettes('top', keywords='funky', hue_option='red')
+    [<Palette id='1940972' title='"Funky President"'>]
+"""
+import heapq
+import random
+import re
+
+from colourlovers import (
+    ColourLovers, ColourLoversError, Colour, Palette, Pattern, Lover)
+from colourlovers.utils import (
+    hex_to_hsv, hue_option, item_colours, normalise_hex)
+
+
+class LocalQueryEngine(object):
+    """ In-process search over content retrieved from ColourLovers. The
+        search methods ``colors``, ``palettes``, ``patterns`` and
+        ``lovers`` accept the arguments ``new``, ``top`` and ``random``
+        and the keyword arguments ``keywords``, ``keywordExact``,
+        ``hueOption``, ``hex``, ``lover``, ``orderCol``, ``sortBy``,
+        ``numResults`` and ``resultOffset`` in camel case or with
+        underscores like :py:class:`colourlovers.ColourLovers`.
+    """
+
+    __CLASSES = {
+        'colors': Colour,
+        'palettes': Palette,
+        'patterns': Pattern,
+        'lovers': Lover,
+    }
+
+    #: attributes lovers are ordered by in place of those of the other
+    #: content types, lovers have no votes and a registration date
+    __LOVER_ORDER = {
+        'new': 'date_registered',
+        'top': 'rating',
+        'dateCreated': 'date_registered',
+        'score': 'rating',
+        'name': 'user_name',
+    }
+
+    def __init__(self, items=()):
+        self.__collections = dict(
+            (cls, _Collection(
+                self.__LOVER_ORDER if cls is Lover else None))
+            for cls in self.__CLASSES.values())
+        self.add(items)
+
+    def add(self, items):
+        """ Add content type *items* to the engine. Items that have been
+            added before, identified by their ``id``, are replaced.
+        """
+        for item in items:
+            self.__collections[type(item)].add(item)
+
+    def __len__(self):
+        return sum(len(c) for c in self.__collections.values())
+
+    def __getattr__(self, method):
+        if method not in self.__CLASSES:
+            raise ColourLoversError("invalid local method '%s'" % method)
+
+        def proxy(argument=None, **kwargs):
+            return self.search(method, argument, **kwargs)
+
+        return proxy
+
+    def search(self, method, argument=None, **kwargs):
+        """ Search the content of search *method* with *argument* and
+            filters in *kwargs*, e.g. ``search('palettes', 'top',
+            keywords='funky')``.
+
+            Returns:
+                ``list`` of matching content type instances.
+        """
+        if argument not in [None, 'new', 'top', 'random']:
+            raise ColourLoversError(
+                "%s is invalid argument for '%s'" % (argument, method))
+
+        collection = self.__collections[self.__CLASSES[method]]
+        return collection.search(
+            argument, ColourLovers.convert_keywords(kwargs))
+
+
+class _Collection(object):
+    """ Content of a single content type with its inverted indexes.
+        *order* overrides the attributes results are ordered by for the
+        arguments ``new`` and ``top`` and the values of ``orderCol``.
+    """
+
+    __WORD_SPLIT = re.compile(r'[\w\']+', re.UNICODE)
+
+    __ORDER = {
+        'new': 'date_created',
+        'top': 'num_votes',
+        'dateCreated': 'date_created',
+        'score': 'rank',
+        'name': 'title',
+        'numVotes': 'num_votes',
+        'numViews': 'num_views',
+    }
+
+    def __init__(self, order=None):
+        self.order = dict(self.__ORDER)
+        self.order.update(order or {})
+        self.items = {}
+        self.keywords = {}
+        self.titles = {}
+        self.lovers = {}
+        self.hues = {}
+        self.hexes = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        key = item.id if hasattr(item, 'id') else item.user_name
+        if key in self.items:
+            self.remove(key)
+        self.items[key] = item
+
+        for index, value in self.index_values(item):
+            index.setdefault(value, set()).add(key)
+
+    def remove(self, key):
+        for index, value in self.index_values(self.items.pop(key)):
+            keys = index[value]
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def index_values(self, item):
+        title = (getattr(item, 'title', None) or '').lower()
+        user_name = (getattr(item, 'user_name', None) or '').lower()
+
+        words = set(self.__WORD_SPLIT.findall(title or user_name))
+        for word in words:
+            yield self.keywords, word
+        if title:
+            yield self.titles, title
+        if user_name:
+            yield self.lovers, user_name
+
+        colours = set(normalise_hex(c) for c in item_colours(item))
+        for colour in colours:
+            yield self.hexes, colour
+        for hue in set(hue_option(hex_to_hsv(c)[0]) for c in colours):
+            yield self.hues, hue
+
+    def search(self, argument, params):
+        candidates = self.filter(params)
+
+        if argument == 'random':
+            keys = list(candidates if candidates is not None else self.items)
+            return [self.items[random.choice(keys)]] if keys else []
+
+        offset = int(params.get('resultOffset', 0))
+        limit = min(int(params.get('numResults', 20)), 100)
+
+        if argument in ('new', 'top'):
+            attr, descending = self.order[argument], True
+        else:
+            attr = self.order.get(
+                params.get('orderCol'), self.order['dateCreated'])
+            descending = str(params.get('sortBy', 'ASC')).upper() == 'DESC'
+
+        def sort_key(key):
+            value = getattr(self.items[key], attr, None)
+            return (value is not None, value)
+
+        select = heapq.nlargest if descending else heapq.nsmallest
+        keys = candidates if candidates is not None else self.items
+        keys = select(offset + limit, keys, key=sort_key)
+
+        return [self.items[key] for key in keys[offset:]]
+
+    def filter(self, params):
+        """ Return the set of keys matching all filters in *params* or
+            ``None`` if no filter applies.
+        """
+        lookups = []
+
+        keywords = params.get('keywords')
+        if keywords:
+            keywords = str(keywords).replace('+', ' ').lower()
+            if str(params.get('keywordExact', 0)) == '1':
+                lookups.append([self.titles.get(keywords, set())])
+            else:
+                for word in self.__WORD_SPLIT.findall(keywords):
+                    lookups.append([self.keywords.get(word, set())])
+
+        lover = params.get('lover')
+        if lover:
+            lookups.append([self.lovers.get(str(lover).lower(), set())])
+
+        hues = params.get('hueOption')
+        if hues:
+            lookups.append([
+                self.hues.get(hue.strip(), set())
+                for hue in str(hues).lower().split(',')])
+
+        hexes = params.get('hex')
+        if hexes:
+            for value in str(hexes).split(','):
+                lookups.append([
+                    self.hexes.get(normalise_hex(value.strip()), set())])
+
+        if not lookups:
+            return None
+
+        # the alternatives of each filter are combined, the filters are
+        # intersected starting with the most selective one
+        matches = sorted(
+            (set().union(*alternatives) for alternatives in lookups),
+            key=len)
+        return matches[0].intersection(*matches[1:])
@@ -0,0 +1,222 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Buffer random content so that it can be served without a request.
+
+A request for ``random`` content returns a single item and takes a
+full round trip. A :py:class:`RandomPool` keeps a bounded buffer of
+random items per content type. Whenever a buffer runs low, worker
+threads refill it with concurrent requests in the background. Callers
+are served from the buffer and only wait for a request if it is empty.
+The pool counts hits and misses per content type.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.random_pool import RandomPool
+    >>> pool = RandomPool(ColourLovers(), size=20, workers=4)
+    >>> pool.start()
+    >>> pool.get('palettes')
+    <Palette id='391644' title='acanalado'>
+    >>> pool.hit_rate('palettes')
+    0.98
+    >>> pool.stop()
+"""
+import collections
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from colourlovers import ColourLoversError
+
+
+class RandomPool(object):
+    """ Buffer up to *size* random items for each API method in
+        *methods* retrieved through *client*. Buffers are refilled by
+        *workers* threads once they hold *low_water* items or less,
+        which defaults to half of *size*. A worker waits *retry_delay*
+        seconds after a failed request.
+    """
+
+    METHODS = ('colors', 'palettes', 'patterns', 'lovers')
+
+    def __init__(self, client, size=10, workers=4, methods=METHODS,
+                 low_water=None, retry_delay=1.0):
+        self.client = client
+        self.size = size
+        self.workers = workers
+        self.low_water = size // 2 if low_water is None else low_water
+        self.retry_delay = retry_delay
+
+        self.__buffers = dict(
+            (method, collections.deque()) for method in methods)
+        self.__pending = dict.fromkeys(methods, 0)
+        self.__counts = dict(
+            (method, {'hits': 0, 'misses': 0, 'failures': 0})
+            for method in methods)
+        self.__lock = threading.Lock()
+        self.__tasks = Queue()
+        self.__threads = []
+        self.__stop = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def __buffer(self, method):
+        try:
+            return self.__buffers[method]
+        except KeyError:
+            raise ColourLoversError(
+                "random pool does not buffer '%s'", method)
+
+    def buffered(self, method):
+        """ Return the number of items buffered for *method*. """
+        return len(self.__buffer(method))
+
+    def start(self):
+        """ Start the worker threads and fill all buffers. """
+        if self.__threads:
+            return
+        self.__stop.clear()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self.__work)
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+        for method in self.__buffers:
+            self.__refill(method)
+
+    def stop(self, timeout=None):
+        """ Stop the worker threads. Requests in progress are finished
+            but their items are discarded.
+        """
+        if not self.__threads:
+            return
+        self.__stop.set()
+        for _ in self.__threads:
+            self.__tasks.put(None)
+        for thread in self.__threads:
+            thread.join(timeout)
+        self.__threads = []
+
+        with self.__lock:
+            for method in self.__pending:
+                self.__pending[method] = 0
+            while not self.__tasks.empty():
+                self.__tasks.get()
+
+    def get(self, method):
+        """ Return a random item for *method*, e.g. ``palettes``. A
+            buffered item is returned if there is one, otherwise a
+            request is sent in the calling thread.
+        """
+        buffer = self.__buffer(method)
+        try:
+            item = buffer.popleft()
+            hit = True
+        except IndexError:
+            hit = False
+
+        with self.__lock:
+            self.__counts[method]['hits' if hit else 'misses'] += 1
+
+        if len(buffer) <= self.low_water:
+            self.__refill(method)
+
+        if not hit:
+            item = self.__fetch(method)
+        return item
+
+    def __fetch(self, method):
+        results = getattr(self.client, method)('random')
+        if not results:
+            raise ColourLoversError("no random result for '%s'", method)
+        return results[0]
+
+    def __refill(self, method):
+        if not self.__threads:
+            return
+
+        with self.__lock:
+            needed = self.size - len(self.__buffers[method]) \
+                - self.__pending[method]
+            if needed <= 0:
+                return
+            self.__pending[method] += needed
+
+        for _ in range(needed):
+            self.__tasks.put(method)
+
+    def __work(self):
+        while True:
+            method = self.__tasks.get()
+            if method is None or self.__stop.is_set():
+                return
+
+            try:
+                item = self.__fetch(method)
+            except (Exception, ColourLoversError):
+                item = None
+
+            with self.__lock:
+                self.__pending[method] = max(0, self.__pending[method] - 1)
+                if item is None:
+                    self.__counts[method]['failures'] += 1
+                elif self.__stop.is_set():
+                    ## finished after stop(), which discards the item
+                    return
+                elif len(self.__buffers[method]) < self.size:
+                    self.__buffers[method].append(item)
+
+            if item is None and not self.__stop.wait(self.retry_delay):
+                self.__refill(method)
+
+    def hit_rate(self, method=None):
+        """ Return the fraction of calls to :py:meth:`get` served from
+            the buffer of *method* or of all methods, ``None`` if there
+            have been no calls.
+        """
+        methods = [method] if method is not None else list(self.__counts)
+        with self.__lock:
+            hits = sum(self.__counts[m]['hits'] for m in methods)
+            misses = sum(self.__counts[m]['misses'] for m in methods)
+        if not hits + misses:
+            return None
+        return float(hits) / (hits + misses)
+
+    def stats(self):
+        """ Return the hits, misses, failed requests, hit rate and
+            number of buffered items per method as ``dict``.
+        """
+        stats = {}
+        for method in self.__counts:
+            with self.__lock:
+                counts = dict(self.__counts[method])
+            counts['buffered'] = len(self.__buffers[method])
+            counts['hit_rate'] = self.hit_rate(method)
+            stats[method] = counts
+        return stats
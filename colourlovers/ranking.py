@@ -0,0 +1,160 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Maintain top-N rankings over results of many search queries.
+
+Results are streamed from the API page by page and merged into bounded
+heaps, so memory only grows with the size of the rankings and not with
+the number of results scanned.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.ranking import leaderboards
+    >>> boards = leaderboards(
+    ...     ColourLovers(), 'palettes',
+    ...     {'red': {'hueOption': 'red'}, 'blue': {'hueOption': 'blue'}},
+    ...     n=3, key='num_hearts')
+    >>> boards['red']
+    [<Palette id='92095' title='Giant Goldfish'>, ...]
+"""
+import heapq
+import itertools
+
+from colourlovers import ColourLoversError
+
+
+class TopN(object):
+    """ Bounded collection of the *n* best content type instances
+        according to attribute *key*. Items are identified by their
+        ``id`` so that an item returned by several queries is only
+        ranked once.
+    """
+
+    #: attributes for which a lower value ranks higher
+    ASCENDING_KEYS = ['rank']
+
+    VALID_KEYS = ['rank', 'num_votes', 'num_views', 'num_hearts']
+
+    def __init__(self, n, key='num_votes'):
+        if key not in self.VALID_KEYS:
+            raise ColourLoversError("cannot rank by '%s'" % key)
+        if n < 1:
+            raise ColourLoversError("cannot keep the top %s items" % n)
+
+        self.n = n
+        self.key = key
+        self.__sign = -1 if key in self.ASCENDING_KEYS else 1
+        self.__heap = []
+        self.__ids = set()
+        self.__counter = itertools.count()
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def score(self, item):
+        """ Return the score of *item*, higher is better. """
+        value = getattr(item, self.key, None)
+        if value is None:
+            return float('-inf')
+        return self.__sign * value
+
+    def push(self, item):
+        """ Add *item* to the ranking if it is among the best *n* items.
+
+            Returns:
+                ``True`` if *item* has been added.
+        """
+        if item.id in self.__ids:
+            return False
+
+        # the counter breaks ties in favour of items seen first and
+        # prevents comparing the items themselves
+        entry = (self.score(item), -next(self.__counter), item.id, item)
+
+        if len(self.__heap) < self.n:
+            heapq.heappush(self.__heap, entry)
+        elif entry > self.__heap[0]:
+            removed = heapq.heapreplace(self.__heap, entry)
+            self.__ids.discard(removed[2])
+        else:
+            return False
+
+        self.__ids.add(item.id)
+        return True
+
+    def extend(self, items):
+        """ Push all *items* into the ranking. """
+        for item in items:
+            self.push(item)
+
+    def threshold(self):
+        """ Return the score an item has to beat to enter the ranking
+            or ``None`` while the ranking is not full.
+        """
+        if len(self.__heap) < self.n:
+            return None
+        return self.__heap[0][0]
+
+    def items(self):
+        """ Return the ranked items, best first. """
+        return [entry[3] for entry in sorted(self.__heap, reverse=True)]
+
+
+def iter_results(client, method, query, argument='top', pages=1,
+                 page_size=100):
+    """ Yield the results of search *method* with keyword arguments in
+        *query* page by page for up to *pages* pages.
+    """
+    search = getattr(client, method)
+    for page in range(pages):
+        params = dict(query)
+        params.update(numResults=page_size, resultOffset=page * page_size)
+
+        results = search(argument, **params)
+        for item in results:
+            yield item
+
+        if len(results) < page_size:
+            break
+
+
+def top_n(client, method, queries, n=10, key='num_votes', **kwargs):
+    """ Return the *n* best results of search *method* by *key* across
+        all *queries*, a list of ``dict`` with keyword arguments for
+        the search. Additional *kwargs* are passed to
+        :py:func:`iter_results`.
+    """
+    ranking = TopN(n, key)
+    for query in queries:
+        ranking.extend(iter_results(client, method, query, **kwargs))
+    return ranking.items()
+
+
+def leaderboards(client, method, queries, n=10, key='num_votes', **kwargs):
+    """ Return a separate ranking for each query in *queries*, a ``dict``
+        mapping a label to the keyword arguments of the search. The
+        result maps each label to the list of its *n* best results.
+    """
+    boards = {}
+    for label, query in queries.items():
+        ranking = TopN(n, key)
+        ranking.extend(iter_results(client, method, query, **kwargs))
+        boards[label] = ranking.items()
+    return boards
@@ -0,0 +1,214 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Render palette images locally instead of downloading them.
+
+The images behind ``Palette.image_url`` are strips of the palette's
+colours scaled by their ``color_widths``. This module renders the same
+strips from :py:attr:`Palette.colours` into raw RGB buffers or PNG
+files. Patterns are rendered as a swatch of equally wide stripes of
+their colours, as the pattern artwork itself is not part of the API
+response.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.render import render_png
+    >>> palette = ColourLovers().palette(1942043)[0]
+    >>> with open('palette.png', 'wb') as fh:
+    ...     fh.write(render_png(palette, width=300, height=100))
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+
+from colourlovers import ColourLoversError, Pattern
+from colourlovers.utils import hex_to_rgb
+
+#: zlib level for PNG data, strips are highly repetitive and compress
+#: well with the fastest level
+COMPRESSION_LEVEL = 1
+
+
+def stripe_widths(widths, width):
+    """ Return the widths of the stripes in pixels for relative *widths*
+        so that they add up to *width* exactly.
+    """
+    total = float(sum(widths)) or 1.0
+
+    pixels = []
+    position = 0.0
+    previous = 0
+    for relative in widths:
+        position += relative
+        boundary = int(round(position / total * width))
+        pixels.append(boundary - previous)
+        previous = boundary
+    return pixels
+
+
+def render_row(colours, widths, width):
+    """ Return a single row of *width* RGB pixels as ``bytes`` with a
+        stripe for each hex colour in *colours* scaled by *widths*.
+    """
+    parts = []
+    for colour, pixels in zip(colours, stripe_widths(widths, width)):
+        parts.append(bytearray(hex_to_rgb(colour)) * pixels)
+    return bytes(bytearray().join(parts))
+
+
+def _strip_row(item, width):
+    colours = item.colours
+    if not colours:
+        raise ColourLoversError(
+            "cannot render %s %s without colours" % (
+                type(item).__name__.lower(), getattr(item, 'id', None)))
+    widths = None
+    if not isinstance(item, Pattern):
+        widths = getattr(item, 'color_widths', None)
+    if not widths or len(widths) != len(colours):
+        widths = [1] * len(colours)
+    return render_row(colours, widths, width)
+
+
+def render_palette(palette, width=300, height=100):
+    """ Render *palette* into a raw RGB buffer of *width* x *height*
+        pixels, three bytes per pixel, row by row. The colours are
+        scaled by ``color_widths`` if the palette has them.
+
+        Returns:
+            RGB pixel data as ``bytes``.
+    """
+    return _strip_row(palette, width) * height
+
+
+def render_pattern(pattern, width=300, height=100):
+    """ Render a swatch of *pattern* with equally wide stripes of its
+        colours into a raw RGB buffer like :py:func:`render_palette`.
+    """
+    return _strip_row(pattern, width) * height
+
+
+def encode_png(rgb, width, height):
+    """ Encode the raw *rgb* buffer of *width* x *height* pixels as a
+        8 bit truecolour PNG image.
+
+        Returns:
+            PNG image as ``bytes``.
+    """
+    stride = width * 3
+    rows = bytearray()
+    for offset in range(0, stride * height, stride):
+        # filter type 0 (None) for every scanline
+        rows += b'\x00'
+        rows += rgb[offset:offset + stride]
+    return _encode_png_rows(bytes(rows), width, height)
+
+
+def _encode_png_rows(rows, width, height):
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(rows, COMPRESSION_LEVEL)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
+def _png_chunk(chunk_type, data):
+    checksum = zlib.crc32(chunk_type + data) & 0xffffffff
+    return struct.pack('>I', len(data)) + chunk_type + data + \
+        struct.pack('>I', checksum)
+
+
+def render_png(item, width=300, height=100, cache=None):
+    """ Render palette or pattern *item* as PNG image. If a
+        :py:class:`RenderCache` is given as *cache*, images are only
+        rendered once for the same colours and size.
+
+        Returns:
+            PNG image as ``bytes``.
+    """
+    if cache is not None:
+        key = cache.key(item, width, height)
+        png = cache.get(key)
+        if png is not None:
+            return png
+
+    # all rows of a strip are identical, so a single filtered row is
+    # rendered and repeated instead of slicing a full RGB buffer
+    row = _strip_row(item, width)
+    png = _encode_png_rows((b'\x00' + row) * height, width, height)
+
+    if cache is not None:
+        cache.set(key, png)
+    return png
+
+
+class RenderCache(object):
+    """ Cache rendered PNG images as files in directory *root*. Images
+        are keyed by their colours, colour widths and size.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        if not os.path.isdir(root):
+            os.makedirs(root)
+
+    @staticmethod
+    def key(item, width, height):
+        """ Return the cache key for rendering *item* at *width* x
+            *height* pixels.
+        """
+        widths = getattr(item, 'color_widths', None) or []
+        description = '%s|%s|%s|%dx%d' % (
+            type(item).__name__,
+            ','.join(item.colours),
+            ','.join('%g' % w for w in widths),
+            width, height)
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + '.png')
+
+    def get(self, key):
+        """ Return the cached PNG for *key* or ``None``. """
+        try:
+            with open(self.path(key), 'rb') as fh:
+                return fh.read()
+        except IOError:
+            return None
+
+    def set(self, key, png):
+        """ Store *png* under *key*. """
+        path = self.path(key)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(handle, 'wb') as fh:
+                fh.write(png)
+            getattr(os, 'replace', os.rename)(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
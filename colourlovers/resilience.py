@@ -0,0 +1,184 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Helpers keeping requests to a degraded API from stalling the caller.
+
+* :py:class:`CircuitBreaker` fails fast after a number of consecutive
+  errors and lets a single probe request through after a reset timeout.
+* :py:class:`LatencyTracker` keeps a window of recent request latencies
+  to derive a percentile from.
+* :py:func:`hedged` sends a duplicate request if the first one has not
+  completed after a delay and returns whichever finishes first. Results
+  of the slower requests can be released with a *discard* callback.
+
+They are configured through the constructor of
+:py:class:`colourlovers.ColourLovers`.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.resilience import CircuitBreaker
+    >>> cl = ColourLovers(
+    ...     timeout=5,
+    ...     circuit_breaker=CircuitBreaker(failure_threshold=3),
+    ...     hedge_percentile=95)
+    >>> cl.palette(1942043)
+    [<Palette id='1942043' title='Drinking Game 2'>]
+"""
+import collections
+import threading
+import time
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+class CircuitBreaker(object):
+    """ Open the circuit after *failure_threshold* consecutive failures.
+        While open, :py:meth:`allow` rejects requests until
+        *reset_timeout* seconds have passed, then a single probe request
+        is allowed (half open). A successful probe closes the circuit, a
+        failed one opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.__probing = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.__probing or \
+                time.time() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """ Return ``True`` if a request may be sent. """
+        if self.opened_at is None:
+            return True
+
+        with self.__lock:
+            if self.__probing:
+                return False
+            if time.time() - self.opened_at < self.reset_timeout:
+                return False
+            self.__probing = True
+            return True
+
+    def record_success(self):
+        with self.__lock:
+            self.failures = 0
+            self.opened_at = None
+            self.__probing = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.failures += 1
+            if self.__probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+            self.__probing = False
+
+
+class LatencyTracker(object):
+    """ Keep the latencies of the last *window* requests. """
+
+    def __init__(self, window=200):
+        self.__latencies = collections.deque(maxlen=window)
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__latencies)
+
+    def record(self, latency):
+        with self.__lock:
+            self.__latencies.append(latency)
+
+    def percentile(self, percent):
+        """ Return the *percent* percentile of the recorded latencies or
+            ``None`` if nothing has been recorded.
+        """
+        ## copying the deque while another thread appends would fail
+        with self.__lock:
+            latencies = sorted(self.__latencies)
+        if not latencies:
+            return None
+        position = int(round(percent / 100.0 * (len(latencies) - 1)))
+        return latencies[position]
+
+
+def hedged(func, delay, attempts=2, discard=None):
+    """ Call *func* and, if it has not returned after *delay* seconds,
+        call it again in parallel, up to *attempts* calls in total. The
+        result of the first call to succeed is returned. If all calls
+        fail, the exception of the last one to fail is raised. Calls
+        still running are not cancelled, *discard* is called with the
+        results of other successful calls, e.g. to close them.
+    """
+    results = Queue()
+    lock = threading.Lock()
+    state = {'returned': False}
+
+    def run():
+        try:
+            value = func()
+        except BaseException as exc:
+            results.put((False, exc))
+            return
+
+        with lock:
+            returned = state['returned']
+            state['returned'] = True
+        if not returned:
+            results.put((True, value))
+        elif discard is not None:
+            discard(value)
+
+    started = 0
+    finished = 0
+    while True:
+        if started < attempts:
+            thread = threading.Thread(target=run)
+            thread.daemon = True
+            thread.start()
+            started += 1
+
+        timeout = delay if started < attempts else None
+        try:
+            ok, value = results.get(timeout=timeout)
+        except Exception:
+            # no result within delay, start another attempt
+            continue
+
+        finished += 1
+        if ok:
+            return value
+        if finished == attempts:
+            raise value
@@ -0,0 +1,277 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Compact binary serialisation of content type instances.
+
+Every instance is encoded as a list of its field values in a fixed
+order per class instead of a ``dict`` of attribute names, with dates
+stored as seconds since the epoch. The encoded data is prefixed with a
+header holding the schema version and the backend used: ``msgpack`` if
+it is installed, ``pickle`` with its highest protocol otherwise.
+
+Decoding pickled data can run arbitrary code, so it is refused unless
+``allow_pickle=True`` is passed. Only allow it for data written by a
+trusted source, never for data received from other services or users.
+msgpack data is safe to decode from any source.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers import serialization
+    >>> palettes = ColourLovers().palettes('top', numResults=100)
+    >>> data = serialization.encode_many(palettes)
+    >>> serialization.decode_many(data)
+    [<Palette id='92095' title='Giant Goldfish'>, ...]
+"""
+import pickle
+
+from datetime import datetime, timedelta
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from colourlovers import (
+    ColourLoversError, Colour, Palette, Pattern, Lover, Stat, RGB, HSV,
+    Comment)
+
+
+SCHEMA_VERSION = 1
+
+MAGIC = b'CLV'
+
+MSGPACK = b'm'
+PICKLE = b'p'
+
+EPOCH = datetime(1970, 1, 1)
+
+_CONTENT_FIELDS = (
+    'id', 'title', 'user_name', 'num_views', 'num_votes', 'num_comments',
+    'num_hearts', 'rank', 'date_created', 'description', 'url',
+    'image_url', 'badge_url', 'api_url',
+)
+
+#: Type code and field order of each class in schema version 1. Fields
+#: must only ever be appended to keep older data readable.
+SCHEMA = {
+    Colour: (1, _CONTENT_FIELDS + ('hex', 'rgb', 'hsv')),
+    Palette: (2, _CONTENT_FIELDS + ('colours', 'color_widths')),
+    Pattern: (3, _CONTENT_FIELDS + ('colours',)),
+    Lover: (4, (
+        'id', 'user_name', 'date_registered', 'date_last_active', 'rating',
+        'location', 'num_colors', 'num_palettes', 'num_patterns',
+        'num_comments_made', 'num_lovers', 'num_comments_on_profile',
+        'comments', 'url', 'api_url',
+    )),
+    Stat: (5, ('total',)),
+    RGB: (6, ('red', 'green', 'blue')),
+    HSV: (7, ('hue', 'saturation', 'value')),
+    Comment: (8, ('comment_date', 'comment_user_name', 'comment_comments')),
+}
+
+_CLASSES = dict((code, (cls, fields)) for cls, (code, fields) in
+                SCHEMA.items())
+
+_DATE_FIELDS = frozenset([
+    'date_created', 'date_registered', 'date_last_active', 'comment_date'])
+
+
+def _encode_date(value):
+    delta = value - EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def _decode_date(value):
+    return EPOCH + timedelta(seconds=value)
+
+
+def _encode_comments(comments):
+    return [
+        [_encode_date(date), user_name, text]
+        for date, user_name, text in comments]
+
+
+def _decode_comments(comments):
+    return [
+        (_decode_date(date), user_name, text)
+        for date, user_name, text in comments]
+
+
+_ENCODERS = {'comments': _encode_comments, 'rgb': list, 'hsv': list}
+_DECODERS = {'comments': _decode_comments, 'rgb': tuple, 'hsv': tuple}
+for _field in _DATE_FIELDS:
+    _ENCODERS[_field] = _encode_date
+    _DECODERS[_field] = _decode_date
+
+_MISSING = object()
+
+
+def pack(obj):
+    """ Return *obj*, an instance of a class in :py:data:`SCHEMA`, as
+        list of its type code, a bit mask of the fields it has, the
+        field values and optionally a ``dict`` of unknown attributes.
+    """
+    code, fields = SCHEMA[type(obj)]
+
+    if isinstance(obj, (RGB, HSV, Comment)):
+        record = dict((field, getattr(obj, field)) for field in fields)
+    else:
+        record = obj.to_record()
+
+    mask = 0
+    packed = [code, 0]
+    for position, field in enumerate(fields):
+        value = record.pop(field, _MISSING)
+        if value is _MISSING:
+            continue
+        mask |= 1 << position
+
+        if value is not None and field in _ENCODERS:
+            value = _ENCODERS[field](value)
+        packed.append(value)
+
+    packed[1] = mask
+    if record:
+        packed.append(record)
+    return packed
+
+
+def unpack(packed):
+    """ Create an instance from *packed* as returned by :py:func:`pack`.
+    """
+    code, mask = packed[0], packed[1]
+    cls, fields = _CLASSES[code]
+
+    record = {}
+    position = 2
+    for bit, field in enumerate(fields):
+        if not mask & (1 << bit):
+            continue
+        value = packed[position]
+        position += 1
+
+        if value is not None and field in _DECODERS:
+            value = _DECODERS[field](value)
+        record[field] = value
+
+    if position < len(packed):
+        record.update(packed[position])
+
+    if cls in (RGB, HSV, Comment):
+        return cls(*[record[field] for field in fields])
+    return cls.from_record(record)
+
+
+def default_backend():
+    """ Return the backend used for encoding, ``msgpack`` if it is
+        available, ``pickle`` otherwise.
+    """
+    return MSGPACK if msgpack is not None else PICKLE
+
+
+def _dumps(data, backend):
+    if backend == MSGPACK:
+        if msgpack is None:
+            raise ColourLoversError("msgpack is not installed")
+        return msgpack.packb(data, use_bin_type=True)
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(payload, backend, allow_pickle=False):
+    if backend == MSGPACK:
+        if msgpack is None:
+            raise ColourLoversError(
+                "msgpack is required to decode this data")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if backend == PICKLE:
+        if not allow_pickle:
+            raise ColourLoversError(
+                "refusing to decode pickled data, pass allow_pickle=True "
+                "if it comes from a trusted source")
+        return pickle.loads(payload)
+    raise ColourLoversError("unknown serialisation backend %r" % backend)
+
+
+def _header(backend):
+    return MAGIC + bytearray([SCHEMA_VERSION]) + backend
+
+
+def _payload(data):
+    data = bytes(data)
+    if data[:3] != MAGIC:
+        raise ColourLoversError("data is not serialised content")
+
+    version = bytearray(data[3:4])[0]
+    if version > SCHEMA_VERSION:
+        raise ColourLoversError(
+            "cannot decode schema version %d" % version)
+    return data[4:5], data[5:]
+
+
+def encode(obj, backend=None):
+    """ Encode a single instance *obj* into ``bytes``. """
+    backend = backend or default_backend()
+    return bytes(_header(backend)) + _dumps(pack(obj), backend)
+
+
+def decode(data, allow_pickle=False):
+    """ Decode a single instance from *data* created by
+        :py:func:`encode`. Pickled data is only decoded if
+        *allow_pickle* is ``True``.
+    """
+    backend, payload = _payload(data)
+    return unpack(_loads(payload, backend, allow_pickle))
+
+
+def encode_many(objs, backend=None):
+    """ Encode the instances in iterable *objs* into a single buffer. """
+    backend = backend or default_backend()
+    return bytes(_header(backend)) + _dumps(
+        [pack(obj) for obj in objs], backend)
+
+
+def decode_many(data, allow_pickle=False):
+    """ Decode the list of instances in *data* created by
+        :py:func:`encode_many`. Pickled data is only decoded if
+        *allow_pickle* is ``True``.
+    """
+    backend, payload = _payload(data)
+    return [
+        unpack(packed)
+        for packed in _loads(payload, backend, allow_pickle)]
+
+
+def iter_decode_many(fh, allow_pickle=False, chunk_size=64 * 1024):
+    """ Yield the instances created by :py:func:`encode_many` from file
+        object *fh*. msgpack data is read in chunks of *chunk_size*
+        bytes and decoded one instance at a time, pickled data can only
+        be loaded as a whole. Pickled data is only decoded if
+        *allow_pickle* is ``True``.
+    """
+    backend, __ = _payload(fh.read(len(_header(MSGPACK))))
+    if backend != MSGPACK or msgpack is None:
+        for packed in _loads(fh.read(), backend, allow_pickle):
+            yield unpack(packed)
+        return
+
+    unpacker = msgpack.Unpacker(
+        fh, read_size=chunk_size, raw=False, strict_map_key=False)
+    for __ in range(unpacker.read_array_header()):
+        yield unpack(unpacker.unpack())
@@ -0,0 +1,268 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Find the most similar palettes of one collection in another.
+
+:py:func:`similarity_join` matches every palette of a small *left*
+collection, e.g. a set of brand palettes, against a large *right*
+collection, e.g. millions of crawled palettes, and returns the *k*
+closest matches per left palette. The distance is the histogram
+distance of :py:mod:`colourlovers.dedupe`, independent of colour order.
+
+The right collection is consumed in chunks, so it can be a generator
+reading from disk. Palettes are turned into their array form, a dense
+colour histogram per palette, and distances are computed block by
+block with ``numpy`` if it is installed, keeping each block below a
+memory ceiling. Chunks can be processed in several processes.
+
+Usage example::
+
+    >>> from colourlovers.similarity import similarity_join
+    >>> matches = similarity_join(brand_palettes, crawled_palettes, k=3)
+    >>> matches[0]
+    [(1942043, 0.04), (629637, 0.07), (92095, 0.11)]
+"""
+import heapq
+import itertools
+import multiprocessing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from colourlovers.dedupe import histogram_distance, palette_histogram
+
+
+def palette_vector(palette, levels=4):
+    """ Return the dense colour histogram of *palette* as list of
+        ``levels ** 3`` weights.
+    """
+    vector = [0.0] * levels ** 3
+    for index, weight in palette_histogram(palette, levels).items():
+        vector[index] = weight
+    return vector
+
+
+def palette_array(palettes, levels=4):
+    """ Return the array form of *palettes*, a ``numpy`` array with one
+        dense colour histogram per row.
+    """
+    if numpy is None:
+        raise ImportError("numpy is required for the array form")
+    return numpy.array(
+        [palette_vector(palette, levels) for palette in palettes],
+        dtype=numpy.float32).reshape(-1, levels ** 3)
+
+
+def _is_palette(item):
+    return hasattr(item, 'colours')
+
+
+def _prepare(items, levels, use_numpy):
+    """ Return vectors of *items*, palettes or vectors, in the form used
+        for computing distances: an array with ``numpy``, a list of
+        sparse histograms otherwise.
+    """
+    if use_numpy:
+        if isinstance(items, numpy.ndarray):
+            return items.astype(numpy.float32, copy=False)
+        return numpy.array([
+            palette_vector(item, levels) if _is_palette(item) else item
+            for item in items], dtype=numpy.float32).reshape(-1, levels ** 3)
+
+    sparse = []
+    for item in items:
+        if _is_palette(item):
+            sparse.append(palette_histogram(item, levels))
+        else:
+            sparse.append(dict(
+                (index, float(weight))
+                for index, weight in enumerate(item) if weight))
+    return sparse
+
+
+def _chunks(right, chunk_size):
+    """ Yield ``(items, keys)`` for chunks of *right*. Keys are palette
+        ids or positions in *right* for vectors.
+    """
+    if numpy is not None and isinstance(right, numpy.ndarray):
+        for start in range(0, len(right), chunk_size):
+            chunk = right[start:start + chunk_size]
+            yield chunk, list(range(start, start + len(chunk)))
+        return
+
+    position = 0
+    iterator = iter(right)
+    while True:
+        items = list(itertools.islice(iterator, chunk_size))
+        if not items:
+            return
+        keys = [
+            item.id if _is_palette(item) else position + offset
+            for offset, item in enumerate(items)]
+        position += len(items)
+        yield items, keys
+
+
+def _topk_numpy(left, right, keys, k, max_memory):
+    """ Return the distances and keys of the *k* closest rows of
+        *right* for each row of *left* as two arrays.
+    """
+    dims = left.shape[1]
+    keys = numpy.asarray(keys)
+    rows = max(1, int(max_memory // max(1, len(right) * dims * 4)))
+
+    distances = []
+    indexes = []
+    for start in range(0, len(left), rows):
+        block = left[start:start + rows]
+        block_distances = numpy.abs(
+            block[:, None, :] - right[None, :, :]).sum(axis=2) / 2
+        if block_distances.shape[1] > k:
+            nearest = numpy.argpartition(block_distances, k - 1, axis=1)
+            nearest = nearest[:, :k]
+            block_distances = numpy.take_along_axis(
+                block_distances, nearest, axis=1)
+        else:
+            nearest = numpy.tile(
+                numpy.arange(block_distances.shape[1]), (len(block), 1))
+        distances.append(block_distances)
+        indexes.append(keys[nearest])
+    return numpy.concatenate(distances), numpy.concatenate(indexes)
+
+
+def _topk_python(left, right, keys, k):
+    return [
+        heapq.nsmallest(k, (
+            (histogram_distance(histogram, other), key)
+            for other, key in zip(right, keys)))
+        for histogram in left]
+
+
+class _Matches(object):
+    """ Top *k* matches per left item merged over all chunks. """
+
+    def __init__(self, size, k, use_numpy):
+        self.k = k
+        self.use_numpy = use_numpy
+        if use_numpy:
+            self.distances = numpy.empty((size, 0), dtype=numpy.float32)
+            self.keys = numpy.empty((size, 0), dtype=object)
+        else:
+            self.best = [[] for _ in range(size)]
+
+    def merge(self, result):
+        if not self.use_numpy:
+            for position, matches in enumerate(result):
+                self.best[position] = heapq.nsmallest(
+                    self.k, self.best[position] + matches)
+            return
+
+        distances, keys = result
+        distances = numpy.concatenate([self.distances, distances], axis=1)
+        keys = numpy.concatenate([self.keys, keys.astype(object)], axis=1)
+        if distances.shape[1] > self.k:
+            nearest = numpy.argpartition(distances, self.k - 1, axis=1)
+            nearest = nearest[:, :self.k]
+            distances = numpy.take_along_axis(distances, nearest, axis=1)
+            keys = numpy.take_along_axis(keys, nearest, axis=1)
+        self.distances, self.keys = distances, keys
+
+    def results(self):
+        if not self.use_numpy:
+            return [
+                [(key, distance) for distance, key in sorted(matches)]
+                for matches in self.best]
+
+        results = []
+        for distances, keys in zip(self.distances, self.keys):
+            order = numpy.argsort(distances, kind='mergesort')
+            results.append([
+                (keys[i], float(distances[i])) for i in order])
+        return results
+
+
+def _join_chunk(chunk, left, k, levels, max_memory, use_numpy):
+    items, keys = chunk
+    right = _prepare(items, levels, use_numpy)
+    if use_numpy:
+        return _topk_numpy(left, right, keys, k, max_memory)
+    return _topk_python(left, right, keys, k)
+
+
+## state of worker processes, set by _init_worker; joins in the calling
+## process pass their state to _join_chunk instead
+_worker = {}
+
+
+def _init_worker(left, k, levels, max_memory, use_numpy):
+    _worker.update(
+        left=left, k=k, levels=levels, max_memory=max_memory,
+        use_numpy=use_numpy)
+
+
+def _join_worker_chunk(chunk):
+    return _join_chunk(chunk, **_worker)
+
+
+def similarity_join(left, right, k=5, levels=4, chunk_size=10000,
+                    max_memory=64 * 1024 * 1024, processes=None):
+    """ Return the *k* closest items of *right* for each item of *left*.
+
+        Args:
+            *left*: palettes or their array form.
+            *right*: iterable of palettes or their array form. It is
+            consumed in chunks of *chunk_size* items.
+            *k (int)*: number of matches per left item.
+            *levels (int)*: grid points per RGB channel of histograms.
+            *max_memory (int)*: approximate ceiling in bytes of the
+            distance block computed at once for each chunk.
+            *processes (int)*: number of worker processes, chunks are
+            processed in the calling process by default.
+
+        Returns:
+            ``list`` with a list of ``(key, distance)`` tuples per left
+            item, closest first. The key is the id of a right palette
+            or the position of a vector in *right*.
+    """
+    use_numpy = numpy is not None
+    left = _prepare(left, levels, use_numpy)
+    matches = _Matches(len(left), k, use_numpy)
+    state = (left, k, levels, max_memory, use_numpy)
+
+    chunks = _chunks(right, chunk_size)
+    if not processes:
+        for chunk in chunks:
+            matches.merge(_join_chunk(chunk, *state))
+        return matches.results()
+
+    pool = multiprocessing.Pool(processes, _init_worker, state)
+    try:
+        ## keep a bounded number of chunks in flight
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.apply_async(_join_worker_chunk, (chunk,)))
+            if len(pending) >= 2 * processes:
+                matches.merge(pending.pop(0).get())
+        for result in pending:
+            matches.merge(result.get())
+    finally:
+        pool.terminate()
+    return matches.results()
@@ -0,0 +1,193 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Cache the ColourLovers stats and get notified when they change.
+
+:py:meth:`ColourLovers.stats` sends a request every time it is called.
+A :py:class:`StatsManager` retrieves the totals of all content types
+concurrently, keeps them in an immutable snapshot that readers access
+without locking and refreshes it after a given interval, either on
+access or in a background thread. Subscribers are called for every
+total that changed between two snapshots.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.stats import StatsManager
+    >>> stats = StatsManager(ColourLovers(), interval=60)
+    >>> stats.subscribe(lambda stat_type, old, new: log(stat_type, new))
+    >>> stats.get('palettes')
+    <Stat total='4213394'>
+    >>> stats.totals()
+    {'colors': 8133117, 'lovers': 1113083, 'patterns': 2096087, ...}
+"""
+import threading
+import time
+
+from colourlovers import ColourLoversError
+
+
+class StatsManager(object):
+    """ Cache the stats of all content types of *client* for *interval*
+        seconds.
+    """
+
+    STAT_TYPES = ('colors', 'lovers', 'patterns', 'palettes')
+
+    def __init__(self, client, interval=60, stat_types=STAT_TYPES):
+        self.client = client
+        self.interval = interval
+        self.stat_types = stat_types
+
+        #: number of failed requests per stat type
+        self.failures = dict((stat_type, 0) for stat_type in stat_types)
+        #: the latest error per stat type that failed to load
+        self.errors = {}
+
+        # (timestamp, {stat_type: Stat}), replaced as a whole on refresh
+        self.__snapshot = (0, {})
+        self.__refresh_lock = threading.Lock()
+        self.__subscribers = []
+        self.__stop = None
+
+    @property
+    def snapshot(self):
+        """ Return the current stats as ``dict`` of stat type to
+            :py:class:`Stat`. The ``dict`` must not be modified.
+        """
+        return self.__snapshot[1]
+
+    def is_stale(self):
+        """ Return ``True`` if the snapshot is older than *interval*. """
+        return time.time() - self.__snapshot[0] >= self.interval
+
+    def get(self, stat_type):
+        """ Return the :py:class:`Stat` of *stat_type* or ``None`` if it
+            has not been loaded yet. Stale stats are refreshed first if
+            no other thread is refreshing them already, otherwise the
+            latest snapshot is used. Only the first call waits for a
+            refresh running in another thread.
+        """
+        if stat_type not in self.stat_types:
+            raise ColourLoversError("invalid stat type '%s'" % stat_type)
+
+        if self.is_stale():
+            self.refresh(blocking=not self.snapshot)
+        return self.snapshot.get(stat_type)
+
+    def totals(self):
+        """ Return the totals of all stat types as ``dict``. """
+        if self.is_stale():
+            self.refresh(blocking=not self.snapshot)
+        return dict(
+            (stat_type, stat.total)
+            for stat_type, stat in self.snapshot.items())
+
+    def subscribe(self, callback):
+        """ Call *callback* with the stat type, the old and the new
+            :py:class:`Stat` whenever a total changes. The old stat is
+            ``None`` on the first refresh.
+        """
+        self.__subscribers = self.__subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        self.__subscribers = [
+            c for c in self.__subscribers if c is not callback]
+
+    def refresh(self, blocking=True):
+        """ Retrieve the stats of all types concurrently and replace the
+            snapshot. Stat types that fail to load keep their previous
+            value, their failures are counted in :py:attr:`failures` and
+            the error is kept in :py:attr:`errors`. If another thread is
+            refreshing, the call returns immediately unless *blocking* is
+            set; a blocking call that waited for another thread to
+            refresh the snapshot uses that snapshot unless it is stale.
+
+            Returns:
+                ``True`` if the snapshot was refreshed by this call.
+        """
+        refreshed = self.__snapshot[0]
+        if not self.__refresh_lock.acquire(blocking):
+            return False
+
+        try:
+            if self.__snapshot[0] != refreshed and not self.is_stale():
+                return False
+
+            stats = {}
+            errors = {}
+
+            def fetch(stat_type):
+                try:
+                    stats[stat_type] = self.client.stats(stat_type)
+                except (Exception, ColourLoversError) as exc:
+                    errors[stat_type] = exc
+
+            threads = [
+                threading.Thread(target=fetch, args=(stat_type,))
+                for stat_type in self.stat_types]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for stat_type, exc in errors.items():
+                self.failures[stat_type] = self.failures.get(stat_type, 0) + 1
+                self.errors[stat_type] = exc
+
+            old = self.snapshot
+            new = dict(old)
+            new.update(stats)
+            self.__snapshot = (time.time(), new)
+        finally:
+            self.__refresh_lock.release()
+
+        self.__notify(old, new)
+        return True
+
+    def __notify(self, old, new):
+        for stat_type, stat in new.items():
+            previous = old.get(stat_type)
+            if previous is not None and previous.total == stat.total:
+                continue
+            for callback in self.__subscribers:
+                callback(stat_type, previous, stat)
+
+    def start(self):
+        """ Refresh the stats every *interval* seconds in a background
+            thread until :py:meth:`stop` is called.
+        """
+        if self.__stop is not None:
+            return
+        self.__stop = stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                self.refresh()
+                stop.wait(self.interval)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """ Stop refreshing the stats in the background. """
+        if self.__stop is not None:
+            self.__stop.set()
+            self.__stop = None
@@ -0,0 +1,216 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Incrementally synchronise the ``new`` feeds of ColourLovers.
+
+Polling ``cl.palettes('new')`` repeatedly returns pages that mostly
+contain content that has been seen before. A :py:class:`FeedSync`
+remembers the newest ``id`` and ``date_created`` seen for each method,
+the *watermark*, and only pages through the feed until it reaches known
+content. Watermarks can be persisted in a JSON file to survive restarts.
+
+If more content was added than fits into *max_pages* pages, the
+watermark is kept and the range of the feed delivered so far is
+remembered instead. The next syncs skip that range and continue with
+the older content until the watermark is reached, so nothing is lost.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> from colourlovers.sync import FeedSync
+    >>> feed = FeedSync(ColourLovers(), path='watermarks.json')
+    >>> feed.sync('palettes')
+    [<Palette id='1940972' title='"Funky President"'>]
+"""
+import json
+import os
+
+from datetime import datetime
+
+from colourlovers import ColourLoversError, DATE_FORMAT
+
+
+class FeedSync(object):
+    """ Track the watermarks of the ``new`` feeds of search methods
+        ``colors``, ``palettes``, ``patterns`` and ``lovers`` and
+        retrieve only content added since the last sync.
+    """
+
+    METHODS = ['colors', 'palettes', 'patterns', 'lovers']
+
+    def __init__(self, client, path=None, page_size=100, max_pages=10,
+                 initial_pages=1):
+        """ Create a sync helper using *client* to send requests.
+
+            Args:
+                *client (ColourLovers)*: client to retrieve feeds with.
+                *path (str)*: optional JSON file to persist watermarks in.
+                *page_size (int)*: number of results per request, at
+                most 100.
+                *max_pages (int)*: maximum number of pages per sync.
+                *initial_pages (int)*: pages retrieved for a method that
+                has no watermark yet.
+        """
+        self.client = client
+        self.path = path
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.initial_pages = initial_pages
+        self.watermarks = {}
+        self.delivered = {}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def watermark(self, method):
+        """ Return the watermark of *method* as ``(id, date_created)``
+            or ``None`` if *method* has not been synchronised yet.
+        """
+        return self.watermarks.get(method)
+
+    def sync(self, method):
+        """ Retrieve the content of *method* created since the last sync,
+            newest first, and advance the watermark. If the watermark
+            is not reached within *max_pages* pages, the delivered
+            range is recorded in :py:attr:`delivered` and the next sync
+            continues below it. The state is saved if a *path* was
+            given.
+
+            Returns:
+                ``list`` of new content type instances.
+        """
+        if method not in self.METHODS:
+            raise ColourLoversError("cannot sync method '%s'" % method)
+
+        mark = self.watermark(method)
+        max_pages = self.initial_pages if mark is None else self.max_pages
+        ## (id, date_created, count) of ranges of the feed above the
+        ## watermark that earlier syncs have delivered, newest first
+        ranges = list(self.delivered.get(method, []))
+
+        delta = []
+        newest = None
+        offset = 0
+        complete = False
+        for __ in range(max_pages):
+            results = getattr(self.client, method)(
+                'new', numResults=self.page_size, resultOffset=offset)
+            if newest is None and results:
+                newest = self.position(results[0])[::-1]
+
+            start = offset
+            offset += len(results)
+            for index, item in enumerate(results):
+                if not self.is_new(item, mark):
+                    complete = True
+                    break
+                if ranges and not self.is_new(item, ranges[0][:2]):
+                    ## continue below the range delivered before
+                    offset = start + index + ranges.pop(0)[2]
+                    break
+                delta.append(item)
+            else:
+                if len(results) < self.page_size:
+                    complete = True
+
+            if complete:
+                break
+
+        ## the first sync only retrieves the latest content
+        complete = complete or mark is None
+
+        if newest is not None and newest != mark:
+            if complete:
+                self.watermarks[method] = newest
+                self.delivered.pop(method, None)
+            else:
+                self.delivered[method] = [newest + (offset,)] + ranges
+            if self.path is not None:
+                self.save()
+
+        return delta
+
+    def sync_all(self):
+        """ Sync all methods and return a ``dict`` of their deltas. """
+        return dict((method, self.sync(method)) for method in self.METHODS)
+
+    @staticmethod
+    def position(item):
+        """ Return the position of *item* in its feed as
+            ``(date_created, id)``.
+        """
+        return getattr(item, 'date_created', None), item.id
+
+    @classmethod
+    def is_new(cls, item, mark):
+        """ Return ``True`` if *item* is newer than watermark *mark*.
+            Lovers are only compared by id as they have no creation date.
+        """
+        if mark is None:
+            return True
+        mark_id, mark_date = mark
+        created, item_id = cls.position(item)
+        if created is None or mark_date is None:
+            return item_id > mark_id
+        return (created, item_id) > (mark_date, mark_id)
+
+    @staticmethod
+    def __dump_mark(mark_id, mark_date):
+        return {
+            'id': mark_id,
+            'date_created': (
+                mark_date.strftime(DATE_FORMAT) if mark_date else None),
+        }
+
+    @staticmethod
+    def __load_mark(mark):
+        mark_date = mark.get('date_created')
+        if mark_date is not None:
+            mark_date = datetime.strptime(mark_date, DATE_FORMAT)
+        return mark['id'], mark_date
+
+    def save(self):
+        """ Write the watermarks to *path* atomically. """
+        data = {}
+        for method, mark in self.watermarks.items():
+            data[method] = self.__dump_mark(*mark)
+            ranges = self.delivered.get(method)
+            if ranges:
+                data[method]['delivered'] = [
+                    dict(self.__dump_mark(mark_id, mark_date), count=count)
+                    for mark_id, mark_date, count in ranges]
+
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as fh:
+            json.dump(data, fh, indent=2, sort_keys=True)
+        getattr(os, 'replace', os.rename)(tmp_path, self.path)
+
+    def load(self):
+        """ Read the watermarks from *path*. """
+        with open(self.path) as fh:
+            data = json.load(fh)
+
+        self.watermarks = {}
+        self.delivered = {}
+        for method, mark in data.items():
+            self.watermarks[method] = self.__load_mark(mark)
+            if mark.get('delivered'):
+                self.delivered[method] = [
+                    self.__load_mark(part) + (part['count'],)
+                    for part in mark['delivered']]
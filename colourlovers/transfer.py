@@ -0,0 +1,193 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Compressed transfer of API responses and accounting of transferred
+bytes.
+
+:py:class:`colourlovers.ColourLovers` asks for compressed responses
+with the encodings in :py:data:`ACCEPT_ENCODING`, ``gzip`` and
+``deflate`` and ``br`` if a brotli module is installed. Response bodies
+are read in chunks, decompressed chunk by chunk and fed into the XML
+parser, so neither the compressed nor the decompressed body is held in
+memory as a whole. The bytes received and the bytes after decompression
+are counted per API method in a :py:class:`TransferStats`.
+
+Usage example::
+
+    >>> from colourlovers import ColourLovers
+    >>> cl = ColourLovers()
+    >>> cl.palettes('top', numResults=100)
+    >>> cl.transfer_stats.get('palettes')
+    {'requests': 1, 'compressed': 10418, 'uncompressed': 84311}
+"""
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+ENCODINGS = ['gzip', 'deflate']
+if brotli is not None:
+    ENCODINGS.append('br')
+
+#: value of the ``Accept-Encoding`` header sent with requests
+ACCEPT_ENCODING = ', '.join(ENCODINGS)
+
+#: errors raised for corrupt or unsupported compressed content
+DECOMPRESSION_ERRORS = (zlib.error, ValueError)
+if brotli is not None and hasattr(brotli, 'error'):
+    DECOMPRESSION_ERRORS += (brotli.error,)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _Identity(object):
+
+    def decompress(self, data):
+        return data
+
+    def flush(self):
+        return b''
+
+
+class _Deflate(object):
+    """ Decompress ``deflate`` content, which servers send either with
+        or without the zlib header.
+    """
+
+    def __init__(self):
+        self.__decompressor = zlib.decompressobj()
+        self.__first = True
+
+    def decompress(self, data):
+        if self.__first and data:
+            self.__first = False
+            try:
+                return self.__decompressor.decompress(data)
+            except zlib.error:
+                self.__decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self.__decompressor.decompress(data)
+
+    def flush(self):
+        return self.__decompressor.flush()
+
+
+class _Brotli(object):
+
+    def __init__(self):
+        self.__decompressor = brotli.Decompressor()
+
+    def decompress(self, data):
+        if hasattr(self.__decompressor, 'process'):
+            return self.__decompressor.process(data)
+        return self.__decompressor.decompress(data)
+
+    def flush(self):
+        return b''
+
+
+def decompressor(encoding):
+    """ Return a decompressor with ``decompress(data)`` and ``flush()``
+        methods for the ``Content-Encoding`` *encoding*.
+    """
+    encoding = (encoding or 'identity').strip().lower()
+    if encoding == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return _Deflate()
+    if encoding == 'br' and brotli is not None:
+        return _Brotli()
+    if encoding == 'identity':
+        return _Identity()
+    raise ValueError("unsupported content encoding '%s'" % encoding)
+
+
+def iter_body(response, chunk_size=CHUNK_SIZE):
+    """ Yield ``(received, data)`` for the body of streamed
+        ``requests.Response`` *response*, where *received* is the number
+        of bytes read from the connection and *data* the decompressed
+        bytes.
+    """
+    raw = response.raw
+    if hasattr(raw, 'stream'):
+        chunks = raw.stream(chunk_size, decode_content=False)
+    else:
+        chunks = iter(lambda: raw.read(chunk_size), b'')
+
+    decoder = decompressor(response.headers.get('Content-Encoding'))
+    for chunk in chunks:
+        data = decoder.decompress(chunk)
+        if chunk or data:
+            yield len(chunk), data
+    data = decoder.flush()
+    if data:
+        yield 0, data
+
+
+class TransferStats(object):
+    """ Number of requests, received bytes and decompressed bytes per
+        API method.
+    """
+
+    def __init__(self):
+        self.__counts = {}
+        self.__lock = threading.Lock()
+
+    def record(self, method, compressed, uncompressed):
+        with self.__lock:
+            counts = self.__counts.setdefault(
+                method, {'requests': 0, 'compressed': 0, 'uncompressed': 0})
+            counts['requests'] += 1
+            counts['compressed'] += compressed
+            counts['uncompressed'] += uncompressed
+
+    def get(self, method):
+        """ Return the counts of *method* as ``dict``. """
+        with self.__lock:
+            return dict(self.__counts.get(
+                method, {'requests': 0, 'compressed': 0, 'uncompressed': 0}))
+
+    def totals(self):
+        """ Return the counts of all methods as ``dict`` of ``dict``. """
+        with self.__lock:
+            return dict(
+                (method, dict(counts))
+                for method, counts in self.__counts.items())
+
+    def ratio(self, method=None):
+        """ Return compressed divided by uncompressed bytes of *method*
+            or all methods, ``None`` if nothing has been transferred.
+        """
+        totals = self.totals()
+        if method is not None:
+            totals = {method: totals.get(method, {})}
+        compressed = sum(c.get('compressed', 0) for c in totals.values())
+        uncompressed = sum(c.get('uncompressed', 0) for c in totals.values())
+        if not uncompressed:
+            return None
+        return float(compressed) / uncompressed
+
+    def reset(self):
+        with self.__lock:
+            self.__counts.clear()
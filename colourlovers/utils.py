@@ -0,0 +1,143 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Colour helpers shared by the local tools working on ColourLovers
+content. HSV values follow the ColourLovers convention of a hue in the
+range [0, 359] and saturation and value in percent.
+"""
+
+#: Hue ranges of the ``hueOption`` values accepted by the API as
+#: ``(name, start, end)`` with *start* inclusive and *end* exclusive.
+HUE_OPTIONS = (
+    ('red', 0, 15),
+    ('orange', 15, 45),
+    ('yellow', 45, 70),
+    ('green', 70, 170),
+    ('blue', 170, 260),
+    ('violet', 260, 345),
+    ('red', 345, 360),
+)
+
+
+def normalise_hex(value):
+    """ Return hex colour code *value* as lowercase '#xxxxxx'. *value*
+        can be given with or without leading '#'.
+    """
+    return '#' + str(value).lstrip('#').lower()
+
+
+def hex_to_int(value):
+    """ Return hex colour code *value* packed into an ``int``. """
+    return int(str(value).lstrip('#'), 16)
+
+
+def hex_to_rgb(value):
+    """ Return hex colour code *value* as ``(red, green, blue)`` tuple. """
+    packed = hex_to_int(value)
+    return (packed >> 16) & 0xff, (packed >> 8) & 0xff, packed & 0xff
+
+
+def rgb_to_hsv(red, green, blue):
+    """ Convert *red*, *green*, *blue* in range [0, 255] to a
+        ``(hue, saturation, value)`` tuple of ints as used by
+        ColourLovers.
+    """
+    high = max(red, green, blue)
+    low = min(red, green, blue)
+    delta = high - low
+
+    if delta == 0:
+        hue = 0
+    elif high == red:
+        hue = (60.0 * (green - blue) / delta) % 360
+    elif high == green:
+        hue = 60.0 * (blue - red) / delta + 120
+    else:
+        hue = 60.0 * (red - green) / delta + 240
+
+    saturation = 100.0 * delta / high if high else 0
+    return (
+        int(round(hue)) % 360,
+        int(round(saturation)),
+        int(round(100.0 * high / 255)),
+    )
+
+
+def hex_to_hsv(value):
+    """ Return hex colour code *value* as ``(hue, saturation, value)``. """
+    return rgb_to_hsv(*hex_to_rgb(value))
+
+
+def hsv_to_rgb(hue, saturation, value):
+    """ Convert *hue* in degrees and *saturation* and *value* in percent
+        to a ``(red, green, blue)`` tuple of ints in range [0, 255].
+    """
+    hue = (hue % 360) / 60.0
+    saturation = saturation / 100.0
+    value = value / 100.0 * 255
+
+    sector = int(hue) % 6
+    fraction = hue - int(hue)
+    low = value * (1 - saturation)
+    falling = value * (1 - saturation * fraction)
+    rising = value * (1 - saturation * (1 - fraction))
+
+    red, green, blue = (
+        (value, rising, low),
+        (falling, value, low),
+        (low, value, rising),
+        (low, falling, value),
+        (rising, low, value),
+        (value, low, falling),
+    )[sector]
+    return int(round(red)), int(round(green)), int(round(blue))
+
+
+def rgb_to_hex(red, green, blue):
+    """ Return *red*, *green*, *blue* as lowercase hex code '#xxxxxx'. """
+    return '#%02x%02x%02x' % (red, green, blue)
+
+
+def hsv_to_hex(hue, saturation, value):
+    """ Return the HSV colour as lowercase hex code '#xxxxxx'. """
+    return rgb_to_hex(*hsv_to_rgb(hue, saturation, value))
+
+
+def hue_option(hue):
+    """ Return the ``hueOption`` name for *hue* in range [0, 359]. """
+    hue = hue % 360
+    for name, start, end in HUE_OPTIONS:
+        if start <= hue < end:
+            return name
+
+
+def item_colours(item):
+    """ Return the hex colour codes of content type *item*, i.e. the
+        colours of a palette or pattern or the hex value of a colour.
+        Lovers have no colours and return an empty list.
+    """
+    colours = getattr(item, 'colours', None)
+    if colours is not None:
+        return colours
+
+    hex_value = getattr(item, 'hex', None)
+    if hex_value is not None:
+        return [hex_value]
+
+    return []
@@ -31,6 +31,13 @@ setup(
     packages=['colourlovers'],
     provides=['colourlovers'],
     install_requires=['requests>=1.0'],
+    extras_require={
+        'msgpack': ['msgpack>=1.0'],
+        'numpy': ['numpy>=1.15'],
+    },
+    entry_points={
+        'console_scripts': ['colourlovers = colourlovers.cli:main'],
+    },
 
     license='GNU General Public License (GPL)',
     classifiers=[
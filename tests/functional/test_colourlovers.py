@@ -9,8 +9,8 @@ class TestQueryingApi(FixtureTestCase):
     API_URL = 'http://www.colourlovers.com/api'
     fixtures = ['tests/fixtures/colour.xml']
 
+    @httpretty.activate
     def test_for_colour_returns_valid_object(self):
-        httpretty.enable()
         httpretty.register_uri(
             httpretty.GET,
             "{0}/color".format(self.API_URL),
@@ -22,5 +22,3 @@ class TestQueryingApi(FixtureTestCase):
 
         self.assertTrue(isinstance(colours[0], Colour))
         self.assertEquals(colours[0].hex, '#37cbff')
-
-        httpretty.disable()
@@ -0,0 +1,119 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import time
+import threading
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+
+from colourlovers import ColourLovers
+
+from tests.testcases import FixtureTestCase
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def handler_for(colour, latency):
+
+    class ColourHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            ## respond to /api/color/<hex> with the requested hex value
+            hex_value = self.path.split('?')[0].rsplit('/', 1)[-1]
+            body = ('<colors>%s</colors>' % colour.replace(
+                '6B4106', hex_value.upper())).encode('utf-8')
+            time.sleep(latency)
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ColourHandler
+
+
+class TestASharedClient(FixtureTestCase):
+    fixtures = ['tests/fixtures/colour.xml']
+    latency = 0.02
+
+    def setUp(self):
+        super(TestASharedClient, self).setUp()
+        colour = self.data['colour.xml'].split('?>', 1)[1]
+        self.server = StubServer(
+            ('127.0.0.1', 0), handler_for(colour, self.latency))
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.client = ColourLovers(hedge_percentile=99, timeout=10)
+        self.client.API_URL = 'http://127.0.0.1:%d/api' % (
+            self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_threads(self, threads, requests_per_thread):
+        errors = []
+        mismatches = []
+
+        def work(offset):
+            try:
+                for number in range(requests_per_thread):
+                    hex_value = '%06x' % (offset * 1000 + number)
+                    colours = self.client.color(hex_value)
+                    if [c.hex for c in colours] != ['#' + hex_value]:
+                        mismatches.append((hex_value, colours))
+            except BaseException as exc:
+                errors.append(exc)
+
+        workers = [
+            threading.Thread(target=work, args=(offset,))
+            for offset in range(threads)]
+        start = time.time()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEquals(errors, [])
+        self.assertEquals(mismatches, [])
+        return threads * requests_per_thread / (time.time() - start)
+
+    def test_returns_correct_results_to_many_threads(self):
+        self.run_threads(threads=32, requests_per_thread=10)
+
+    def test_throughput_scales_with_threads(self):
+        single = self.run_threads(threads=1, requests_per_thread=20)
+        many = self.run_threads(threads=16, requests_per_thread=20)
+
+        ## requests are latency bound, 16 threads must overlap them
+        self.assertTrue(
+            many > 4 * single, '%.1f vs %.1f requests/s' % (many, single))
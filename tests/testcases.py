@@ -1,5 +1,7 @@
 import unittest2
 
+import colourlovers as cl
+
 
 class FixtureTestCase(unittest2.TestCase):
     fixtures = []
@@ -12,3 +14,15 @@ class FixtureTestCase(unittest2.TestCase):
             __, basename = filename.rsplit('/', 1)
             with open(filename) as fh:
                 self.data[basename] = fh.read()
+
+
+def palette(id, colours=None, color_widths=None, **kwargs):
+    """ Return a :py:class:`Palette` with *id*, hex *colours* and any
+        other attributes in *kwargs*.
+    """
+    if color_widths is not None:
+        kwargs['color_widths'] = color_widths
+    inst = cl.Palette(id=str(id), **kwargs)
+    if colours is not None:
+        inst.colours = colours
+    return inst
@@ -0,0 +1,128 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import os
+import shutil
+import tempfile
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.assets import AssetCache, AssetFetcher
+
+
+def fake_get(url, **kwargs):
+    response = mock.Mock()
+    if url.endswith('broken.png'):
+        response.raise_for_status.side_effect = IOError('404')
+    content = b'badge' if 'badges' in url else b'image'
+    response.iter_content.return_value = [content[:2], content[2:]]
+    return response
+
+
+class TestAnAssetFetcher(unittest2.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.session = mock.Mock()
+        self.session.get.side_effect = fake_get
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def palette(self, id, image_url):
+        return cl.Palette(
+            id=str(id), image_url=image_url,
+            badge_url='http://cl/badges/%d.png' % id)
+
+    def test_downloads_images_into_content_addressed_cache(self):
+        fetcher = AssetFetcher(AssetCache(self.root), self.session, workers=2)
+
+        counts = fetcher.fetch([
+            self.palette(1, 'http://cl/1.png'),
+            self.palette(2, 'http://cl/2.png'),
+        ])
+
+        self.assertEquals(counts, {'fetched': 4, 'skipped': 0, 'failed': 0})
+        self.assertEquals(
+            fetcher.cache.path('http://cl/1.png'),
+            fetcher.cache.path('http://cl/2.png'))
+        with open(fetcher.cache.path('http://cl/badges/1.png'), 'rb') as fh:
+            self.assertEquals(fh.read(), b'badge')
+        self.assertEquals(
+            len(os.listdir(os.path.join(self.root, 'objects'))), 2)
+
+    def test_resumes_from_the_cache_index(self):
+        AssetFetcher(AssetCache(self.root), self.session).fetch(
+            [self.palette(1, 'http://cl/1.png')])
+
+        errors = []
+        fetcher = AssetFetcher(AssetCache(self.root), self.session)
+        counts = fetcher.fetch(
+            [self.palette(1, 'http://cl/1.png'),
+             self.palette(2, 'http://cl/broken.png')],
+            on_error=lambda url, exc: errors.append(url))
+
+        self.assertEquals(counts, {'fetched': 1, 'skipped': 2, 'failed': 1})
+        self.assertEquals(errors, ['http://cl/broken.png'])
+
+    def test_raises_errors_of_the_error_callback(self):
+        def on_error(url, exc):
+            raise ValueError(url)
+
+        fetcher = AssetFetcher(AssetCache(self.root), self.session, workers=1)
+        fetcher.fields = ('image_url',)
+
+        ## more failing URLs than the queue holds would block forever if
+        ## the callback killed the worker
+        self.assertRaises(ValueError, fetcher.fetch, [
+            self.palette(i, 'http://cl/%d/broken.png' % i)
+            for i in range(10)], on_error=on_error)
+
+    def test_creates_a_session_per_worker_thread(self):
+        sessions = []
+
+        def create_session():
+            session = mock.Mock()
+            session.get.side_effect = fake_get
+            sessions.append(session)
+            return session
+
+        fetcher = AssetFetcher(AssetCache(self.root), workers=2)
+        with mock.patch('requests.Session', side_effect=create_session):
+            fetcher.fetch(
+                [self.palette(i, 'http://cl/%d.png' % i) for i in range(10)])
+
+        self.assertTrue(1 <= len(sessions) <= 2)
+        self.assertEquals(
+            sum(session.get.call_count for session in sessions), 20)
+
+    def test_remembers_a_bounded_number_of_queued_urls(self):
+        fetcher = AssetFetcher(AssetCache(self.root), self.session, workers=1)
+        fetcher.RECENT_URLS = 1
+        fetcher.fields = ('image_url',)
+
+        urls = ['broken', 'broken', '1', 'broken']
+        counts = fetcher.fetch([
+            self.palette(id, 'http://cl/%s.png' % url)
+            for id, url in enumerate(urls)])
+
+        ## the broken URL is skipped while it is recent and retried once
+        ## it has been forgotten
+        self.assertEquals(counts, {'fetched': 1, 'skipped': 0, 'failed': 2})
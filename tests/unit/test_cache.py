@@ -0,0 +1,167 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import colourlovers as cl
+
+from colourlovers import serialization
+from colourlovers.cache import SQLiteCache
+
+from tests.testcases import FixtureTestCase
+
+
+class TestASQLiteCache(FixtureTestCase):
+    fixtures = ['tests/fixtures/colour.xml', 'tests/fixtures/lover.xml']
+
+    def setUp(self):
+        super(TestASQLiteCache, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def palette(self, id):
+        palette = cl.Palette(id=str(id), title='palette %d' % id)
+        palette.colours = ['#ffffff']
+        return palette
+
+    def test_stores_results_across_instances(self):
+        SQLiteCache(self.path).set('palettes/top', [self.palette(1)])
+
+        results = SQLiteCache(self.path).get('palettes/top')
+
+        self.assertEquals([p.title for p in results], ['palette 1'])
+        self.assertEquals(SQLiteCache(self.path).get('missing'), None)
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = SQLiteCache(self.path, max_entries=2)
+        cache.set('a', [self.palette(1)])
+        cache.set('b', [self.palette(2)])
+        cache.get('a')
+        cache.set('c', [self.palette(3)])
+
+        self.assertEquals(len(cache), 2)
+        self.assertEquals(cache.get('b'), None)
+        self.assertTrue(cache.get('a'))
+
+    def test_evicts_a_tenth_of_the_entries_at_once(self):
+        cache = SQLiteCache(self.path, max_entries=10)
+        for id in range(11):
+            cache.set(str(id), [self.palette(id)])
+
+        self.assertEquals(len(cache), 9)
+        self.assertEquals(cache.get('1'), None)
+        self.assertTrue(cache.get('2'))
+
+    def test_writes_access_times_in_batches(self):
+        cache = SQLiteCache(self.path)
+        cache.TOUCH_BATCH = 2
+        cache.set('a', [self.palette(1)])
+        cache.set('b', [self.palette(2)])
+
+        with cache.connection as conn:
+            conn.execute('UPDATE results SET accessed = 0')
+
+        def accessed():
+            conn = sqlite3.connect(self.path)
+            try:
+                return dict(conn.execute(
+                    'SELECT key, accessed FROM results').fetchall())
+            finally:
+                conn.close()
+
+        cache.get('a')
+        self.assertEquals(accessed(), {'a': 0, 'b': 0})
+
+        cache.get('b')
+        self.assertTrue(0 not in accessed().values())
+
+    def test_can_be_warmed_from_a_dump(self):
+        dump = os.path.join(self.tmp_dir, 'dump.bin')
+        with open(dump, 'wb') as fh:
+            fh.write(serialization.encode_many(
+                [self.palette(1), self.palette(2)]))
+
+        cache = SQLiteCache(self.path)
+        cache.warm_from_dump(dump)
+
+        self.assertEquals(cache.get('palette/2')[0].title, 'palette 2')
+
+    def test_refuses_pickled_dumps_by_default(self):
+        dump = os.path.join(self.tmp_dir, 'dump.bin')
+        with open(dump, 'wb') as fh:
+            fh.write(serialization.encode_many(
+                [self.palette(1)], serialization.PICKLE))
+
+        self.assertRaises(
+            cl.ColourLoversError, SQLiteCache(self.path).warm_from_dump,
+            dump)
+
+        cache = SQLiteCache(self.path, allow_pickle=True)
+        cache.warm_from_dump(dump)
+        self.assertEquals(cache.get('palette/1')[0].title, 'palette 1')
+
+    def test_serves_client_requests_from_the_cache(self):
+        response = mock.Mock(status_code=200)
+        response.content = ('<colors>%s</colors>' % self.data[
+            'colour.xml'].split('?>', 1)[1]).encode('utf-8')
+        session = mock.Mock()
+        session.get.return_value = response
+
+        cl_api = cl.ColourLovers(session=session, cache=SQLiteCache(self.path))
+        first = cl_api.color('#6B4106')
+        second = cl_api.color('6b4106')
+
+        self.assertEquals(session.get.call_count, 1)
+        self.assertEquals(second[0].to_record(), first[0].to_record())
+
+    def test_keeps_lovers_with_truncated_comments_apart(self):
+        response = mock.Mock(status_code=200)
+        response.content = ('<lovers>%s</lovers>' % self.data[
+            'lover.xml'].split('?>', 1)[1]).encode('utf-8')
+        session = mock.Mock()
+        session.get.return_value = response
+        cache = SQLiteCache(self.path)
+
+        truncated = cl.ColourLovers(
+            session=session, cache=cache, max_comments=0).lover('name')
+        complete = cl.ColourLovers(session=session, cache=cache).lover('name')
+
+        self.assertEquals(session.get.call_count, 2)
+        self.assertEquals(len(truncated[0].comments), 0)
+        self.assertEquals(len(complete[0].comments), 1)
+
+    def test_builds_normalised_cache_keys(self):
+        self.assertEquals(
+            cl.ColourLovers.cache_key(
+                'palettes', 'top', {'num_results': 5, 'hueOption': 'red'}),
+            'palettes/top?hueOption=red&numResults=5')
+        self.assertEquals(
+            cl.ColourLovers.cache_key('color', '#6B4106'), 'color/6b4106')
+        self.assertEquals(
+            cl.ColourLovers.cache_key('lover', 'name', max_comments=2),
+            'lover/name#max_comments=2')
+        self.assertEquals(
+            cl.ColourLovers.cache_key('palette', 5, max_comments=2),
+            'palette/5')
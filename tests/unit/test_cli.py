@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import errno
+import json
+import mock
+import unittest2
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import colourlovers as cl
+
+from colourlovers import cli
+
+
+def palettes(argument, numResults, resultOffset, **kwargs):
+    ids = range(resultOffset, min(resultOffset + numResults, 5))
+    results = []
+    for id in ids:
+        palette = cl.Palette(
+            id=str(id), title='p%d' % id,
+            date_created='2013-01-01 10:00:00')
+        palette.colours = ['#ffffff', '#000000']
+        results.append(palette)
+    return results
+
+
+class TestTheCommandLine(unittest2.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('colourlovers.cli.ColourLovers')
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client.palettes.side_effect = palettes
+        self.stdout = StringIO()
+
+    def test_streams_all_pages_as_ndjson(self):
+        cli.main(['palettes', 'top', 'hue_option=red', '--pages', '10',
+                  '--page-size', '2', '--concurrency', '3'], self.stdout)
+
+        rows = [
+            json.loads(line) for line in self.stdout.getvalue().splitlines()]
+        self.assertEquals([row['id'] for row in rows], [0, 1, 2, 3, 4])
+        self.assertEquals(rows[0]['date_created'], '2013-01-01 10:00:00')
+        self.client.palettes.assert_any_call(
+            'top', hue_option='red', numResults=2, resultOffset=4)
+
+    def test_writes_selected_fields_as_csv(self):
+        cli.main(['palettes', 'keywords=funky', '--format', 'csv',
+                  '--fields', 'id,colours'], self.stdout)
+
+        self.assertEquals(
+            self.stdout.getvalue().splitlines()[:2],
+            ['id,colours', '0,"#ffffff,#000000"'])
+        self.client.palettes.assert_called_with(
+            None, keywords='funky', numResults=100, resultOffset=0)
+
+    def test_outputs_stats(self):
+        self.client.stats.return_value = cl.Stat('12')
+
+        cli.main(['stats', 'lovers'], self.stdout)
+
+        self.assertEquals(json.loads(self.stdout.getvalue()), {'total': 12})
+
+    def test_exits_quietly_on_a_broken_pipe(self):
+        stdout = mock.Mock()
+        stdout.write.side_effect = IOError(errno.EPIPE, 'Broken pipe')
+        stdout.fileno.side_effect = ValueError()
+
+        with self.assertRaises(SystemExit) as context:
+            cli.main(['palettes', 'top'], stdout)
+        self.assertEquals(context.exception.code, 141)
+
+    @mock.patch('sys.stderr', new_callable=StringIO)
+    def test_rejects_invalid_page_sizes_and_concurrency(self, stderr):
+        for option, value in [('--page-size', '0'), ('--page-size', '101'),
+                              ('--concurrency', '0')]:
+            with self.assertRaises(SystemExit) as context:
+                cli.main(['palettes', 'top', option, value], self.stdout)
+            self.assertEquals(context.exception.code, 2)
+            self.assertTrue(option in stderr.getvalue())
+        self.assertFalse(self.client.palettes.called)
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+
+import colourlovers as cl
+
+from colourlovers.colour_index import ColourIndex
+
+from tests.testcases import FixtureTestCase
+
+
+class TestAColourIndex(FixtureTestCase):
+    fixtures = ['tests/fixtures/colour.xml']
+
+    def setUp(self):
+        super(TestAColourIndex, self).setUp()
+        response = mock.Mock(status_code=200)
+        response.content = ('<colors>%s</colors>' % self.data[
+            'colour.xml'].split('?>', 1)[1]).encode('utf-8')
+        self.session = mock.Mock()
+        self.session.get.return_value = response
+
+    def test_finds_colours_regardless_of_hex_format(self):
+        colour = cl.Colour(id='1', hex='6B4106')
+        index = ColourIndex([colour, cl.Palette(id='2')])
+
+        self.assertEquals(len(index), 1)
+        self.assertTrue(index.get('#6b4106') is colour)
+        self.assertTrue('6B4106' in index)
+        self.assertEquals(index.get('zzzzzz'), None)
+
+    def test_answers_known_colours_without_request(self):
+        index = ColourIndex()
+        cl_api = cl.ColourLovers(session=self.session, colour_index=index)
+
+        first = cl_api.color('#6B4106')
+        second = cl_api.color('6b4106')
+
+        self.assertEquals(self.session.get.call_count, 1)
+        self.assertTrue(second[0] is first[0])
+
+    def test_can_answer_from_the_index_only(self):
+        cl_api = cl.ColourLovers(
+            session=self.session, colour_index=ColourIndex(),
+            colour_fallback=False)
+
+        self.assertEquals(cl_api.color('#6B4106'), [])
+        self.assertFalse(self.session.get.called)
+
+        cl_api.colors('top')
+        self.assertEquals(cl_api.color('#6B4106')[0].id, 903893)
+
+    def test_does_not_create_lazy_results(self):
+        index = ColourIndex()
+        cl_api = cl.ColourLovers(session=self.session, colour_index=index)
+
+        with mock.patch.object(
+                cl.Colour, 'from_xml', wraps=cl.Colour.from_xml) as from_xml:
+            results = cl_api.colors('top', lazy=True)
+            self.assertEquals(from_xml.call_count, 0)
+
+        self.assertEquals(len(results), 1)
+        self.assertEquals(len(index), 0)
@@ -265,6 +265,29 @@ class TestLover(FixtureTestCase):
             u'http://www.colourlovers.com/api/lover/electrikmonk'
         )
 
+    def test_comments_can_be_skipped(self):
+        xml = ElementTree.XML(self.data['lover.xml'])
+
+        lover = cl.Lover.from_xml(xml, max_comments=0)
+
+        self.assertEquals(lover.comments, [])
+        self.assertEquals(lover.num_lovers, 710)
+
+    def test_comments_can_be_created_lazily(self):
+        xml = ElementTree.XML(self.data['lover.xml'])
+
+        lover = cl.Lover.from_xml(xml, max_comments=5, lazy_comments=True)
+
+        self.assertEquals(len(lover.comments), 1)
+        self.assertEquals(
+            [c.comment_user_name for c in lover.comments],
+            [u'mashedpotato']
+        )
+        self.assertEquals(
+            lover.to_record()['comments'][0][0],
+            datetime(2008, 3, 10, 5, 10, 58)
+        )
+
 
 class TestStat(unittest2.TestCase):
 
@@ -343,3 +366,118 @@ class TestColourLoversApi(unittest2.TestCase):
             cl_api._check_response,
             response
         )
+
+
+class TestAPreparedQuery(unittest2.TestCase):
+
+    def setUp(self):
+        response = mock.Mock(status_code=200)
+        response.content = b'<palettes></palettes>'
+        self.session = mock.Mock()
+        self.session.get.return_value = response
+        self.cl_api = cl.ColourLovers(session=self.session)
+
+    def test_sends_prepared_url_and_parameters(self):
+        query = self.cl_api.prepare('palettes', 'top', num_results=20)
+
+        self.assertEquals(query(), [])
+        self.session.get.assert_called_with(
+            'http://www.colourlovers.com/api/palettes/top',
+            params={'numResults': 20}, headers=mock.ANY, timeout=None,
+            stream=True)
+
+    def test_can_be_executed_with_varying_arguments(self):
+        query = self.cl_api.prepare('color', format='json')
+
+        query('#6B4106', show_palette_widths=1)
+        self.session.get.assert_called_with(
+            'http://www.colourlovers.com/api/color/6B4106',
+            params={'showPaletteWidths': 1}, headers=mock.ANY,
+            timeout=None, stream=True)
+        self.assertEquals(query.params, {})
+
+    def test_validates_arguments(self):
+        self.assertRaises(
+            cl.ColourLoversError, self.cl_api.prepare, 'invalid')
+        query = self.cl_api.prepare('palettes', 'new')
+        self.assertRaises(cl.ColourLoversError, query, 'invalid_argument')
+
+
+class TestLazyResults(FixtureTestCase):
+    fixtures = ['tests/fixtures/palette.xml']
+
+    def setUp(self):
+        super(TestLazyResults, self).setUp()
+        palette = self.data['palette.xml'].split('?>', 1)[1]
+        response = mock.Mock(status_code=200)
+        response.content = (
+            '<palettes>%s</palettes>' % (palette * 3)).encode('utf-8')
+        session = mock.Mock()
+        session.get.return_value = response
+        self.cl_api = cl.ColourLovers(session=session)
+
+    def test_creates_results_on_access(self):
+        with mock.patch.object(
+                cl.Palette, 'from_xml', wraps=cl.Palette.from_xml) as from_xml:
+            results = self.cl_api.palettes('top', lazy=True)
+            self.assertEquals(len(results), 3)
+            self.assertEquals(from_xml.call_count, 0)
+
+            first = results[0]
+            self.assertEquals(first.title, 'be my boy')
+            self.assertTrue(results[-3] is first)
+            self.assertEquals(from_xml.call_count, 1)
+
+    def test_can_be_sliced_and_iterated(self):
+        results = self.cl_api.palettes('top', lazy=True)
+        first = results[0]
+
+        sliced = results[:2]
+        self.assertTrue(isinstance(sliced, cl.LazyResults))
+        self.assertEquals(len(sliced), 2)
+        self.assertTrue(sliced[0] is first)
+        self.assertEquals(
+            [type(r) for r in results], [cl.Palette] * 3)
+        self.assertRaises(IndexError, results.__getitem__, 3)
+
+    def test_slices_share_created_instances(self):
+        results = self.cl_api.palettes('top', lazy=True)
+
+        last = results[1:][-1]
+        self.assertTrue(results[2] is last)
+        self.assertTrue(results[::2][1] is last)
+        self.assertEquals(len(results[::-1]), 3)
+
+
+class TestParseModes(FixtureTestCase):
+    fixtures = ['tests/fixtures/palettes_dirty.xml']
+
+    def client(self, **kwargs):
+        response = mock.Mock(status_code=200)
+        response.content = self.data['palettes_dirty.xml'].encode('utf-8')
+        session = mock.Mock()
+        session.get.return_value = response
+        return cl.ColourLovers(session=session, **kwargs)
+
+    def test_strict_mode_fails_on_invalid_items(self):
+        cl_api = self.client()
+
+        self.assertRaises(cl.ColourLoversError, cl_api.palettes, 'top')
+        self.assertEquals(len(cl_api.parse_errors), 0)
+
+    def test_lenient_mode_skips_and_records_invalid_items(self):
+        cl_api = self.client(lenient=True)
+
+        palettes = cl_api.palettes('top')
+
+        self.assertEquals([p.id for p in palettes], [12345, 12348])
+        self.assertEquals(palettes[1].num_views, 1024)
+        self.assertEquals(
+            [(e.method, e.index, e.id) for e in cl_api.parse_errors],
+            [('palettes', 1, '12346'), ('palettes', 2, '12347')])
+        self.assertTrue('yesterday' in cl_api.parse_errors[1].error)
+
+    def test_invalid_xml_raises_an_exception(self):
+        self.assertRaises(
+            cl.ColourLoversError, cl.ColourLovers._parse_content,
+            b'<palettes><palette>')
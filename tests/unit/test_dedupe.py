@@ -0,0 +1,121 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import random
+import unittest2
+
+from colourlovers.utils import hex_to_rgb
+
+from colourlovers.dedupe import (
+    Deduplicator, palette_distance, palette_histogram, collapse, dedupe)
+
+from tests.testcases import palette
+
+
+class TestPaletteDistance(unittest2.TestCase):
+
+    def test_histogram_weights_add_up_to_one(self):
+        histogram = palette_histogram(
+            palette(1, ['#123456', '#abcdef'], '0.2,0.8'))
+        self.assertAlmostEqual(sum(histogram.values()), 1.0)
+
+    def test_ignores_colour_order(self):
+        first = palette(1, ['#ff0000', '#00ff00', '#0000ff'])
+        second = palette(2, ['#0000ff', '#ff0000', '#00ff00'])
+        self.assertAlmostEqual(palette_distance(first, second), 0.0)
+
+    def test_small_shifts_are_close(self):
+        first = palette(1, ['#ff0000', '#00ff00'])
+        shifted = palette(2, ['#fd0102', '#02fe00'])
+        different = palette(3, ['#ffffff', '#000000'])
+
+        self.assertTrue(palette_distance(first, shifted) < 0.05)
+        self.assertAlmostEqual(palette_distance(first, different), 1.0)
+
+    def test_considers_colour_widths(self):
+        first = palette(1, ['#ff0000', '#0000ff'], '0.1,0.9')
+        second = palette(2, ['#ff0000', '#0000ff'], '0.9,0.1')
+        self.assertAlmostEqual(palette_distance(first, second), 0.8)
+
+
+class TestADeduplicator(unittest2.TestCase):
+
+    def setUp(self):
+        self.palettes = [
+            palette(1, ['#ff0000', '#00ff00', '#0000ff']),
+            palette(2, ['#0000fd', '#fe0000', '#00ff02']),
+            palette(3, ['#ffffff', '#000000']),
+            palette(4, ['#010101', '#fefefe']),
+        ]
+
+    def test_yields_unique_palettes(self):
+        unique = list(dedupe(self.palettes))
+        self.assertEquals([p.id for p in unique], [1, 3])
+
+    def test_collapses_duplicates(self):
+        clusters = collapse(self.palettes)
+        self.assertEquals(dict(clusters), {1: [2], 3: [4]})
+
+    def test_bounds_representatives(self):
+        deduplicator = Deduplicator(max_representatives=1)
+        for inst in self.palettes:
+            deduplicator.add(inst)
+
+        self.assertEquals(len(deduplicator), 1)
+        self.assertEquals(deduplicator.find(self.palettes[0]), None)
+        self.assertEquals(deduplicator.find(self.palettes[3]), 3)
+        self.assertEquals(deduplicator.duplicates, 2)
+
+    def test_finds_randomly_shifted_palettes(self):
+        rng = random.Random(7)
+
+        def shifted(colours, amount):
+            return ['#%02x%02x%02x' % tuple(
+                max(0, min(255, channel + rng.randint(-amount, amount)))
+                for channel in hex_to_rgb(colour)) for colour in colours]
+
+        for amount in (2, 4):
+            deduplicator = Deduplicator(threshold=0.1)
+            pairs = []
+            for id in range(300):
+                colours = ['#%06x' % rng.randint(0, 0xffffff)
+                           for __ in range(5)]
+                original = palette(2 * id, colours)
+                copy = palette(2 * id + 1, shifted(colours, amount))
+                if palette_distance(original, copy) <= 0.1:
+                    deduplicator.add(original)
+                    pairs.append((original, copy))
+
+            self.assertTrue(len(pairs) > 100)
+            found = sum(
+                deduplicator.find(copy) == original.id
+                for original, copy in pairs)
+            self.assertTrue(found >= 0.99 * len(pairs))
+
+    def test_comparisons_do_not_grow_with_common_colours(self):
+        rng = random.Random(5)
+        deduplicator = Deduplicator(max_bucket=10)
+        for id in range(1500):
+            colours = ['#ffffff'] + [
+                '#%06x' % rng.randint(0, 0xffffff) for __ in range(4)]
+            deduplicator.add(palette(id, colours))
+
+        ## comparing with every palette sharing white would take more
+        ## than a million comparisons
+        self.assertEquals(len(deduplicator), 1500)
+        self.assertTrue(deduplicator.comparisons < 10 * 1500)
@@ -0,0 +1,70 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.graph import LoverGraph
+
+from tests.testcases import palette
+
+
+class TestALoverGraph(unittest2.TestCase):
+
+    def setUp(self):
+        self.graph = LoverGraph([
+            palette(1, ['#ff0000', '#00ff00'], user_name='alice'),
+            palette(2, ['#ff0000', '#0000ff'], user_name='Alice'),
+            palette(3, ['#ff0000', '#00ff00'], user_name='bob'),
+            palette(4, ['#ffffff', '#000000'], user_name='carol'),
+            cl.Colour(id='5', user_name='bob', hex='FF0000'),
+            cl.Lover(id='6', user_name='carol'),
+        ])
+
+    def test_links_lovers_to_their_content(self):
+        self.assertEquals(len(self.graph), 3)
+        self.assertTrue('ALICE' in self.graph)
+        self.assertEquals([p.id for p in self.graph.palettes('alice')], [1, 2])
+        self.assertEquals([c.id for c in self.graph.colours('bob')], [5])
+        self.assertEquals(self.graph.patterns('bob'), [])
+        self.assertEquals(self.graph.lover('carol').id, 6)
+        self.assertEquals(self.graph.palettes('unknown'), [])
+
+    def test_ignores_content_added_twice(self):
+        self.graph.add([palette(1, ['#ff0000', '#00ff00'], user_name='alice')])
+        self.assertEquals(len(self.graph.palettes('alice')), 2)
+
+    def test_counts_colour_usage(self):
+        self.assertEquals(
+            self.graph.colour_usage('alice'),
+            [('#ff0000', 2), ('#0000ff', 1), ('#00ff00', 1)])
+        self.assertEquals(
+            self.graph.colour_usage('bob', n=1), [('#ff0000', 2)])
+
+    def test_finds_co_used_colours(self):
+        self.assertEquals(
+            self.graph.co_used_colours('#FF0000'),
+            [('#00ff00', 2), ('#0000ff', 1)])
+
+    def test_finds_similar_users(self):
+        similar = self.graph.similar_users('bob')
+
+        self.assertEquals([name for name, _ in similar], ['alice'])
+        self.assertAlmostEqual(similar[0][1], 5 / (5 ** 0.5 * 6 ** 0.5))
+        self.assertEquals(self.graph.similar_users('carol'), [])
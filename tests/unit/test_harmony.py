@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import random
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.harmony import (
+    HueHistogram, PaletteGenerator, harmony, harmonies)
+from colourlovers.utils import hex_to_hsv, hsv_to_hex
+
+from tests.testcases import palette
+
+
+class TestHarmonies(unittest2.TestCase):
+
+    def test_converts_hsv_to_hex(self):
+        self.assertEquals(hsv_to_hex(0, 100, 100), '#ff0000')
+        self.assertEquals(hsv_to_hex(240, 100, 50), '#000080')
+        self.assertEquals(hsv_to_hex(0, 0, 100), '#ffffff')
+
+    def test_rotates_hue_of_base_colour(self):
+        self.assertEquals(
+            harmony('#FF0000', 'complementary'), ['#ff0000', '#00ffff'])
+        self.assertEquals(
+            harmony((0, 100, 100), 'triadic'),
+            ['#ff0000', '#00ff00', '#0000ff'])
+
+    def test_accepts_colours_and_their_hsv(self):
+        colour = cl.Colour(id='1', hex='FF0000')
+        colour.hsv = cl.HSV(0, 100, 100)
+
+        self.assertEquals(
+            harmony(colour.hsv, 'complementary'), ['#ff0000', '#00ffff'])
+        self.assertEquals(
+            harmonies([colour], 'complementary'), [['#ff0000', '#00ffff']])
+
+    def test_computes_harmonies_in_batch(self):
+        self.assertEquals(
+            harmonies(['#ff0000', '#00ff00'], 'complementary'),
+            [['#ff0000', '#00ffff'], ['#00ff00', '#ff00ff']])
+
+    def test_rejects_unknown_rules(self):
+        self.assertRaises(ValueError, harmony, '#ff0000', 'invalid')
+
+
+class TestAHueHistogram(unittest2.TestCase):
+
+    def setUp(self):
+        self.histogram = HueHistogram(bins=12)
+        self.histogram.add([
+            palette(1, ['#ff0000', '#0000ff'], '0.75,0.25'),
+            palette(2, ['#ff0000']),
+        ])
+
+    def test_weights_colours_by_width(self):
+        self.assertEquals(len(self.histogram), 2)
+        self.assertAlmostEqual(self.histogram.weights[0], 1.75)
+        self.assertAlmostEqual(self.histogram.weights[8], 0.25)
+        self.assertEquals(self.histogram.colour(0), (15.0, 100.0, 100.0))
+
+    def test_samples_only_used_hues(self):
+        rng = random.Random(1)
+        for _ in range(100):
+            hue, saturation, value = self.histogram.sample(rng)
+            self.assertTrue(0 <= hue < 30 or 240 <= hue < 270)
+
+    def test_cannot_sample_empty_histogram(self):
+        self.assertRaises(ValueError, HueHistogram().sample)
+
+    def test_generates_palettes(self):
+        generator = PaletteGenerator(self.histogram, random.Random(1))
+
+        palettes = generator.generate_many(10, size=4, rule='triadic')
+        self.assertEquals(len(palettes), 10)
+        for colours in palettes:
+            self.assertEquals(len(colours), 4)
+
+            hues = [hex_to_hsv(colour)[0] for colour in colours[:3]]
+            for hue, offset in zip(hues, [0, 120, 240]):
+                difference = (hue - hues[0] - offset) % 360
+                self.assertTrue(min(difference, 360 - difference) <= 2)
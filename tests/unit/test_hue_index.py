@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.hue_index import HueIndex
+
+from tests.testcases import palette
+
+
+class TestAHueIndex(unittest2.TestCase):
+
+    def setUp(self):
+        self.red = cl.Colour(id='1', hex='FF0000')
+        self.red.hsv = cl.HSV(0, 100, 100)
+        self.pink = cl.Colour(id='2', hex='FF0040')
+        self.pink.hsv = cl.HSV(345, 100, 100)
+        self.palette = palette(3, ['#00ff00', '#0000ff'])
+        self.index = HueIndex([self.red, self.pink, self.palette])
+
+    def test_buckets_items_by_hue(self):
+        self.assertEquals(len(self.index), 3)
+        self.assertEquals(self.index.bucket(5), [self.red])
+        self.assertEquals(self.index.bucket(125), [self.palette])
+        self.assertEquals(self.index.bucket(245), [self.palette])
+        self.assertEquals(
+            self.index.bucket(125, content_class=cl.Colour), [])
+
+    def test_scans_ranges_across_buckets(self):
+        self.assertEquals(self.index.range(100, 250), [self.palette])
+        self.assertEquals(self.index.range(0, 1), [self.red])
+        self.assertEquals(self.index.range(1, 120), [])
+
+    def test_scans_ranges_wrapping_around(self):
+        self.assertEquals(
+            set(i.id for i in self.index.range(340, 10)), set([1, 2]))
+        self.assertEquals(self.index.around(355, 10), [self.pink, self.red])
+
+    def test_covers_the_whole_circle_for_wide_ranges(self):
+        everything = set([1, 2, 3])
+        self.assertEquals(
+            set(i.id for i in self.index.range(0, 360)), everything)
+        self.assertEquals(
+            set(i.id for i in self.index.range(-10, 400)), everything)
+        self.assertEquals(
+            set(i.id for i in self.index.around(0, 180)), everything)
+        self.assertEquals(
+            set(i.id for i in self.index.around(90, 500)), everything)
+
+    def test_returns_nothing_for_empty_ranges(self):
+        self.assertEquals(self.index.range(10, 10), [])
+        self.assertEquals(self.index.range(345, 345), [])
+        self.assertEquals(self.index.around(345, 0), [self.pink])
+        self.assertRaises(ValueError, self.index.around, 345, -1)
+
+    def test_answers_hue_options(self):
+        self.assertEquals(
+            set(i.id for i in self.index.hue_option('red')), set([1, 2]))
+        self.assertEquals(
+            self.index.hue_option('green', content_class=cl.Palette),
+            [self.palette])
+        self.assertRaises(ValueError, self.index.hue_option, 'pink')
+
+    def test_replaces_items_added_again(self):
+        self.palette.colours = ['#ff8000']
+        self.index.add([self.palette])
+
+        self.assertEquals(len(self.index), 3)
+        self.assertEquals(self.index.bucket(125), [])
+        self.assertEquals(self.index.hue_option('orange'), [self.palette])
+
+        self.index.discard(self.palette)
+        self.assertFalse(self.palette in self.index)
+        self.assertEquals(self.index.hue_option('orange'), [])
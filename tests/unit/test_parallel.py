@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from datetime import datetime
+
+import colourlovers as cl
+
+from colourlovers.parallel import ParsePool, parse_records
+
+from tests.testcases import FixtureTestCase
+
+
+def as_page(tag, data, count=1):
+    item = data.split('?>', 1)[-1]
+    return ('<%s>%s</%s>' % (tag, item * count, tag)).encode('utf-8')
+
+
+class TestParsingRecords(FixtureTestCase):
+    fixtures = [
+        'tests/fixtures/colour.xml',
+        'tests/fixtures/lover.xml',
+    ]
+
+    def test_returns_flat_records_for_colours(self):
+        content = as_page('colors', self.data['colour.xml'], 2)
+
+        records = parse_records('colors', content)
+
+        self.assertEquals(len(records), 2)
+        self.assertEquals(records[0]['id'], 903893)
+        self.assertEquals(records[0]['rgb'], (107, 65, 6))
+        self.assertEquals(records[0]['hsv'], (35, 94, 42))
+
+    def test_records_can_be_turned_back_into_lovers(self):
+        content = as_page('lovers', self.data['lover.xml'])
+
+        record = parse_records('lovers', content)[0]
+        lover = cl.Lover.from_record(record)
+
+        self.assertEquals(lover.num_colors, 3498)
+        self.assertEquals(
+            lover.comments[0].comment_date,
+            datetime(2008, 3, 10, 5, 10, 58)
+        )
+
+    def test_parses_stats_response(self):
+        records = parse_records('stats', b'<stats><total>15</total></stats>')
+        self.assertEquals(records, [{'total': 15}])
+
+
+class TestAParsePool(FixtureTestCase):
+    fixtures = ['tests/fixtures/palette.xml']
+
+    def test_parses_responses_in_worker_processes(self):
+        content = as_page('palettes', self.data['palette.xml'], 3)
+
+        with ParsePool(processes=2) as pool:
+            palettes = pool.parse('palettes', content)
+            pages = list(pool.parse_many('palettes', [content, content]))
+
+        self.assertEquals(len(palettes), 3)
+        self.assertEquals(type(palettes[0]), cl.Palette)
+        self.assertEquals(palettes[0].colours[0], '#423238')
+        self.assertEquals(palettes[0].color_widths, [0.2] * 5)
+        self.assertEquals([len(page) for page in pages], [3, 3])
+
+    def test_records_invalid_items_in_lenient_mode(self):
+        with open('tests/fixtures/palettes_dirty.xml', 'rb') as fh:
+            content = fh.read()
+
+        errors = []
+        with ParsePool(processes=1) as pool:
+            palettes = pool.parse('palettes', content, errors=errors)
+
+        self.assertEquals([p.id for p in palettes], [12345, 12348])
+        self.assertEquals([e.id for e in errors], ['12346', '12347'])
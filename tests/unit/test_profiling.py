@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import mock
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import colourlovers as cl
+
+from colourlovers.profiling import Profiler
+
+from tests.testcases import FixtureTestCase
+
+
+class TestAProfiler(FixtureTestCase):
+    fixtures = ['tests/fixtures/palette.xml']
+
+    def setUp(self):
+        super(TestAProfiler, self).setUp()
+        response = mock.Mock(status_code=200)
+        response.content = ('<palettes>%s</palettes>' % self.data[
+            'palette.xml'].split('?>', 1)[1]).encode('utf-8')
+        self.session = mock.Mock()
+        self.session.get.return_value = response
+
+    def test_traces_stages_of_sampled_calls(self):
+        profiler = Profiler(sample_rate=1.0, detail=False)
+        cl_api = cl.ColourLovers(session=self.session, profiler=profiler)
+
+        cl_api.palettes('top')
+
+        self.assertEquals(len(profiler.traces), 1)
+        trace = profiler.traces[0]
+        self.assertEquals(trace.name, 'palettes')
+        self.assertEquals(
+            [span.name for span in trace.children],
+            ['request', 'read_xml', 'from_xml'])
+
+    def test_skips_calls_that_are_not_sampled(self):
+        profiler = Profiler(sample_rate=0.0)
+        cl_api = cl.ColourLovers(session=self.session, profiler=profiler)
+
+        cl_api.palettes('top')
+
+        self.assertEquals(len(profiler.traces), 0)
+        self.assertEquals(profiler.collapsed(), {})
+
+    def test_breaks_down_stages_by_function(self):
+        profiler = Profiler(sample_rate=1.0, functions=50)
+        cl_api = cl.ColourLovers(session=self.session, profiler=profiler)
+
+        cl_api.palettes('top')
+
+        stacks = profiler.collapsed()
+        self.assertTrue('palettes;request' in stacks)
+        self.assertTrue(any(
+            stack.startswith('palettes;from_xml;')
+            and stack.endswith('name_from_tag') for stack in stacks))
+
+    def test_dumps_collapsed_stacks_and_chrome_trace(self):
+        profiler = Profiler(sample_rate=1.0)
+        cl_api = cl.ColourLovers(session=self.session, profiler=profiler)
+        cl_api.palettes('top')
+
+        collapsed = StringIO()
+        profiler.dump_collapsed(collapsed)
+        for line in collapsed.getvalue().splitlines():
+            stack, micros = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('palettes'))
+            self.assertTrue(int(micros) > 0)
+
+        chrome = StringIO()
+        profiler.dump_chrome_trace(chrome)
+        events = json.loads(chrome.getvalue())['traceEvents']
+        self.assertEquals(events[0]['name'], 'palettes')
+        self.assertEquals(events[0]['ph'], 'X')
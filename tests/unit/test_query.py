@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.query import LocalQueryEngine
+
+from tests.testcases import palette
+
+
+class TestALocalQueryEngine(unittest2.TestCase):
+
+    def setUp(self):
+        self.engine = LocalQueryEngine([
+            palette(1, ['#ff0000', '#00ff00'], title='Funky President',
+                    user_name='james', num_votes='5',
+                    date_created='2012-01-03 10:00:00'),
+            palette(2, ['#0000ff'], title='funky blue', user_name='Alice',
+                    num_votes='9', date_created='2012-01-01 10:00:00'),
+            palette(3, ['#0000ff', '#ffff00'], title='Calm sea',
+                    user_name='alice', num_votes='1',
+                    date_created='2012-01-02 10:00:00'),
+        ])
+
+    def ids(self, results):
+        return [item.id for item in results]
+
+    def test_orders_top_and_new_like_the_api(self):
+        self.assertEquals(self.ids(self.engine.palettes('top')), [2, 1, 3])
+        self.assertEquals(self.ids(self.engine.palettes('new')), [1, 3, 2])
+
+    def test_filters_by_keywords_lover_hue_and_hex(self):
+        self.assertEquals(
+            self.ids(self.engine.palettes('top', keywords='funky')), [2, 1])
+        self.assertEquals(
+            self.ids(self.engine.palettes('top', lover='ALICE')), [2, 3])
+        self.assertEquals(
+            self.ids(self.engine.palettes('top', hue_option='red,yellow')),
+            [1, 3])
+        self.assertEquals(
+            self.ids(self.engine.palettes(
+                'top', hex='0000FF', keywords='funky')),
+            [2])
+
+    def test_applies_ordering_and_paging_keywords(self):
+        results = self.engine.palettes(
+            order_col='name', sort_by='DESC', num_results=1, result_offset=1)
+        self.assertEquals(self.ids(results), [1])
+
+    def test_replaces_items_added_again(self):
+        self.engine.add([palette(
+            2, ['#000000'], title='renamed', user_name='bob',
+            num_votes='0', date_created='2012-01-01 10:00:00')])
+
+        self.assertEquals(len(self.engine), 3)
+        self.assertEquals(self.engine.palettes(keywords='blue'), [])
+        self.assertEquals(self.ids(self.engine.palettes(lover='bob')), [2])
+
+    def test_rejects_invalid_arguments(self):
+        self.assertRaises(
+            cl.ColourLoversError, self.engine.palettes, 'invalid')
+
+    def test_orders_lovers_by_rating_and_registration(self):
+        self.engine.add([
+            cl.Lover(user_name='lover%d' % rating, rating=str(rating),
+                     date_registered='2012-01-%02d 10:00:00' % (10 - rating))
+            for rating in (3, 1, 4, 2)])
+
+        self.assertEquals(
+            [lover.rating for lover in self.engine.lovers('top')],
+            [4, 3, 2, 1])
+        self.assertEquals(
+            [lover.rating for lover in self.engine.lovers('new')],
+            [1, 2, 3, 4])
+        self.assertEquals(
+            [lover.rating for lover in self.engine.lovers(
+                order_col='dateCreated', sort_by='DESC')],
+            [1, 2, 3, 4])
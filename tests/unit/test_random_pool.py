@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import time
+import itertools
+import threading
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.random_pool import RandomPool
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestARandomPool(unittest2.TestCase):
+
+    def setUp(self):
+        ids = itertools.count(1)
+        self.client = mock.Mock()
+        self.client.palettes.side_effect = \
+            lambda argument: [cl.Palette(id=str(next(ids)))]
+
+    def test_fetches_synchronously_without_workers(self):
+        pool = RandomPool(self.client, methods=['palettes'])
+
+        self.assertEquals(pool.get('palettes').id, 1)
+        self.client.palettes.assert_called_with('random')
+        self.assertEquals(pool.hit_rate(), 0.0)
+
+    def test_serves_prefetched_items(self):
+        with RandomPool(self.client, size=4, workers=2,
+                        methods=['palettes']) as pool:
+            self.assertTrue(wait_for(lambda: pool.buffered('palettes') == 4))
+            self.assertEquals(self.client.palettes.call_count, 4)
+
+            ids = set(pool.get('palettes').id for _ in range(3))
+            self.assertEquals(len(ids), 3)
+            self.assertTrue(wait_for(lambda: pool.buffered('palettes') == 4))
+
+        stats = pool.stats()['palettes']
+        self.assertEquals(stats['hits'], 3)
+        self.assertEquals(stats['misses'], 0)
+        self.assertEquals(stats['hit_rate'], 1.0)
+
+    def test_counts_failed_requests(self):
+        self.client.palettes.side_effect = cl.ColourLoversError('failed')
+
+        with RandomPool(self.client, size=1, workers=1, retry_delay=10,
+                        methods=['palettes']) as pool:
+            self.assertTrue(wait_for(
+                lambda: pool.stats()['palettes']['failures'] == 1))
+            self.assertRaises(cl.ColourLoversError, pool.get, 'palettes')
+
+    def test_discards_items_of_requests_in_progress_on_stop(self):
+        started, release = threading.Event(), threading.Event()
+
+        def palettes(argument):
+            started.set()
+            release.wait(5)
+            return [cl.Palette(id='1')]
+
+        self.client.palettes.side_effect = palettes
+        pool = RandomPool(self.client, size=1, workers=1,
+                          methods=['palettes'])
+        pool.start()
+        self.assertTrue(started.wait(5))
+
+        pool.stop(timeout=0.01)
+        release.set()
+        time.sleep(0.1)
+
+        self.assertEquals(pool.buffered('palettes'), 0)
+
+    def test_rejects_unknown_methods(self):
+        pool = RandomPool(self.client, methods=['palettes'])
+        self.assertRaises(cl.ColourLoversError, pool.get, 'colors')
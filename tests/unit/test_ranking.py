@@ -0,0 +1,86 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.ranking import TopN, leaderboards, top_n
+
+from tests.testcases import palette
+
+
+class TestATopNRanking(unittest2.TestCase):
+
+    def test_keeps_only_the_best_items(self):
+        ranking = TopN(2, 'num_votes')
+        ranking.extend(palette(i, num_votes=str(v))
+                       for i, v in [(1, 5), (2, 9), (3, 1), (4, 7)])
+
+        self.assertEquals(len(ranking), 2)
+        self.assertEquals([p.id for p in ranking.items()], [2, 4])
+        self.assertEquals(ranking.threshold(), 7)
+
+    def test_ranks_by_ascending_rank(self):
+        ranking = TopN(2, 'rank')
+        ranking.extend(palette(i, rank=str(i * 10)) for i in [3, 1, 2])
+
+        self.assertEquals([p.id for p in ranking.items()], [1, 2])
+
+    def test_ranks_items_only_once(self):
+        ranking = TopN(3, 'num_views')
+        self.assertTrue(ranking.push(palette(1, num_views='4')))
+        self.assertFalse(ranking.push(palette(1, num_views='4')))
+
+        self.assertEquals(len(ranking), 1)
+
+    def test_rejects_unknown_keys(self):
+        self.assertRaises(cl.ColourLoversError, TopN, 5, 'title')
+
+    def test_rejects_empty_rankings(self):
+        self.assertRaises(cl.ColourLoversError, TopN, 0)
+
+
+class TestRankingQueries(unittest2.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.client.palettes.side_effect = lambda argument, **kwargs: {
+            'red': [palette(1, num_hearts='4.5'), palette(2, num_hearts='2')],
+            'blue': [palette(2, num_hearts='2'), palette(3, num_hearts='5')],
+        }[kwargs['hueOption']]
+
+    def test_merges_results_of_all_queries(self):
+        results = top_n(
+            self.client, 'palettes',
+            [{'hueOption': 'red'}, {'hueOption': 'blue'}],
+            n=2, key='num_hearts')
+
+        self.assertEquals([p.id for p in results], [3, 1])
+        self.client.palettes.assert_any_call(
+            'top', hueOption='red', numResults=100, resultOffset=0)
+
+    def test_builds_a_ranking_per_query(self):
+        boards = leaderboards(
+            self.client, 'palettes',
+            {'warm': {'hueOption': 'red'}, 'cold': {'hueOption': 'blue'}},
+            n=1, key='num_hearts')
+
+        self.assertEquals([p.id for p in boards['warm']], [1])
+        self.assertEquals([p.id for p in boards['cold']], [3])
@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import unittest2
+import zlib
+
+import colourlovers as cl
+
+from colourlovers import render
+
+
+class TestRenderingPalettes(unittest2.TestCase):
+
+    def setUp(self):
+        self.palette = cl.Palette(id='1', color_widths='0.25,0.75')
+        self.palette.colours = ['#ff0000', '#0000ff']
+
+    def test_scales_stripes_by_colour_widths(self):
+        rgb = render.render_palette(self.palette, width=4, height=2)
+
+        self.assertEquals(len(rgb), 4 * 2 * 3)
+        self.assertEquals(
+            bytearray(rgb[:12]),
+            bytearray([255, 0, 0] + [0, 0, 255] * 3))
+
+    def test_stripe_widths_add_up_to_the_image_width(self):
+        self.assertEquals(render.stripe_widths([1, 1, 1], 10), [3, 4, 3])
+
+    def test_renders_patterns_with_equal_stripes(self):
+        pattern = cl.Pattern(id='2')
+        pattern.colours = ['#ffffff', '#000000']
+
+        rgb = render.render_pattern(pattern, width=2, height=1)
+        self.assertEquals(bytearray(rgb), bytearray([255] * 3 + [0] * 3))
+
+    def test_encodes_valid_png(self):
+        png = render.render_png(self.palette, width=4, height=2)
+
+        self.assertEquals(png[:8], b'\x89PNG\r\n\x1a\n')
+        width, height = struct.unpack('>II', png[16:24])
+        self.assertEquals((width, height), (4, 2))
+
+        length = struct.unpack('>I', png[33:37])[0]
+        rows = zlib.decompress(png[41:41 + length])
+        self.assertEquals(
+            bytearray(rows),
+            bytearray(([0] + [255, 0, 0] + [0, 0, 255] * 3) * 2))
+
+    def test_rejects_palettes_without_colours(self):
+        palette = cl.Palette(id='3')
+        palette.colours = []
+
+        self.assertRaises(cl.ColourLoversError, render.render_png, palette)
+
+    def test_caches_rendered_images(self):
+        root = tempfile.mkdtemp()
+        try:
+            cache = render.RenderCache(root)
+            png = render.render_png(self.palette, cache=cache)
+
+            key = cache.key(self.palette, 300, 100)
+            self.assertTrue(os.path.exists(cache.path(key)))
+            self.assertEquals(cache.get(key), png)
+        finally:
+            shutil.rmtree(root)
+
+    def test_stores_images_from_several_threads(self):
+        root = tempfile.mkdtemp()
+        try:
+            cache = render.RenderCache(root)
+            key = cache.key(self.palette, 4, 2)
+            threads = [
+                threading.Thread(target=cache.set, args=(key, b'png' * 1000))
+                for __ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEquals(cache.get(key), b'png' * 1000)
+            self.assertEquals(
+                os.listdir(os.path.dirname(cache.path(key))),
+                [os.path.basename(cache.path(key))])
+        finally:
+            shutil.rmtree(root)
@@ -0,0 +1,219 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import requests
+import threading
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.resilience import CircuitBreaker, LatencyTracker, hedged
+
+from tests.testcases import FixtureTestCase
+
+
+class TestACircuitBreaker(unittest2.TestCase):
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEquals(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_allows_a_single_probe_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEquals(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+
+class TestHedging(unittest2.TestCase):
+
+    def test_returns_first_result_when_first_call_stalls(self):
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return 'slow'
+            return 'fast'
+
+        try:
+            self.assertEquals(hedged(func, 0.01), 'fast')
+        finally:
+            release.set()
+        self.assertEquals(len(calls), 2)
+
+    def test_discards_results_of_slower_calls(self):
+        release = threading.Event()
+        discarded = threading.Event()
+        results = iter(['slow', 'fast'])
+
+        def func():
+            result = next(results)
+            if result == 'slow':
+                release.wait(5)
+            return result
+
+        def discard(value):
+            self.assertEquals(value, 'slow')
+            discarded.set()
+
+        self.assertEquals(hedged(func, 0.01, discard=discard), 'fast')
+        release.set()
+        self.assertTrue(discarded.wait(5))
+
+    def test_does_not_hedge_fast_calls(self):
+        func = mock.Mock(return_value='result')
+        self.assertEquals(hedged(func, 1), 'result')
+        self.assertEquals(func.call_count, 1)
+
+    def test_raises_when_all_calls_fail(self):
+        func = mock.Mock(side_effect=ValueError('failed'))
+        self.assertRaises(ValueError, hedged, func, 0)
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(window=10)
+        self.assertEquals(tracker.percentile(95), None)
+        for latency in range(20):
+            tracker.record(latency)
+        self.assertEquals(len(tracker), 10)
+        self.assertEquals(tracker.percentile(0), 10)
+        self.assertEquals(tracker.percentile(100), 19)
+
+
+class TestAResilientClient(FixtureTestCase):
+    fixtures = ['tests/fixtures/colour.xml']
+
+    def setUp(self):
+        super(TestAResilientClient, self).setUp()
+        self.response = mock.Mock(status_code=200)
+        self.response.content = ('<colors>%s</colors>' % self.data[
+            'colour.xml'].split('?>', 1)[1]).encode('utf-8')
+        self.session = mock.Mock()
+        self.session.get.return_value = self.response
+
+    def test_passes_timeout_to_session(self):
+        cl_api = cl.ColourLovers(session=self.session, timeout=2.5)
+        cl_api.color('6B4106')
+
+        self.assertEquals(self.session.get.call_args[1]['timeout'], 2.5)
+
+    def test_fails_fast_when_circuit_is_open(self):
+        self.session.get.side_effect = requests.ConnectionError()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        cl_api = cl.ColourLovers(
+            session=self.session, circuit_breaker=breaker)
+
+        for _ in range(2):
+            self.assertRaises(
+                requests.ConnectionError, cl_api.color, '6B4106')
+        self.assertRaises(cl.ColourLoversError, cl_api.color, '6B4106')
+        self.assertEquals(self.session.get.call_count, 2)
+
+    def test_server_errors_open_the_circuit(self):
+        self.response.status_code = 503
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        cl_api = cl.ColourLovers(
+            session=self.session, circuit_breaker=breaker)
+
+        self.assertRaises(cl.ColourLoversError, cl_api.color, '6B4106')
+        self.assertEquals(breaker.state, CircuitBreaker.OPEN)
+
+    def test_hedges_slow_requests(self):
+        release = threading.Event()
+        responses = []
+
+        def get(*args, **kwargs):
+            responses.append(1)
+            if len(responses) == 3:
+                release.wait(5)
+            return self.response
+
+        self.session.get.side_effect = get
+        cl_api = cl.ColourLovers(
+            session=self.session, hedge_percentile=50, hedge_min_samples=2)
+        try:
+            for _ in range(3):
+                cl_api.color('6B4106')
+        finally:
+            release.set()
+
+        self.assertEquals(len(responses), 4)
+
+    def test_hedged_requests_reuse_the_session_of_the_caller(self):
+        sessions = []
+
+        def create_session():
+            session = mock.Mock(headers={})
+            session.get.return_value = self.response
+            sessions.append(session)
+            return session
+
+        cl_api = cl.ColourLovers(hedge_percentile=99, hedge_min_samples=1)
+        with mock.patch('requests.Session', side_effect=create_session):
+            for _ in range(10):
+                cl_api.color('6B4106')
+
+        self.assertEquals(len(sessions), 1)
+        self.assertEquals(sessions[0].get.call_count, 10)
+
+    def test_hedged_attempts_do_not_share_a_session(self):
+        release = threading.Event()
+        sessions = []
+        used = []
+
+        def create_session():
+            session = mock.Mock(headers={})
+
+            def get(*args, **kwargs):
+                used.append(session)
+                if len(used) == 3:
+                    release.wait(5)
+                return self.response
+
+            session.get.side_effect = get
+            sessions.append(session)
+            return session
+
+        cl_api = cl.ColourLovers(hedge_percentile=50, hedge_min_samples=2)
+        with mock.patch('requests.Session', side_effect=create_session):
+            try:
+                for _ in range(4):
+                    cl_api.color('6B4106')
+            finally:
+                release.set()
+
+        ## the stalled third request is hedged with a spare session that
+        ## is reused for later hedges instead of creating new ones
+        self.assertTrue(used[2] is not used[3])
+        self.assertTrue(len(sessions) <= 3)
@@ -0,0 +1,122 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import io
+import pickle
+
+from datetime import datetime
+
+import colourlovers as cl
+
+from colourlovers import serialization
+
+from tests.testcases import FixtureTestCase
+
+try:
+    from xml.etree import ElementTree
+except ImportError:
+    from elementtree import ElementTree
+
+
+class TestSerialisation(FixtureTestCase):
+    fixtures = [
+        'tests/fixtures/colour.xml',
+        'tests/fixtures/palette.xml',
+        'tests/fixtures/pattern.xml',
+        'tests/fixtures/lover.xml',
+    ]
+
+    def load(self, class_name, name):
+        return class_name.from_xml(ElementTree.XML(self.data[name]))
+
+    def test_round_trips_all_content_types(self):
+        objs = [
+            self.load(cl.Colour, 'colour.xml'),
+            self.load(cl.Palette, 'palette.xml'),
+            self.load(cl.Pattern, 'pattern.xml'),
+            self.load(cl.Lover, 'lover.xml'),
+            cl.Stat('1500563'),
+        ]
+
+        decoded = serialization.decode_many(
+            serialization.encode_many(objs, serialization.PICKLE),
+            allow_pickle=True)
+
+        for obj, copy in zip(objs, decoded):
+            self.assertEquals(type(copy), type(obj))
+            self.assertEquals(copy.to_record(), obj.to_record())
+
+        colour, lover = decoded[0], decoded[3]
+        self.assertEquals(colour.rgb.hex, '#6b4106')
+        self.assertEquals(colour.hsv.saturation, 94)
+        self.assertEquals(
+            lover.comments[0].comment_date,
+            datetime(2008, 3, 10, 5, 10, 58))
+
+    def test_keeps_missing_and_unknown_attributes_apart(self):
+        palette = cl.Palette(id='5', some_new_field='value')
+
+        copy = serialization.decode(serialization.encode(palette))
+
+        self.assertFalse(hasattr(copy, 'color_widths'))
+        self.assertEquals(copy.some_new_field, 'value')
+
+    def test_is_smaller_than_pickle(self):
+        palette = self.load(cl.Palette, 'palette.xml')
+
+        self.assertTrue(
+            len(serialization.encode(palette, serialization.PICKLE)) <
+            len(pickle.dumps(palette, pickle.HIGHEST_PROTOCOL)))
+
+    def test_rejects_newer_schema_versions(self):
+        data = bytearray(serialization.encode(cl.Stat('1')))
+        data[3] = serialization.SCHEMA_VERSION + 1
+
+        self.assertRaises(
+            cl.ColourLoversError, serialization.decode, bytes(data))
+
+    def test_refuses_pickled_data_by_default(self):
+        data = serialization.encode(cl.Stat('1'), serialization.PICKLE)
+
+        self.assertRaises(
+            cl.ColourLoversError, serialization.decode, data)
+        self.assertEquals(
+            serialization.decode(data, allow_pickle=True).total, 1)
+
+    def test_decodes_dumps_while_reading_them(self):
+        if serialization.msgpack is None:
+            self.skipTest('msgpack is not installed')
+
+        palette = self.load(cl.Palette, 'palette.xml')
+        fh = io.BytesIO(serialization.encode_many([palette] * 100))
+
+        decoded = serialization.iter_decode_many(fh, chunk_size=256)
+        self.assertEquals(next(decoded).to_record(), palette.to_record())
+        self.assertTrue(fh.tell() < len(fh.getvalue()) // 10)
+        self.assertEquals(len(list(decoded)), 99)
+
+    def test_decodes_pickled_dumps_from_files(self):
+        data = serialization.encode_many(
+            [cl.Stat('1'), cl.Stat('2')], serialization.PICKLE)
+
+        self.assertRaises(
+            cl.ColourLoversError, list,
+            serialization.iter_decode_many(io.BytesIO(data)))
+        self.assertEquals(
+            [stat.total for stat in serialization.iter_decode_many(
+                io.BytesIO(data), allow_pickle=True)], [1, 2])
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import unittest2
+
+from colourlovers import similarity
+from colourlovers.similarity import (
+    palette_array, palette_vector, similarity_join)
+
+from tests.testcases import palette
+
+
+class TestASimilarityJoin(unittest2.TestCase):
+
+    def setUp(self):
+        self.right = [
+            palette(1, ['#ff0000', '#00ff00']),
+            palette(2, ['#ffffff', '#000000']),
+            palette(3, ['#0000ff', '#ffff00']),
+            palette(4, ['#fe0101', '#01fe01']),
+            palette(5, ['#000000', '#0000ff']),
+        ]
+        self.left = [
+            palette(10, ['#00ff00', '#ff0000']),
+            palette(11, ['#000000', '#fefefe']),
+        ]
+
+    def assertMatches(self, matches):
+        self.assertEquals(
+            [[key for key, _ in row] for row in matches],
+            [[1, 4], [2, 5]])
+        self.assertAlmostEqual(matches[0][0][1], 0.0, places=5)
+
+    def test_vector_is_dense_histogram(self):
+        vector = palette_vector(self.right[0])
+        self.assertEquals(len(vector), 64)
+        self.assertAlmostEqual(sum(vector), 1.0)
+
+    def test_finds_closest_palettes(self):
+        self.assertMatches(
+            similarity_join(self.left, self.right, k=2, chunk_size=3))
+
+    def test_finds_closest_palettes_without_numpy(self):
+        with mock.patch.object(similarity, 'numpy', None):
+            self.assertMatches(
+                similarity_join(self.left, self.right, k=2, chunk_size=3))
+
+    def test_returns_positions_for_array_form(self):
+        if similarity.numpy is None:
+            self.skipTest('numpy is not installed')
+
+        matches = similarity_join(
+            palette_array(self.left), palette_array(self.right), k=1,
+            max_memory=1)
+        self.assertEquals([row[0][0] for row in matches], [0, 1])
+
+    def test_keeps_no_global_state_in_the_calling_process(self):
+        similarity_join(self.left, self.right, k=2, chunk_size=3)
+        self.assertEquals(similarity._worker, {})
+
+    def test_joins_in_worker_processes(self):
+        self.assertMatches(similarity_join(
+            self.left, self.right, k=2, chunk_size=1, processes=2))
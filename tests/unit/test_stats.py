@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import mock
+import threading
+import time
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.stats import StatsManager
+
+
+class TestAStatsManager(unittest2.TestCase):
+
+    def setUp(self):
+        self.totals = {'colors': 10, 'lovers': 20, 'patterns': 30,
+                       'palettes': 40}
+        self.client = mock.Mock()
+        self.client.stats.side_effect = lambda t: cl.Stat(self.totals[t])
+
+    def test_caches_totals_for_the_interval(self):
+        stats = StatsManager(self.client, interval=3600)
+
+        self.assertEquals(stats.get('lovers').total, 20)
+        self.assertEquals(stats.totals()['palettes'], 40)
+        self.assertEquals(self.client.stats.call_count, 4)
+
+    def test_refreshes_stale_totals(self):
+        stats = StatsManager(self.client, interval=0)
+        stats.get('colors')
+        self.totals['colors'] = 11
+
+        self.assertEquals(stats.get('colors').total, 11)
+        self.assertEquals(self.client.stats.call_count, 8)
+
+    def test_notifies_subscribers_about_changed_totals_only(self):
+        changes = []
+        stats = StatsManager(self.client)
+        stats.refresh()
+        stats.subscribe(
+            lambda stat_type, old, new: changes.append(
+                (stat_type, old.total, new.total)))
+
+        self.totals['patterns'] = 31
+        stats.refresh()
+
+        self.assertEquals(changes, [('patterns', 30, 31)])
+
+    def test_keeps_previous_totals_when_a_request_fails(self):
+        stats = StatsManager(self.client)
+        stats.refresh()
+        self.client.stats.side_effect = cl.ColourLoversError('down')
+
+        stats.refresh()
+        self.assertEquals(stats.totals()['lovers'], 20)
+        self.assertEquals(stats.failures['lovers'], 1)
+        self.assertEquals(str(stats.errors['lovers']), 'down')
+
+    def test_concurrent_readers_refresh_a_cold_cache_once(self):
+        def slow_stats(stat_type):
+            time.sleep(0.05)
+            return cl.Stat(self.totals[stat_type])
+
+        self.client.stats.side_effect = slow_stats
+        stats = StatsManager(self.client, interval=3600)
+        readers = [
+            threading.Thread(target=stats.get, args=('colors',))
+            for __ in range(8)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        self.assertEquals(self.client.stats.call_count, 4)
+
+    def test_does_not_refresh_for_types_that_failed_to_load(self):
+        def stats(stat_type):
+            if stat_type == 'lovers':
+                raise cl.ColourLoversError('down')
+            return cl.Stat(self.totals[stat_type])
+
+        self.client.stats.side_effect = stats
+        stats = StatsManager(self.client, interval=3600)
+
+        self.assertEquals(stats.get('lovers'), None)
+        self.assertEquals(stats.get('lovers'), None)
+        self.assertEquals(stats.get('colors').total, 10)
+        self.assertEquals(self.client.stats.call_count, 4)
+
+    def test_rejects_unknown_stat_types(self):
+        stats = StatsManager(self.client)
+
+        self.assertRaises(cl.ColourLoversError, stats.get, 'comments')
+        self.assertFalse(self.client.stats.called)
@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import shutil
+import tempfile
+import unittest2
+
+from datetime import datetime
+
+import colourlovers as cl
+
+from colourlovers.sync import FeedSync
+
+
+class FakeClient(object):
+    """ Serve the palettes in *feed*, newest first, page by page. """
+
+    def __init__(self):
+        self.feed = []
+        self.requests = 0
+
+    def publish(self, *ids):
+        for id in ids:
+            self.feed.insert(0, cl.Palette(
+                id=str(id), date_created='2013-01-01 00:00:%02d' % id))
+
+    def palettes(self, argument, numResults, resultOffset):
+        self.requests += 1
+        return self.feed[resultOffset:resultOffset + numResults]
+
+
+class TestAFeedSync(unittest2.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'watermarks.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_only_returns_content_newer_than_the_watermark(self):
+        self.client.publish(*range(1, 8))
+        feed = FeedSync(self.client, page_size=3, initial_pages=1)
+
+        self.assertEquals([p.id for p in feed.sync('palettes')], [7, 6, 5])
+        self.assertEquals(
+            feed.watermark('palettes'), (7, datetime(2013, 1, 1, 0, 0, 7)))
+
+        self.client.publish(8, 9, 10, 11)
+        self.client.requests = 0
+
+        self.assertEquals(
+            [p.id for p in feed.sync('palettes')], [11, 10, 9, 8])
+        self.assertEquals(self.client.requests, 2)
+        self.assertEquals(feed.sync('palettes'), [])
+
+    def test_resumes_when_more_content_was_added_than_fits(self):
+        self.client.publish(1, 2, 3)
+        feed = FeedSync(
+            self.client, path=self.path, page_size=2, max_pages=2,
+            initial_pages=2)
+        self.assertEquals([p.id for p in feed.sync('palettes')], [3, 2, 1])
+
+        self.client.publish(*range(4, 12))
+        self.assertEquals(
+            [p.id for p in feed.sync('palettes')], [11, 10, 9, 8])
+        self.assertEquals(feed.watermark('palettes')[0], 3)
+
+        self.client.publish(12)
+        feed = FeedSync(
+            self.client, path=self.path, page_size=2, max_pages=2)
+        self.assertEquals(
+            [p.id for p in feed.sync('palettes')], [12, 7, 6])
+        self.assertEquals([p.id for p in feed.sync('palettes')], [5, 4])
+        self.assertEquals(feed.sync('palettes'), [])
+        self.assertEquals(feed.watermark('palettes')[0], 12)
+        self.assertEquals(feed.delivered, {})
+
+    def test_persists_watermarks(self):
+        self.client.publish(1, 2)
+        FeedSync(self.client, path=self.path).sync('palettes')
+
+        self.client.publish(3)
+        feed = FeedSync(self.client, path=self.path)
+
+        self.assertEquals([p.id for p in feed.sync('palettes')], [3])
+
+    def test_rejects_methods_without_new_feed(self):
+        feed = FeedSync(self.client)
+        self.assertRaises(cl.ColourLoversError, feed.sync, 'stats')
@@ -0,0 +1,175 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# python-colourlovers - A Python API to http://www.colourlovers.com
+# Copyright (C) 2012 Sebastian Vetter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import gzip
+import io
+import zlib
+
+import mock
+import requests
+
+from requests.packages.urllib3.exceptions import ProtocolError
+import unittest2
+
+import colourlovers as cl
+
+from colourlovers.resilience import CircuitBreaker
+from colourlovers.transfer import TransferStats, decompressor, iter_body
+
+from tests.testcases import FixtureTestCase
+
+
+def gzipped(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as stream:
+        stream.write(data)
+    return buf.getvalue()
+
+
+def raw_deflated(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def streamed_response(body, encoding=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class TestDecompression(unittest2.TestCase):
+    data = b'<palettes>' + b'<palette/>' * 1000 + b'</palettes>'
+
+    def body(self, response, chunk_size=64):
+        return b''.join(data for _, data in iter_body(response, chunk_size))
+
+    def test_decodes_gzip_and_deflate_chunk_by_chunk(self):
+        for body, encoding in [(gzipped(self.data), 'gzip'),
+                               (zlib.compress(self.data), 'deflate'),
+                               (raw_deflated(self.data), 'deflate'),
+                               (self.data, None)]:
+            response = streamed_response(body, encoding)
+            self.assertEquals(self.body(response), self.data)
+
+    def test_counts_received_bytes(self):
+        body = gzipped(self.data)
+        received = sum(
+            count for count, _ in iter_body(streamed_response(body, 'gzip')))
+        self.assertEquals(received, len(body))
+
+    def test_rejects_unsupported_encodings(self):
+        self.assertRaises(ValueError, decompressor, 'compress')
+
+
+class TestTransferStats(unittest2.TestCase):
+
+    def test_sums_bytes_per_method(self):
+        stats = TransferStats()
+        stats.record('palettes', 100, 400)
+        stats.record('palettes', 50, 200)
+        stats.record('colors', 10, 10)
+
+        self.assertEquals(
+            stats.get('palettes'),
+            {'requests': 2, 'compressed': 150, 'uncompressed': 600})
+        self.assertEquals(stats.ratio('palettes'), 0.25)
+        self.assertEquals(stats.ratio(), 160.0 / 610)
+        self.assertEquals(sorted(stats.totals()), ['colors', 'palettes'])
+
+        stats.reset()
+        self.assertEquals(stats.get('palettes')['requests'], 0)
+        self.assertEquals(stats.ratio(), None)
+
+
+class TestACompressedTransfer(FixtureTestCase):
+    fixtures = ['tests/fixtures/palette.xml']
+
+    def setUp(self):
+        super(TestACompressedTransfer, self).setUp()
+        self.xml = ('<palettes>%s</palettes>' % self.data[
+            'palette.xml'].split('?>', 1)[1]).encode('utf-8')
+        self.session = mock.Mock()
+
+    def test_parses_compressed_responses(self):
+        body = gzipped(self.xml)
+        self.session.get.return_value = streamed_response(body, 'gzip')
+        cl_api = cl.ColourLovers(session=self.session)
+
+        palettes = cl_api.palettes('top')
+
+        self.assertEquals(palettes[0].id, 12345)
+        self.assertEquals(self.session.get.call_args[1]['stream'], True)
+        self.assertEquals(
+            cl_api.transfer_stats.get('palettes'),
+            {'requests': 1, 'compressed': len(body),
+             'uncompressed': len(self.xml)})
+
+    def test_counts_responses_without_raw_body(self):
+        self.session.get.return_value = mock.Mock(
+            status_code=200, content=self.xml)
+        cl_api = cl.ColourLovers(session=self.session)
+
+        cl_api.palettes('top')
+
+        self.assertEquals(
+            cl_api.transfer_stats.get('palettes')['compressed'],
+            len(self.xml))
+
+    def test_raises_error_for_corrupt_content(self):
+        self.session.get.return_value = streamed_response(
+            b'not compressed', 'gzip')
+        cl_api = cl.ColourLovers(session=self.session)
+
+        self.assertRaises(cl.ColourLoversError, cl_api.palettes, 'top')
+
+    def test_negotiates_compression_on_passed_sessions(self):
+        self.session.get.return_value = streamed_response(self.xml)
+        cl_api = cl.ColourLovers(session=self.session)
+
+        cl_api.palettes('top')
+
+        headers = self.session.get.call_args[1]['headers']
+        self.assertTrue('gzip' in headers['Accept-Encoding'])
+        self.assertTrue('deflate' in headers['Accept-Encoding'])
+        self.assertEquals(headers['User-Agent'], cl.ColourLovers.USER_AGENT)
+
+    def test_body_errors_open_the_circuit(self):
+        response = streamed_response(b'')
+        response.raw = mock.Mock()
+        response.raw.stream.side_effect = ProtocolError('connection reset')
+        self.session.get.return_value = response
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        cl_api = cl.ColourLovers(
+            session=self.session, circuit_breaker=breaker)
+
+        self.assertRaises(requests.ConnectionError, cl_api.palettes, 'top')
+        self.assertEquals(breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(response.raw.close.called)
+
+    def test_closes_error_responses(self):
+        response = streamed_response(b'')
+        response.status_code = 404
+        response.raw = mock.Mock()
+        self.session.get.return_value = response
+        cl_api = cl.ColourLovers(session=self.session)
+
+        self.assertRaises(cl.ColourLoversError, cl_api.palettes, 'top')
+        self.assertTrue(response.raw.close.called)